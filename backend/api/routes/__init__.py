@@ -3,6 +3,7 @@ from .auth import router as auth_router
 from .flights import router as flights_router
 from .bookings import router as bookings_router
 from .admin import router as admin_router
+from .company import router as company_router
 
-__all__ = ["auth_router", "flights_router", "bookings_router", "admin_router"]
+__all__ = ["auth_router", "flights_router", "bookings_router", "admin_router", "company_router"]
 
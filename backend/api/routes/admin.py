@@ -1,10 +1,18 @@
 """Admin API routes."""
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from domain.models import User, UserRole
-from infrastructure.repositories import UserRepository
-from infrastructure.database import get_firebase_db
-from core.dependencies import get_current_admin
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from domain.models import User, UserRole, PlatformStats, Task, TaskStatus
+from infrastructure.repositories import (
+    UserRepository, FlightRepository, BookingRepository, StatsRepository, RollupRepository, TaskRepository
+)
+from infrastructure.database import get_firebase_db, get_firebase_auth
+from core.dependencies import get_current_admin, sparse_fields
+from services import RepricingService
+from config.settings import get_settings
+from observability.profiling import profile, ProfilerBusy
+from infrastructure.scheduling import scheduler
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -14,14 +22,25 @@ def get_user_repo(db = Depends(get_firebase_db)) -> UserRepository:
     return UserRepository(db)
 
 
-@router.get("/users", response_model=List[User])
+def get_stats_repo(db = Depends(get_firebase_db)) -> StatsRepository:
+    """Dependency to get StatsRepository instance."""
+    return StatsRepository(db)
+
+
+def get_repricing_service(db = Depends(get_firebase_db)) -> RepricingService:
+    """Dependency to get RepricingService instance."""
+    return RepricingService(FlightRepository(db), get_settings().repricing_fare_curves)
+
+
+@router.get("/users", response_model=List[User], response_model_exclude_unset=True)
 async def get_all_users(
+    fields = Depends(sparse_fields(User)),
     current_user: User = Depends(get_current_admin),
     user_repo: UserRepository = Depends(get_user_repo)
 ):
-    """Get all users. Requires admin role."""
+    """Get all users; ``fields`` limits what is returned. Requires admin role."""
     try:
-        users = user_repo.get_all()
+        users = user_repo.get_all(fields=fields)
         return users
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -64,7 +83,8 @@ async def set_user_role(
     user_id: str,
     role: UserRole,
     current_user: User = Depends(get_current_admin),
-    user_repo: UserRepository = Depends(get_user_repo)
+    user_repo: UserRepository = Depends(get_user_repo),
+    firebase_auth = Depends(get_firebase_auth)
 ):
     """Set user role. Requires admin role."""
     try:
@@ -73,8 +93,6 @@ async def set_user_role(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         
         # Update Firebase custom claims
-        from infrastructure.database import get_firebase_auth
-        firebase_auth = get_firebase_auth()
         firebase_auth.set_custom_user_claims(user_id, {'role': role.value})
         
         return {"message": f"User role set to {role.value} successfully"}
@@ -94,3 +112,132 @@ async def get_user(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
+
+@router.get("/stats", response_model=PlatformStats)
+async def get_platform_stats(
+    current_user: User = Depends(get_current_admin),
+    stats_repo: StatsRepository = Depends(get_stats_repo)
+):
+    """Platform statistics from the incremental counters. Requires admin role."""
+    try:
+        return stats_repo.get_platform_stats()
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/stats/rebuild", response_model=PlatformStats)
+async def rebuild_platform_stats(
+    current_user: User = Depends(get_current_admin),
+    stats_repo: StatsRepository = Depends(get_stats_repo),
+    db = Depends(get_firebase_db)
+):
+    """
+    Recompute the statistics from a full scan of users, flights and bookings.
+    Requires admin role. Meant for the initial backfill and for repairs.
+    """
+    try:
+        repositories = [UserRepository(db), FlightRepository(db), BookingRepository(db)]
+        return await run_in_threadpool(stats_repo.rebuild, repositories)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/rollups/rebuild")
+async def rebuild_rollups(
+    current_user: User = Depends(get_current_admin),
+    db = Depends(get_firebase_db)
+):
+    """
+    Recompute flight and company-day sales rollups from all flights and
+    bookings. Requires admin role. Meant for the initial backfill and for repairs.
+    """
+    try:
+        return await run_in_threadpool(RollupRepository(db).rebuild, FlightRepository(db), BookingRepository(db))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/scheduler")
+async def get_scheduler_status(current_user: User = Depends(get_current_admin)):
+    """
+    Background jobs of this worker: whether it holds each job's lease, run
+    counts, last result (e.g. flights completed and lifecycle lag) and last error.
+    Requires admin role.
+    """
+    return scheduler.status()
+
+
+@router.get("/tasks", response_model=List[Task])
+async def get_tasks(
+    task_status: TaskStatus = Query(TaskStatus.DEAD, alias="status"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_admin),
+    db = Depends(get_firebase_db)
+):
+    """Background tasks by status; dead-lettered ones by default. Requires admin role."""
+    try:
+        return TaskRepository(db).find_by_status(task_status, limit)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/tasks/{task_id}/retry", response_model=Task)
+async def retry_task(
+    task_id: str,
+    current_user: User = Depends(get_current_admin),
+    db = Depends(get_firebase_db)
+):
+    """Give a dead-lettered task a fresh set of attempts. Requires admin role."""
+    task_repo = TaskRepository(db)
+    task = task_repo.get_by_id(task_id)
+    if not task:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    if task.status != TaskStatus.DEAD:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Task is {task.status}, not dead")
+    task_repo.retry(task_id)
+    return task_repo.get_by_id(task_id)
+
+
+@router.post("/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=60, description="Sampling duration in seconds"),
+    interval_ms: float = Query(5, ge=1, le=100, description="Sampling interval in milliseconds"),
+    output: str = Query("json", alias="format", pattern="^(json|collapsed)$",
+                        description="json (report) or collapsed (stacks only)"),
+    include_idle: bool = Query(False, description="Keep samples of threads parked waiting for work"),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Profile this worker under live traffic. Requires admin role.
+    Returns top functions by self time plus collapsed stacks, or only the
+    collapsed stacks (flamegraph.pl / speedscope input) with format=collapsed.
+    Only one session runs at a time, with a cooldown between sessions.
+    """
+    try:
+        # Sample from a worker thread so the event loop keeps serving traffic
+        report = await run_in_threadpool(profile, seconds, interval_ms / 1000.0, include_idle)
+    except ProfilerBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after) + 1)}
+        )
+    
+    if output == "collapsed":
+        return PlainTextResponse(report["collapsed"] + "\n")
+    return report
+
+
+@router.post("/reprice")
+async def reprice_flights(
+    dry_run: bool = Query(False, description="Compute new prices without writing them"),
+    current_user: User = Depends(get_current_admin),
+    repricing_service: RepricingService = Depends(get_repricing_service)
+):
+    """Reprice all scheduled flights from the fare curves. Requires admin role."""
+    try:
+        return await run_in_threadpool(repricing_service.reprice, dry_run=dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
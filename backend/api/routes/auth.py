@@ -3,16 +3,16 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from domain.models import UserCreate, UserLogin, User
 from services import AuthService
 from infrastructure.repositories import UserRepository
-from infrastructure.database import get_firebase_db
+from infrastructure.database import get_firebase_db, get_firebase_auth
 from core.dependencies import get_current_user
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-def get_auth_service(db = Depends(get_firebase_db)) -> AuthService:
+def get_auth_service(db = Depends(get_firebase_db), auth_client = Depends(get_firebase_auth)) -> AuthService:
     """Dependency to get AuthService instance."""
     user_repo = UserRepository(db)
-    return AuthService(user_repo)
+    return AuthService(user_repo, auth_client)
 
 
 @router.post("/register")
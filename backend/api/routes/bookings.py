@@ -1,11 +1,24 @@
 """Booking API routes."""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from domain.models import Booking, BookingCreate, User
-from services import BookingService
-from infrastructure.repositories import BookingRepository, FlightRepository
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from domain.models import (
+    Booking, BookingCreate, BookingStatus, HoldConfirm, SeatHold, SeatHoldCreate, User, UserRole,
+    WaitlistCreate, WaitlistEntry
+)
+from services import BookingService, SeatHoldService
+from services.booking_service import MANIFEST_FIELDS
+from infrastructure.repositories import (
+    BookingRepository, FlightRepository, HoldRepository, SeatMapRepository, UserRepository, WaitlistRepository
+)
 from infrastructure.database import get_firebase_db
 from core.dependencies import get_current_user
+from config.settings import get_settings
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
@@ -14,7 +27,37 @@ def get_booking_service(db = Depends(get_firebase_db)) -> BookingService:
     """Dependency to get BookingService instance."""
     booking_repo = BookingRepository(db)
     flight_repo = FlightRepository(db)
-    return BookingService(booking_repo, flight_repo)
+    return BookingService(booking_repo, flight_repo, UserRepository(db), SeatMapRepository(db), WaitlistRepository(db))
+
+
+def get_hold_service(db = Depends(get_firebase_db)) -> SeatHoldService:
+    """Dependency to get SeatHoldService instance."""
+    return SeatHoldService(HoldRepository(db), FlightRepository(db), BookingRepository(db),
+                           get_settings().seat_hold_minutes, seat_map_repo=SeatMapRepository(db))
+
+
+def _manifest_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _manifest_csv(rows: List[Dict[str, Any]], chunk_rows: int = 100) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=MANIFEST_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for i, row in enumerate(rows, 1):
+        writer.writerow({key: _manifest_value(value) for key, value in row.items()})
+        if i % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _manifest_ndjson(rows: List[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({key: _manifest_value(value) for key, value in row.items()}) + "\n"
 
 
 @router.post("/", response_model=Booking, status_code=status.HTTP_201_CREATED)
@@ -25,7 +68,8 @@ async def create_booking(
 ):
     """Create a new booking. Requires authentication."""
     try:
-        booking = booking_service.create_booking(current_user.id, booking_data)
+        # Off the event loop, so bookings for a hot flight can wait in its lane together
+        booking = await run_in_threadpool(booking_service.create_booking, current_user.id, booking_data)
         return booking
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -46,6 +90,116 @@ async def get_my_bookings(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.post("/waitlist", response_model=WaitlistEntry, status_code=status.HTTP_201_CREATED)
+async def join_waitlist(
+    request: WaitlistCreate,
+    current_user: User = Depends(get_current_user),
+    booking_service: BookingService = Depends(get_booking_service)
+):
+    """
+    Wait for seats on a full flight. Cancellations book waitlisted requests
+    automatically, highest priority first, then in order of arrival.
+    """
+    priority = request.priority if current_user.role in [UserRole.COMPANY, UserRole.ADMIN] else 0
+    try:
+        return booking_service.join_waitlist(current_user.id, request, priority)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/waitlist/{flight_id}", response_model=WaitlistEntry)
+async def get_waitlist_entry(
+    flight_id: str,
+    current_user: User = Depends(get_current_user),
+    booking_service: BookingService = Depends(get_booking_service)
+):
+    """The current user's place on a flight's waitlist."""
+    entry = booking_service.get_waitlist_entry(flight_id, current_user.id)
+    if not entry:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not on the waitlist for this flight")
+    return entry
+
+
+@router.delete("/waitlist/{flight_id}")
+async def leave_waitlist(
+    flight_id: str,
+    current_user: User = Depends(get_current_user),
+    booking_service: BookingService = Depends(get_booking_service)
+):
+    """Leave a flight's waitlist."""
+    try:
+        booking_service.leave_waitlist(flight_id, current_user.id)
+        return {"message": "Left the waitlist"}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/holds", response_model=SeatHold, status_code=status.HTTP_201_CREATED)
+async def create_hold(
+    hold_data: SeatHoldCreate,
+    current_user: User = Depends(get_current_user),
+    hold_service: SeatHoldService = Depends(get_hold_service)
+):
+    """Hold seats during checkout; they return to sale when the hold expires."""
+    try:
+        return hold_service.place_hold(current_user.id, hold_data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/holds/{hold_id}", response_model=SeatHold)
+async def get_hold(
+    hold_id: str,
+    current_user: User = Depends(get_current_user),
+    hold_service: SeatHoldService = Depends(get_hold_service)
+):
+    """Get a seat hold by ID."""
+    hold = hold_service.get_hold(hold_id)
+    if not hold:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hold not found")
+    if hold.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    return hold
+
+
+@router.post("/holds/{hold_id}/confirm", response_model=Booking, status_code=status.HTTP_201_CREATED)
+async def confirm_hold(
+    hold_id: str,
+    confirmation: Optional[HoldConfirm] = None,
+    current_user: User = Depends(get_current_user),
+    hold_service: SeatHoldService = Depends(get_hold_service)
+):
+    """Turn an active hold into a confirmed booking at the held price, optionally with chosen seats."""
+    try:
+        return hold_service.confirm_hold(hold_id, current_user.id, confirmation.seats if confirmation else None)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/holds/{hold_id}")
+async def release_hold(
+    hold_id: str,
+    current_user: User = Depends(get_current_user),
+    hold_service: SeatHoldService = Depends(get_hold_service)
+):
+    """Release a hold and put its seats back on sale."""
+    try:
+        hold_service.release_hold(hold_id, current_user.id)
+        return {"message": "Hold released successfully"}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @router.get("/{booking_id}", response_model=Booking)
 async def get_booking(
     booking_id: str,
@@ -82,6 +236,55 @@ async def cancel_booking(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.get("/flight/{flight_id}/manifest")
+async def get_flight_manifest(
+    flight_id: str,
+    output: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    booking_status: Optional[BookingStatus] = Query(None, alias="status", description="Only bookings in this status"),
+    current_user: User = Depends(get_current_user),
+    booking_service: BookingService = Depends(get_booking_service)
+):
+    """
+    Passenger manifest of a flight as CSV or NDJSON, ordered by booking
+    time. Requires company or admin role.
+    """
+    if current_user.role not in [UserRole.COMPANY, UserRole.ADMIN]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    
+    try:
+        rows = await run_in_threadpool(booking_service.get_flight_manifest, flight_id, booking_status)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    if rows is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
+    
+    if output == "ndjson":
+        body, media_type = _manifest_ndjson(rows), "application/x-ndjson"
+    else:
+        body, media_type = _manifest_csv(rows), "text/csv"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="manifest-{flight_id}.{output}"'}
+    )
+
+
+@router.get("/flight/{flight_id}/waitlist", response_model=List[WaitlistEntry])
+async def get_flight_waitlist(
+    flight_id: str,
+    current_user: User = Depends(get_current_user),
+    booking_service: BookingService = Depends(get_booking_service)
+):
+    """A flight's waitlist in serving order. Requires company or admin role."""
+    if current_user.role not in [UserRole.COMPANY, UserRole.ADMIN]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    
+    try:
+        return booking_service.get_waitlist(flight_id)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @router.get("/flight/{flight_id}/bookings", response_model=List[Booking])
 async def get_flight_bookings(
     flight_id: str,
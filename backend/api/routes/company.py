@@ -0,0 +1,56 @@
+"""Company dashboard API routes."""
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from domain.models import CompanyDashboard, FlightRollup, User, UserRole
+from services import DashboardService
+from infrastructure.repositories import RollupRepository
+from infrastructure.database import get_firebase_db
+from core.dependencies import require_role
+
+router = APIRouter(prefix="/company", tags=["Company"])
+
+
+def get_dashboard_service(db = Depends(get_firebase_db)) -> DashboardService:
+    """Dependency to get DashboardService instance."""
+    return DashboardService(RollupRepository(db))
+
+
+@router.get("/{company_id}/dashboard", response_model=CompanyDashboard)
+async def get_company_dashboard(
+    company_id: str,
+    start_date: Optional[date] = Query(None, description="First departure day (default: 30 days ago)"),
+    end_date: Optional[date] = Query(None, description="Last departure day (default: 30 days ahead)"),
+    include_flights: bool = Query(True, description="Include per-flight rollups"),
+    current_user: User = Depends(require_role(UserRole.COMPANY, UserRole.ADMIN)),
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
+):
+    """
+    Seats sold, cancellations, revenue and load factor per departure day.
+    Requires company or admin role.
+    """
+    today = date.today()
+    try:
+        return dashboard_service.get_company_dashboard(
+            company_id,
+            start_date or today - timedelta(days=30),
+            end_date or today + timedelta(days=30),
+            include_flights
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/flights/{flight_id}/rollup", response_model=FlightRollup)
+async def get_flight_rollup(
+    flight_id: str,
+    current_user: User = Depends(require_role(UserRole.COMPANY, UserRole.ADMIN)),
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
+):
+    """Sales and load factor of one flight. Requires company or admin role."""
+    rollup = dashboard_service.get_flight_rollup(flight_id)
+    if not rollup:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No sales recorded for this flight")
+    return rollup
@@ -1,51 +1,133 @@
 """Flight API routes."""
+import json
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from domain.models import Flight, FlightCreate, FlightUpdate, User
-from services import FlightService
-from infrastructure.repositories import FlightRepository
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from domain.models import Flight, FlightCancellation, FlightCreate, FlightUpdate, SeatMapView, User, UserRole
+from services import FlightService, CancellationService
+from infrastructure.repositories import FlightRepository, BookingRepository, CancellationRepository, SeatMapRepository
 from infrastructure.database import get_firebase_db
-from core.dependencies import get_current_user, get_current_company, get_current_admin
+from infrastructure.replicas import flight_replica
+from infrastructure.realtime import seat_broadcaster, SubscriberLimitReached
+from observability import metrics
+from core.dependencies import get_current_user, get_current_company, get_current_admin, require_role, sparse_fields
 
 router = APIRouter(prefix="/flights", tags=["Flights"])
 
+# Seat stream limits
+STREAM_MAX_FLIGHTS = 50
+STREAM_KEEPALIVE_SECONDS = 15.0
+
 
 def get_flight_service(db = Depends(get_firebase_db)) -> FlightService:
     """Dependency to get FlightService instance."""
-    flight_repo = FlightRepository(db)
-    return FlightService(flight_repo)
+    # Browsing may read the local replica when it is fresh enough
+    flight_repo = FlightRepository(db, replica=flight_replica)
+    return FlightService(flight_repo, SeatMapRepository(db))
+
 
+def get_cancellation_service(db = Depends(get_firebase_db)) -> CancellationService:
+    """Dependency to get CancellationService instance."""
+    return CancellationService(FlightRepository(db), BookingRepository(db), CancellationRepository(db))
 
-@router.get("/", response_model=List[Flight])
+
+@router.get("/", response_model=List[Flight], response_model_exclude_unset=True)
 async def search_flights(
     origin: Optional[str] = Query(None, description="Origin airport code"),
     destination: Optional[str] = Query(None, description="Destination airport code"),
     departure_date: Optional[datetime] = Query(None, description="Departure date"),
     limit: int = Query(50, ge=1, le=100),
+    fields = Depends(sparse_fields(Flight)),
     flight_service: FlightService = Depends(get_flight_service)
 ):
-    """Search flights with optional filters. Public endpoint."""
+    """Search flights with optional filters; ``fields`` limits what is returned. Public endpoint."""
     try:
-        flights = flight_service.search_flights(origin, destination, departure_date, limit)
+        # Off the event loop, so identical concurrent searches can coalesce
+        flights = await run_in_threadpool(
+            flight_service.search_flights, origin, destination, departure_date, limit, fields
+        )
         return flights
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-@router.get("/all", response_model=List[Flight])
+@router.get("/all", response_model=List[Flight], response_model_exclude_unset=True)
 async def get_all_flights(
     limit: int = Query(100, ge=1, le=200),
+    fields = Depends(sparse_fields(Flight)),
     flight_service: FlightService = Depends(get_flight_service)
 ):
-    """Get all flights. Public endpoint."""
+    """Get all flights; ``fields`` limits what is returned. Public endpoint."""
     try:
-        flights = flight_service.get_all_flights(limit)
+        flights = flight_service.get_all_flights(limit, fields)
         return flights
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/stream")
+async def stream_seats(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated flight IDs"),
+    flight_service: FlightService = Depends(get_flight_service)
+):
+    """
+    Stream seat availability as server-sent events. Public endpoint.
+    Sends the current ``available_seats``/``status`` of each flight, then a
+    ``seats`` event whenever one of them changes.
+    """
+    flight_ids = [i for i in dict.fromkeys(part.strip() for part in ids.split(",")) if i]
+    if not flight_ids or len(flight_ids) > STREAM_MAX_FLIGHTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 1 and {STREAM_MAX_FLIGHTS} flight IDs"
+        )
+    
+    # Subscribe before reading the current state so no change falls in between
+    try:
+        subscription = seat_broadcaster.subscribe(flight_ids)
+    except SubscriberLimitReached as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e),
+                            headers={"Retry-After": "5"})
+    try:
+        flights = [await run_in_threadpool(flight_service.get_flight, flight_id) for flight_id in flight_ids]
+    except Exception as e:
+        subscription.close()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    missing = [flight_id for flight_id, flight in zip(flight_ids, flights) if flight is None]
+    if missing:
+        subscription.close()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Flight not found: {', '.join(missing)}")
+    
+    async def events():
+        try:
+            for flight in flights:
+                state = {"flight_id": flight.id, "available_seats": flight.available_seats, "status": flight.status}
+                subscription.prime(flight.id, state)
+                yield _sse("seats", state)
+            while not await request.is_disconnected():
+                deltas = await subscription.next_deltas(timeout=STREAM_KEEPALIVE_SECONDS)
+                if not deltas:
+                    yield ": keepalive\n\n"
+                    continue
+                metrics.seat_stream_events.inc(len(deltas))
+                yield "".join(_sse("seats", delta) for delta in deltas)
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/{flight_id}", response_model=Flight)
 async def get_flight(
     flight_id: str,
@@ -58,6 +140,18 @@ async def get_flight(
     return flight
 
 
+@router.get("/{flight_id}/seats", response_model=SeatMapView)
+async def get_seat_map(
+    flight_id: str,
+    flight_service: FlightService = Depends(get_flight_service)
+):
+    """Seat map of a flight: one string per row, "." free and "X" taken. Public endpoint."""
+    seat_map = flight_service.get_seat_map(flight_id)
+    if not seat_map:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
+    return seat_map
+
+
 @router.post("/", response_model=Flight, status_code=status.HTTP_201_CREATED)
 async def create_flight(
     flight_data: FlightCreate,
@@ -91,18 +185,38 @@ async def update_flight(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-@router.delete("/{flight_id}")
+@router.delete("/{flight_id}", response_model=FlightCancellation, status_code=status.HTTP_202_ACCEPTED)
 async def cancel_flight(
     flight_id: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_company),
-    flight_service: FlightService = Depends(get_flight_service)
+    cancellation_service: CancellationService = Depends(get_cancellation_service)
 ):
-    """Cancel a flight. Requires company role."""
+    """
+    Cancel a flight. Requires company role.
+    Returns at once; its bookings are refunded in the background. Track
+    progress at GET /flights/{flight_id}/cancellation. Repeating the call
+    resumes an interrupted or failed cancellation.
+    """
     try:
-        success = flight_service.cancel_flight(flight_id)
-        if not success:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
-        return {"message": "Flight cancelled successfully"}
+        cancellation = cancellation_service.request_cancellation(flight_id, current_user.id)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    if not cancellation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
+    background_tasks.add_task(cancellation_service.run, flight_id)
+    return cancellation
+
+
+@router.get("/{flight_id}/cancellation", response_model=FlightCancellation)
+async def get_cancellation_progress(
+    flight_id: str,
+    current_user: User = Depends(require_role(UserRole.COMPANY, UserRole.ADMIN)),
+    cancellation_service: CancellationService = Depends(get_cancellation_service)
+):
+    """Refund progress of a cancelled flight. Requires company or admin role."""
+    cancellation = cancellation_service.get_progress(flight_id)
+    if not cancellation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight has no cancellation")
+    return cancellation
 
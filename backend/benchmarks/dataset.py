@@ -0,0 +1,257 @@
+"""
+Deterministic synthetic data set generator.
+
+Every flight, user and booking is a pure function of ``(seed, index)``, so a
+data set of any size can be streamed without holding it in memory, and any
+single record can be regenerated on demand (e.g. to build realistic queries
+against a seeded store). Distributions roughly follow real traffic:
+
+- routes are hub-and-spoke: most flights touch a hub, spoke-to-spoke is rare;
+- departures cluster around morning and evening banks, with busier Fridays
+  and Sundays;
+- user activity is power-law distributed, so a small share of users owns
+  most bookings.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from domain.models import FlightCreate, UserCreate, UserRole, BookingStatus
+
+# (code, latitude, longitude)
+HUBS: List[Tuple[str, float, float]] = [
+    ("ATL", 33.64, -84.43), ("ORD", 41.98, -87.90), ("DFW", 32.90, -97.04),
+    ("DEN", 39.86, -104.67), ("LHR", 51.47, -0.45), ("FRA", 50.04, 8.56),
+    ("DXB", 25.25, 55.36), ("SIN", 1.36, 103.99),
+]
+SPOKES: List[Tuple[str, float, float]] = [
+    ("JFK", 40.64, -73.78), ("LAX", 33.94, -118.41), ("SFO", 37.62, -122.38),
+    ("SEA", 47.45, -122.31), ("MIA", 25.80, -80.29), ("BOS", 42.37, -71.01),
+    ("PHX", 33.43, -112.01), ("MSP", 44.88, -93.22), ("DTW", 42.21, -83.35),
+    ("CDG", 49.01, 2.55), ("AMS", 52.31, 4.76), ("MAD", 40.49, -3.57),
+    ("FCO", 41.80, 12.25), ("IST", 41.28, 28.75), ("DOH", 25.27, 51.61),
+    ("BOM", 19.09, 72.87), ("DEL", 28.56, 77.10), ("HKG", 22.31, 113.92),
+    ("NRT", 35.77, 140.39), ("SYD", -33.94, 151.18), ("GRU", -23.43, -46.47),
+    ("MEX", 19.44, -99.07), ("YYZ", 43.68, -79.63), ("JNB", -26.14, 28.25),
+]
+AIRLINES: List[Tuple[str, str, str]] = [
+    # (company id, name, home hub)
+    ("airline-sky", "SkyWays", "ATL"), ("airline-lake", "Lakeline", "ORD"),
+    ("airline-lone", "Lone Star Air", "DFW"), ("airline-peak", "Peak Air", "DEN"),
+    ("airline-crown", "Crown Airways", "LHR"), ("airline-rhein", "Rhein Air", "FRA"),
+    ("airline-dune", "Dune Airlines", "DXB"), ("airline-strait", "Strait Air", "SIN"),
+]
+
+# Departure banks as (hour, standard deviation in hours, weight)
+DEPARTURE_BANKS = [(7.5, 1.2, 0.40), (12.5, 1.5, 0.20), (18.0, 1.5, 0.35), (22.5, 0.8, 0.05)]
+# Relative traffic per weekday, Monday first
+WEEKDAY_WEIGHTS = [1.0, 0.85, 0.9, 1.0, 1.25, 0.95, 1.2]
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie",
+               "Avery", "Quinn", "Aisha", "Wei", "Mateo", "Yuki", "Olu", "Ingrid"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Okafor", "Müller", "Rossi", "Kowalski", "Tanaka",
+              "Haddad", "Silva", "Novak", "Patel", "Larsen", "Kim", "Dubois", "Ivanova"]
+
+
+def _distance_km(a: Tuple[str, float, float], b: Tuple[str, float, float]) -> float:
+    """Great-circle distance between two airports."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[1], a[2], b[1], b[2]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(h))
+
+
+class DatasetSpec:
+    """Size and shape of a synthetic data set."""
+    
+    # Roughly today's production volume; ``scaled`` multiplies it
+    BASE_FLIGHTS = 5_000
+    BASE_USERS = 20_000
+    BASE_BOOKINGS = 60_000
+    
+    def __init__(
+        self,
+        flights: int = BASE_FLIGHTS,
+        users: int = BASE_USERS,
+        bookings: int = BASE_BOOKINGS,
+        days: int = 90,
+        seed: int = 42,
+        start_date: Optional[datetime] = None,
+        user_activity_exponent: float = 3.0
+    ):
+        self.flights = flights
+        self.users = users
+        self.bookings = bookings
+        self.days = days
+        self.seed = seed
+        self.start_date = (start_date or datetime(2026, 1, 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.user_activity_exponent = user_activity_exponent
+    
+    @classmethod
+    def scaled(cls, factor: float, **kwargs) -> "DatasetSpec":
+        """Spec at ``factor`` times the base volume (e.g. 10 or 100)."""
+        return cls(
+            flights=int(cls.BASE_FLIGHTS * factor),
+            users=int(cls.BASE_USERS * factor),
+            bookings=int(cls.BASE_BOOKINGS * factor),
+            **kwargs
+        )
+
+
+class DatasetGenerator:
+    """Streams deterministic flights, users and bookings for a ``DatasetSpec``."""
+    
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        self._routes, self._route_weights = self._build_routes()
+        self._day_weights = self._cumulative([
+            WEEKDAY_WEIGHTS[(spec.start_date + timedelta(days=d)).weekday()] for d in range(spec.days)
+        ])
+    
+    # Helpers
+    
+    def _rng(self, kind: str, index: int) -> random.Random:
+        # String seeds are hashed deterministically, independent of PYTHONHASHSEED
+        return random.Random(f"{self.spec.seed}:{kind}:{index}")
+    
+    @staticmethod
+    def _cumulative(weights: List[float]) -> List[float]:
+        total, result = 0.0, []
+        for weight in weights:
+            total += weight
+            result.append(total)
+        return result
+    
+    @staticmethod
+    def _pick(rng: random.Random, cumulative: List[float]) -> int:
+        """Index drawn proportionally to the weights behind ``cumulative``."""
+        target = rng.random() * cumulative[-1]
+        lo, hi = 0, len(cumulative) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if cumulative[mid] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _build_routes(self):
+        routes, weights = [], []
+        for hub in HUBS:
+            for other in HUBS + SPOKES:
+                if other[0] == hub[0]:
+                    continue
+                is_hub = other in HUBS
+                routes.append((hub, other))
+                weights.append(4.0 if is_hub else 10.0)
+                if not is_hub:
+                    # Return leg spoke -> hub
+                    routes.append((other, hub))
+                    weights.append(10.0)
+        for a in SPOKES:
+            for b in SPOKES:
+                if a[0] != b[0]:
+                    routes.append((a, b))
+                    weights.append(0.15)
+        return routes, self._cumulative(weights)
+    
+    def _departure(self, rng: random.Random) -> datetime:
+        day = self._pick(rng, self._day_weights)
+        banks = [w for _, _, w in DEPARTURE_BANKS]
+        hour, sigma, _ = DEPARTURE_BANKS[self._pick(rng, self._cumulative(banks))]
+        minutes = int(min(max(rng.gauss(hour, sigma), 0.0), 23.9) * 60) // 5 * 5
+        return self.spec.start_date + timedelta(days=day, minutes=minutes)
+    
+    def _user_index(self, rng: random.Random) -> int:
+        # u ** k concentrates draws on low indices: a power-law activity profile
+        return min(int(self.spec.users * rng.random() ** self.spec.user_activity_exponent), self.spec.users - 1)
+    
+    # Records
+    
+    @staticmethod
+    def flight_id(index: int) -> str:
+        return f"synthetic-flight-{index:09d}"
+    
+    @staticmethod
+    def user_id(index: int) -> str:
+        return f"synthetic-user-{index:09d}"
+    
+    @staticmethod
+    def booking_id(index: int) -> str:
+        return f"synthetic-booking-{index:010d}"
+    
+    def flight(self, index: int) -> FlightCreate:
+        """Flight number ``index`` of the data set."""
+        rng = self._rng("flight", index)
+        origin, destination = self._routes[self._pick(rng, self._route_weights)]
+        # Flights are operated by the airline whose hub they touch
+        company_id, company_name, _ = next(
+            (a for a in AIRLINES if a[2] in (origin[0], destination[0])), AIRLINES[index % len(AIRLINES)]
+        )
+        distance = _distance_km(origin, destination)
+        stops = 1 if distance > 9000 and rng.random() < 0.4 else 0
+        duration = int(distance / 800 * 60 + 30 + stops * rng.randrange(60, 180, 15))
+        departure = self._departure(rng)
+        total_seats = rng.choice([76, 150, 180, 180, 220, 300, 400] if distance > 4000 else [76, 150, 180, 180])
+        load_factor = min(max(rng.gauss(0.7, 0.2), 0.0), 1.0)
+        price = round(max(49.0, (60 + distance * 0.11) * rng.lognormvariate(0, 0.25)), 2)
+        return FlightCreate(
+            company_id=company_id,
+            company_name=company_name,
+            flight_number=f"{company_id.split('-')[1][:2].upper()}{100 + index % 9900}",
+            origin=origin[0],
+            destination=destination[0],
+            departure_time=departure,
+            arrival_time=departure + timedelta(minutes=duration),
+            duration=duration,
+            price=price,
+            available_seats=total_seats - int(total_seats * load_factor),
+            total_seats=total_seats,
+            stops=stops
+        )
+    
+    def user(self, index: int) -> UserCreate:
+        """User number ``index`` of the data set."""
+        rng = self._rng("user", index)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        role = UserRole.COMPANY if index < len(AIRLINES) else UserRole.USER
+        return UserCreate(
+            email=f"{first.lower()}.{index}@synthetic.example.com",
+            password=f"synthetic-{index}",
+            name=f"{first} {last}",
+            role=role
+        )
+    
+    def booking(self, index: int) -> Dict[str, Any]:
+        """Booking document number ``index``, shaped like ``BookingRepository`` stores it."""
+        rng = self._rng("booking", index)
+        flight_index = rng.randrange(self.spec.flights)
+        flight = self.flight(flight_index)
+        passengers = rng.choices([1, 2, 3, 4], weights=[60, 25, 9, 6])[0]
+        booked_at = flight.departure_time - timedelta(hours=rng.expovariate(1 / (24 * 21)))
+        cancelled = rng.random() < 0.06
+        doc = {
+            'user_id': self.user_id(self._user_index(rng)),
+            'flight_id': self.flight_id(flight_index),
+            'confirmation_id': f"CNF{rng.getrandbits(32):08X}",
+            'passengers': passengers,
+            'total_price': round(flight.price * passengers, 2),
+            'status': (BookingStatus.CANCELLED if cancelled else BookingStatus.CONFIRMED).value,
+            'booked_at': booked_at
+        }
+        if cancelled:
+            doc['cancelled_at'] = booked_at + timedelta(hours=rng.uniform(1, 72))
+        return doc
+    
+    # Streams
+    
+    def iter_flights(self, start: int = 0) -> Iterator[Tuple[str, FlightCreate]]:
+        for index in range(start, self.spec.flights):
+            yield self.flight_id(index), self.flight(index)
+    
+    def iter_users(self, start: int = 0) -> Iterator[Tuple[str, UserCreate]]:
+        for index in range(start, self.spec.users):
+            yield self.user_id(index), self.user(index)
+    
+    def iter_bookings(self, start: int = 0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for index in range(start, self.spec.bookings):
+            yield self.booking_id(index), self.booking(index)
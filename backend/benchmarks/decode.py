@@ -0,0 +1,108 @@
+"""
+Microbenchmark of decoding stored documents.
+
+Usage (from the backend directory):
+    python -m benchmarks.decode --documents 5000 --repeat 5
+
+Seeds an in-memory store, then times each repository's ``_to_domain`` on
+the stored documents with full validation and as a trusted read
+(``model_construct``), and the offer index's slotted records against offer
+models. Costs are the best of ``--repeat`` passes, per document.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+from infrastructure.database import InMemoryFirestore
+from infrastructure.repositories import BookingRepository, FlightRepository, OfferRepository, UserRepository
+from benchmarks.dataset import DatasetGenerator, DatasetSpec
+from benchmarks.seeder import BulkSeeder
+
+
+def stored_documents(repo) -> List[Dict[str, Any]]:
+    """Every document of the repository's collection, as ``_to_domain`` receives it."""
+    docs = []
+    for doc in repo.collection.stream():
+        doc_dict = doc.to_dict()
+        doc_dict['id'] = doc.id
+        docs.append(doc_dict)
+    return docs
+
+
+def per_document_us(decode: Callable[[Dict[str, Any]], Any], docs: List[Dict[str, Any]], repeat: int) -> float:
+    """Best-of-``repeat`` decode cost in microseconds per document."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for doc in docs:
+            decode(doc)
+        best = min(best, time.perf_counter() - started)
+    return best / max(len(docs), 1) * 1e6
+
+
+def bytes_per_document(decode: Callable[[Dict[str, Any]], Any], docs: List[Dict[str, Any]]) -> float:
+    """Memory held by the decoded objects, per document."""
+    tracemalloc.start()
+    decoded = [decode(doc) for doc in docs]
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+    return held / max(len(docs), 1)
+
+
+def run(documents: int, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    db = InMemoryFirestore()
+    spec = DatasetSpec(flights=documents, users=documents, bookings=documents, days=30, seed=seed)
+    BulkSeeder(db).seed(DatasetGenerator(spec))
+    offers = OfferRepository(db)
+    valid_until = datetime.utcnow() + timedelta(days=30)
+    for i, flight in enumerate(stored_documents(FlightRepository(db))):
+        offers.create(f"offer-{i:06d}", {'flight_id': flight['id'], 'discount': 5 + i % 30, 'valid_until': valid_until})
+    
+    results = {}
+    for repo in (UserRepository(db), FlightRepository(db), BookingRepository(db), offers):
+        docs = stored_documents(repo)
+        repo.trusted_reads = False
+        validated = per_document_us(repo._to_domain, docs, repeat)
+        repo.trusted_reads = True
+        trusted = per_document_us(repo._to_domain, docs, repeat)
+        results[repo.collection_name] = {"documents": len(docs), "validated_us": validated, "trusted_us": trusted}
+    
+    docs = stored_documents(offers)
+    offers.trusted_reads = False
+    results["offers"].update({
+        "record_us": per_document_us(offers.to_record, docs, repeat),
+        "model_bytes": bytes_per_document(offers._to_domain, docs),
+        "record_bytes": bytes_per_document(offers.to_record, docs),
+    })
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Document decode microbenchmark")
+    parser.add_argument("--documents", type=int, default=5000, help="Documents per collection")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes (best is reported)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    for collection, result in run(args.documents, args.repeat, args.seed).items():
+        line = (
+            f"{collection:<9} {result['documents']:>7,} docs  validated {result['validated_us']:>7.2f} us  "
+            f"trusted {result['trusted_us']:>6.2f} us"
+        )
+        if "record_us" in result:
+            line += (
+                f"  record {result['record_us']:.2f} us, "
+                f"{result['model_bytes']:.0f} -> {result['record_bytes']:.0f} bytes"
+            )
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+In-process benchmark harness.
+
+Drives the FastAPI application directly through its ASGI interface (no
+sockets, no external server) and aggregates latency, throughput and the
+Firestore reads reported in the ``X-Firestore-Reads`` response header.
+"""
+import asyncio
+import json
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+
+
+class RequestSpec:
+    """One HTTP request issued by a scenario."""
+    
+    __slots__ = ("method", "path", "params", "json_body", "headers", "label")
+    
+    def __init__(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                 json_body: Any = None, headers: Optional[Dict[str, str]] = None,
+                 label: Optional[str] = None):
+        self.method = method
+        self.path = path
+        self.params = params or {}
+        self.json_body = json_body
+        self.headers = headers or {}
+        self.label = label or f"{method} {path}"
+
+
+class Sample:
+    """Outcome of one request."""
+    
+    __slots__ = ("label", "status", "latency", "reads", "writes")
+    
+    def __init__(self, label: str, status: int, latency: float, reads: int, writes: int):
+        self.label = label
+        self.status = status
+        self.latency = latency
+        self.reads = reads
+        self.writes = writes
+
+
+class InProcessClient:
+    """Minimal ASGI client calling the application in the current event loop."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def request(self, spec: RequestSpec) -> Tuple[int, Dict[str, str], bytes]:
+        body = json.dumps(spec.json_body).encode() if spec.json_body is not None else b""
+        headers = [(k.lower().encode(), v.encode()) for k, v in spec.headers.items()]
+        if body:
+            headers.append((b"content-type", b"application/json"))
+            headers.append((b"content-length", str(len(body)).encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": spec.method,
+            "scheme": "http",
+            "path": spec.path,
+            "raw_path": spec.path.encode(),
+            "query_string": urlencode(spec.params, doseq=True).encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("benchmark", 80),
+        }
+        request_sent = False
+        status = 500
+        response_headers: Dict[str, str] = {}
+        chunks: List[bytes] = []
+        disconnected = asyncio.Event()
+        
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+        
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for key, value in message.get("headers", []):
+                    response_headers[key.decode("latin-1")] = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    disconnected.set()
+        
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            # Unhandled errors become a 500 in a real server as well
+            status = 500
+        return status, response_headers, b"".join(chunks)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "p50": round(percentile(ordered, 50) * 1000, 3),
+        "p95": round(percentile(ordered, 95) * 1000, 3),
+        "p99": round(percentile(ordered, 99) * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def _reads_summary(reads: List[int]) -> Dict[str, float]:
+    ordered = sorted(reads)
+    return {
+        "mean": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        "p95": percentile(ordered, 95),
+        "max": ordered[-1] if ordered else 0,
+    }
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """Aggregate samples into the result document of one scenario."""
+    by_label: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_label.setdefault(sample.label, []).append(sample)
+    
+    def block(group: List[Sample]) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for sample in group:
+            statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+        return {
+            "requests": len(group),
+            "errors": sum(1 for s in group if s.status >= 500),
+            "statuses": statuses,
+            "latency_ms": _latency_summary([s.latency for s in group]),
+            "reads_per_request": _reads_summary([s.reads for s in group]),
+            "writes_per_request": round(sum(s.writes for s in group) / len(group), 2) if group else 0.0,
+        }
+    
+    result = block(samples)
+    result["duration_s"] = round(elapsed, 3)
+    result["throughput_rps"] = round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0
+    result["endpoints"] = {label: block(group) for label, group in sorted(by_label.items())}
+    return result
+
+
+async def drive(client: InProcessClient, requests: Iterable[RequestSpec], concurrency: int) -> Tuple[List[Sample], float]:
+    """Issue requests with at most ``concurrency`` in flight; returns samples and wall time."""
+    iterator: Iterator[RequestSpec] = iter(requests)
+    samples: List[Sample] = []
+    
+    async def worker():
+        for spec in iterator:
+            start = time.perf_counter()
+            status, headers, _ = await client.request(spec)
+            latency = time.perf_counter() - start
+            samples.append(Sample(
+                spec.label,
+                status,
+                latency,
+                int(headers.get("x-firestore-reads", 0)),
+                int(headers.get("x-firestore-writes", 0)),
+            ))
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return samples, time.perf_counter() - started
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Tuple[List[str], bool]:
+    """
+    Compare two result documents scenario by scenario.
+    Returns report lines and whether any metric regressed beyond ``tolerance``
+    (a fraction, e.g. 0.10 for 10%).
+    """
+    lines: List[str] = []
+    regressed = False
+    checks: List[Tuple[str, Callable[[Dict[str, Any]], float], bool]] = [
+        ("throughput_rps", lambda r: r["throughput_rps"], True),
+        ("p50_ms", lambda r: r["latency_ms"]["p50"], False),
+        ("p95_ms", lambda r: r["latency_ms"]["p95"], False),
+        ("p99_ms", lambda r: r["latency_ms"]["p99"], False),
+        ("reads/request", lambda r: r["reads_per_request"]["mean"], False),
+    ]
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            lines.append(f"{name}: no baseline")
+            continue
+        lines.append(f"{name}:")
+        for metric, getter, higher_is_better in checks:
+            new, old = getter(result), getter(base)
+            change = (new - old) / old if old else 0.0
+            worse = (-change if higher_is_better else change) > tolerance
+            regressed = regressed or worse
+            flag = "  REGRESSION" if worse else ""
+            lines.append(f"  {metric:<15} {old:>10.2f} -> {new:>10.2f} ({change:+.1%}){flag}")
+    return lines, regressed
@@ -0,0 +1,153 @@
+"""
+Run the API benchmark suite in-process.
+
+Usage (from the backend directory):
+    python -m benchmarks.run --requests 2000 --concurrency 32 --output results.json
+    python -m benchmarks.run --baseline results.json --output new.json
+    python -m benchmarks.run --read-latency-ms 4 --read-latency-p99-ms 30 --error-rate 0.01
+
+Each scenario runs against a freshly seeded in-memory store, so no Firebase
+project or credentials are needed. The latency, error and contention options
+switch to the fault-injecting store; they apply after seeding.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+from datetime import datetime
+
+# Settings are required at import time; the benchmark never talks to Firebase
+for _name, _value in {
+    "FIREBASE_PROJECT_ID": "benchmark",
+    "FIREBASE_PRIVATE_KEY_ID": "benchmark",
+    "FIREBASE_PRIVATE_KEY": "benchmark",
+    "FIREBASE_CLIENT_EMAIL": "benchmark@example.com",
+    "FIREBASE_CLIENT_ID": "benchmark",
+    "FIREBASE_CLIENT_CERT_URL": "https://example.com/cert",
+    "SECRET_KEY": "benchmark-secret-key-not-for-production-use",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from main import app  # noqa: E402
+from infrastructure.database import (  # noqa: E402
+    FaultInjectingFirestore, FaultProfile, LatencyDistribution, get_firebase_db
+)
+from infrastructure.replicas import flight_replica, offer_index  # noqa: E402
+from infrastructure.tasks import task_queue  # noqa: E402
+from benchmarks.harness import InProcessClient, drive, summarize, compare  # noqa: E402
+from benchmarks.scenarios import SCENARIOS, seed  # noqa: E402
+
+
+def fault_profile(args) -> FaultProfile:
+    """Network behaviour requested on the command line (none by default)."""
+    return FaultProfile(
+        read_latency=LatencyDistribution(args.read_latency_ms, args.read_latency_p99_ms),
+        write_latency=LatencyDistribution(args.write_latency_ms, args.write_latency_p99_ms),
+        error_rate=args.error_rate,
+        contention_rate=args.contention_rate,
+        seed=args.seed
+    )
+
+
+async def run_scenario(name: str, args) -> dict:
+    """Seed a fresh store, warm up and measure one scenario."""
+    db = FaultInjectingFirestore()
+    app.dependency_overrides[get_firebase_db] = lambda: db
+    data = seed(db, flights=args.flights, users=args.users, seed=args.seed)
+    offer_index.start(db)
+    offer_index.wait_until_ready(timeout=30)
+    db.profile = fault_profile(args)
+    if args.replica:
+        flight_replica.start(db)
+        flight_replica.wait_until_ready(timeout=30)
+    await task_queue.start(db)
+    client = InProcessClient(app)
+    build = SCENARIOS[name]
+    
+    if args.warmup:
+        await drive(client, build(data, random.Random(args.seed + 1), args.warmup), args.concurrency)
+    samples, elapsed = await drive(client, build(data, random.Random(args.seed), args.requests), args.concurrency)
+    await task_queue.stop()
+    app.dependency_overrides.pop(get_firebase_db, None)
+    flight_replica.stop()
+    offer_index.stop()
+    return summarize(samples, elapsed)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="In-process API benchmarks")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=200, help="Unmeasured warm-up requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    parser.add_argument("--flights", type=int, default=500, help="Seeded flights")
+    parser.add_argument("--users", type=int, default=200, help="Seeded users")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--read-latency-ms", type=float, default=0.0, help="Median Firestore read latency")
+    parser.add_argument("--read-latency-p99-ms", type=float, help="99th percentile Firestore read latency")
+    parser.add_argument("--write-latency-ms", type=float, default=0.0, help="Median Firestore commit latency")
+    parser.add_argument("--write-latency-p99-ms", type=float, help="99th percentile Firestore commit latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of RPCs failing with 503")
+    parser.add_argument("--contention-rate", type=float, default=0.0,
+                        help="Chance a commit on a recently written document aborts")
+    parser.add_argument("--replica", action="store_true", help="Serve flight reads from the local replica")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous results file")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative regression before failing (default 0.10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    names = args.scenario or list(SCENARIOS)
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "flights": args.flights,
+            "users": args.users,
+            "seed": args.seed,
+            "read_latency_ms": [args.read_latency_ms, args.read_latency_p99_ms],
+            "write_latency_ms": [args.write_latency_ms, args.write_latency_p99_ms],
+            "error_rate": args.error_rate,
+            "contention_rate": args.contention_rate,
+            "replica": args.replica,
+        },
+        "scenarios": {},
+    }
+    
+    for name in names:
+        result = asyncio.run(run_scenario(name, args))
+        results["scenarios"][name] = result
+        latency = result["latency_ms"]
+        print(
+            f"{name:<15} {result['throughput_rps']:>9.1f} req/s  "
+            f"p50 {latency['p50']:>8.2f} ms  p95 {latency['p95']:>8.2f} ms  p99 {latency['p99']:>8.2f} ms  "
+            f"reads/req {result['reads_per_request']['mean']:>7.2f}  errors {result['errors']}"
+        )
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressed = compare(results, baseline, args.tolerance)
+        print("\n".join(lines))
+        if regressed:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
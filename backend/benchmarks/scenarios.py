@@ -0,0 +1,164 @@
+"""Benchmark data set and request mixes."""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+from core.security import TokenManager
+from domain.models import UserRole
+from infrastructure.repositories import FlightRepository, UserRepository, OfferRepository
+from benchmarks.dataset import DatasetGenerator, DatasetSpec
+from benchmarks.harness import RequestSpec
+from benchmarks.seeder import BulkSeeder, flight_document, user_document
+
+
+class BenchmarkData:
+    """Identifiers and credentials of the seeded data set."""
+    
+    def __init__(self):
+        self.flights: List[Dict] = []
+        self.user_ids: List[str] = []
+        self.user_tokens: List[str] = []  # of the users in ``user_ids``, in the same order
+        self.admin_token: str = ""
+        self.hot_flight_id: str = ""
+        self.base_date: datetime = datetime.utcnow()
+
+
+def _token(user_id: str, email: str, role: UserRole) -> str:
+    return TokenManager.create_access_token(
+        data={"sub": user_id, "email": email, "role": role.value},
+        expires_delta=timedelta(hours=12)
+    )
+
+
+def seed(db, flights: int = 500, users: int = 200, seed: int = 42) -> BenchmarkData:
+    """Populate ``db`` through the repositories with a deterministic synthetic data set."""
+    data = BenchmarkData()
+    data.base_date = (datetime.utcnow() + timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
+    generator = DatasetGenerator(DatasetSpec(
+        flights=flights, users=users, bookings=0, days=14, seed=seed, start_date=data.base_date
+    ))
+    seeder = BulkSeeder(db)
+    
+    def flight_stream():
+        for flight_id, flight in generator.iter_flights():
+            data.flights.append({
+                "id": flight_id,
+                "origin": flight.origin,
+                "destination": flight.destination,
+                "departure": flight.departure_time
+            })
+            yield flight_id, flight_document(flight)
+    
+    def user_stream():
+        for user_id, user in generator.iter_users():
+            if user.role == UserRole.USER:
+                data.user_ids.append(user_id)
+                data.user_tokens.append(_token(user_id, user.email, user.role))
+            yield user_id, user_document(user)
+    
+    seeder.load(FlightRepository(db), flight_stream())
+    seeder.load(UserRepository(db), user_stream())
+    
+    # A flash-sale flight with plenty of seats for the booking burst
+    data.hot_flight_id = "bench-flight-hot"
+    FlightRepository(db).create(data.hot_flight_id, {
+        'company_id': "airline-sky",
+        'company_name': "SkyWays",
+        'flight_number': "SK0001",
+        'origin': "ATL",
+        'destination': "LAX",
+        'departure_time': data.base_date,
+        'arrival_time': data.base_date + timedelta(hours=5),
+        'duration': 300,
+        'price': 199.0,
+        'available_seats': 1_000_000,
+        'total_seats': 1_000_000,
+        'stops': 0,
+        'status': "scheduled"
+    })
+    
+    # Offers on every tenth flight and on the flash-sale flight
+    offer_repo = OfferRepository(db)
+    for i, flight in enumerate(data.flights[::10] + [{"id": data.hot_flight_id}]):
+        offer_repo.create(f"bench-offer-{i:06d}", {
+            'flight_id': flight["id"],
+            'discount': float(5 + (i * 7) % 30),
+            'valid_until': data.base_date + timedelta(days=30),
+            'active': True
+        })
+    
+    admin_id = "bench-admin"
+    UserRepository(db).create(admin_id, {'email': "admin@bench.example.com", 'name': "Admin", 'role': UserRole.ADMIN.value, 'blocked': False})
+    data.admin_token = _token(admin_id, "admin@bench.example.com", UserRole.ADMIN)
+    return data
+
+
+def _auth(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def search_heavy(data: BenchmarkData, rng: random.Random, count: int) -> Iterator[RequestSpec]:
+    """Browsing traffic: route searches, flight details and the full listing."""
+    for _ in range(count):
+        roll = rng.random()
+        flight = rng.choice(data.flights)
+        if roll < 0.45:
+            yield RequestSpec("GET", "/api/flights/", {
+                "origin": flight["origin"], "destination": flight["destination"]
+            }, label="GET /api/flights/ (route)")
+        elif roll < 0.70:
+            yield RequestSpec("GET", "/api/flights/", {
+                "origin": flight["origin"],
+                "destination": flight["destination"],
+                "departure_date": flight["departure"].date().isoformat() + "T00:00:00"
+            }, label="GET /api/flights/ (route+date)")
+        elif roll < 0.95:
+            yield RequestSpec("GET", f"/api/flights/{flight['id']}", label="GET /api/flights/{flight_id}")
+        else:
+            yield RequestSpec("GET", "/api/flights/all", {"limit": 100}, label="GET /api/flights/all")
+
+
+def search_herd(data: BenchmarkData, rng: random.Random, count: int) -> Iterator[RequestSpec]:
+    """Sale announcement: most users run the very same route and date search."""
+    hot = data.flights[0]
+    for _ in range(count):
+        flight = hot if rng.random() < 0.9 else rng.choice(data.flights)
+        yield RequestSpec("GET", "/api/flights/", {
+            "origin": flight["origin"],
+            "destination": flight["destination"],
+            "departure_date": flight["departure"].date().isoformat() + "T00:00:00"
+        }, label="GET /api/flights/ (route+date)")
+
+
+def booking_burst(data: BenchmarkData, rng: random.Random, count: int) -> Iterator[RequestSpec]:
+    """Flash sale: many users booking the same flight, some checking their bookings."""
+    for _ in range(count):
+        token = rng.choice(data.user_tokens)
+        if rng.random() < 0.85:
+            yield RequestSpec("POST", "/api/bookings/", json_body={
+                "flight_id": data.hot_flight_id, "passengers": rng.choice([1, 1, 2, 3])
+            }, headers=_auth(token), label="POST /api/bookings/")
+        else:
+            yield RequestSpec("GET", "/api/bookings/my-bookings", headers=_auth(token),
+                              label="GET /api/bookings/my-bookings")
+
+
+def admin_listing(data: BenchmarkData, rng: random.Random, count: int) -> Iterator[RequestSpec]:
+    """Back-office traffic: user tables, user details and flight listings."""
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.5:
+            yield RequestSpec("GET", "/api/admin/users", headers=_auth(data.admin_token), label="GET /api/admin/users")
+        elif roll < 0.8:
+            user_id = rng.choice(data.user_ids)
+            yield RequestSpec("GET", f"/api/admin/users/{user_id}", headers=_auth(data.admin_token),
+                              label="GET /api/admin/users/{user_id}")
+        else:
+            yield RequestSpec("GET", "/api/flights/all", {"limit": 200}, label="GET /api/flights/all")
+
+
+SCENARIOS = {
+    "search": search_heavy,
+    "search_herd": search_herd,
+    "booking_burst": booking_burst,
+    "admin_listing": admin_listing,
+}
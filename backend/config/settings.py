@@ -1,21 +1,35 @@
 """Application configuration using Pydantic Settings."""
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
     
-    # Firebase Configuration
-    firebase_project_id: str
-    firebase_private_key_id: str
-    firebase_private_key: str
-    firebase_client_email: str
-    firebase_client_id: str
+    # Backend: "firebase" for the real project, "fake" for the in-process stand-in
+    firebase_backend: str = "firebase"
+    
+    # Firebase Configuration (required when firebase_backend is "firebase")
+    firebase_project_id: str = ""
+    firebase_private_key_id: str = ""
+    firebase_private_key: str = ""
+    firebase_client_email: str = ""
+    firebase_client_id: str = ""
     firebase_auth_uri: str = "https://accounts.google.com/o/oauth2/auth"
     firebase_token_uri: str = "https://oauth2.googleapis.com/token"
     firebase_auth_provider_cert_url: str = "https://www.googleapis.com/oauth2/v1/certs"
-    firebase_client_cert_url: str
+    firebase_client_cert_url: str = ""
+    
+    # Fake backend network behaviour (latencies in milliseconds, rates in 0..1)
+    fake_read_latency_ms: float = 0.0
+    fake_read_latency_p99_ms: Optional[float] = None
+    fake_write_latency_ms: float = 0.0
+    fake_write_latency_p99_ms: Optional[float] = None
+    fake_error_rate: float = 0.0
+    fake_contention_rate: float = 0.0  # chance a commit on a recently written document aborts
+    fake_contention_window_ms: float = 1000.0
+    fake_seed: Optional[int] = None
     
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -27,6 +41,74 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Firestore read budgets per request
+    # READ_BUDGET_ROUTES is a JSON object keyed by route template,
+    # e.g. {"/api/bookings/my-bookings": 200}
+    read_budget_default: Optional[int] = None
+    read_budget_routes: Dict[str, int] = {}
+    read_budget_action: str = "log"  # "log" or "reject"
+    
+    # Tracing
+    tracing_sample_rate: float = 0.0  # fraction of new traces recorded
+    tracing_exporter: str = "none"  # "none", "log" or "jsonl"
+    tracing_jsonl_path: str = "traces.jsonl"
+    
+    # Flight replica served from a snapshot listener
+    flight_replica_enabled: bool = False
+    flight_replica_max_staleness_seconds: float = 5.0
+    
+    # Seat availability stream
+    seat_stream_max_subscribers: int = 10000  # per worker
+    
+    # Repricing fare curves as JSON keyed by company_id, with an optional
+    # "default", e.g. {"default": {"max_multiplier": 2.5}, "airline-sky": {...}}
+    repricing_fare_curves: Dict[str, Dict[str, Any]] = {}
+    
+    # Background jobs (one worker per deployment runs each, via a lease). The
+    # seat hold and flight cancellation sweeps always run; this enables the others
+    scheduler_enabled: bool = False
+    scheduler_lease_seconds: float = 90.0
+    flight_lifecycle_interval_seconds: float = 60.0
+    flight_lifecycle_page_size: int = 300
+    flight_cancellation_sweep_seconds: float = 30.0  # resume interrupted cancellations
+    
+    # Background task queue (notifications, audit entries)
+    task_workers: int = 4
+    task_max_attempts: int = 5
+    task_backoff_seconds: float = 1.0  # doubled per attempt, with jitter
+    task_poll_seconds: float = 2.0
+    
+    # Bookings of one flight are committed in batches of at most this many
+    booking_lane_max_batch: int = 50
+    
+    # Checkout seat holds
+    seat_hold_minutes: float = 10.0
+    hold_reaper_tick_seconds: float = 1.0
+    seat_hold_sweep_seconds: float = 60.0  # store sweep for holds no worker is tracking
+    
+    # Validate every stored document read, also where repositories trust them (users)
+    repository_validate_reads: bool = False
+    
+    # Profiling
+    profiler_cooldown_seconds: float = 30.0  # minimum gap between sessions
+    
+    @model_validator(mode="after")
+    def check_firebase_credentials(self) -> "Settings":
+        """Credentials are only required when talking to a real project."""
+        if self.firebase_backend not in ("firebase", "fake"):
+            raise ValueError("firebase_backend must be 'firebase' or 'fake'")
+        if self.firebase_backend == "firebase":
+            missing = [
+                name for name in (
+                    "firebase_project_id", "firebase_private_key_id", "firebase_private_key",
+                    "firebase_client_email", "firebase_client_id", "firebase_client_cert_url"
+                )
+                if not getattr(self, name)
+            ]
+            if missing:
+                raise ValueError(f"Missing Firebase configuration: {', '.join(missing)}")
+        return self
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,18 +1,24 @@
 """Core package containing security and dependencies."""
 from .security import PasswordHasher, TokenManager
+from .single_flight import SingleFlight
+from .lanes import BatchingLanes
 from .dependencies import (
     get_current_user,
     get_current_admin,
     get_current_company,
-    require_role
+    require_role,
+    sparse_fields
 )
 
 __all__ = [
     "PasswordHasher",
     "TokenManager",
+    "SingleFlight",
+    "BatchingLanes",
     "get_current_user",
     "get_current_admin",
     "get_current_company",
-    "require_role"
+    "require_role",
+    "sparse_fields"
 ]
 
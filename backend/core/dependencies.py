@@ -1,15 +1,18 @@
 """FastAPI dependencies for authentication and authorization."""
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+from typing import FrozenSet, Optional, Type
+from fastapi import Depends, HTTPException, Query, status
+from pydantic import BaseModel
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from domain.models import User, UserRole
 from infrastructure.database import get_firebase_db
 from infrastructure.repositories import UserRepository
 from core.security import TokenManager
+from observability import traced
 
 security = HTTPBearer()
 
 
+@traced("get_current_user")
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db = Depends(get_firebase_db)
@@ -98,3 +101,25 @@ async def get_current_user_or_company(current_user: User = Depends(get_current_u
         )
     return current_user
 
+
+def sparse_fields(model: Type[BaseModel]):
+    """
+    Dependency factory for a ``fields`` query parameter: comma-separated
+    field names of ``model`` to return, always with ``id``. None when absent.
+    Usage: fields = Depends(sparse_fields(Flight))
+    """
+    def parse_fields(
+        fields: Optional[str] = Query(None, description=f"Comma-separated {model.__name__} fields to return")
+    ) -> Optional[FrozenSet[str]]:
+        if not fields:
+            return None
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(names - set(model.model_fields))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        return frozenset(names | {'id'})
+    
+    return parse_fields
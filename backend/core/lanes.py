@@ -0,0 +1,116 @@
+"""Per-key serialized lanes that hand queued work over in batches."""
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List
+from observability import metrics, cost, tracer
+
+
+class _Request:
+    """One submitted item and its outcome."""
+    
+    __slots__ = ("item", "handler", "wake", "finished", "leads", "outcome", "batch_size", "share")
+    
+    def __init__(self, item: Any, handler: Callable):
+        self.item = item
+        self.handler = handler
+        self.wake = threading.Event()
+        self.finished = False
+        self.leads = False
+        self.outcome: Any = None
+        self.batch_size = 0
+        self.share: Dict[str, Dict[str, int]] = {}
+
+
+class _Lane:
+    __slots__ = ("queue", "busy")
+    
+    def __init__(self):
+        self.queue: Deque[_Request] = deque()
+        self.busy = False
+
+
+class BatchingLanes:
+    """
+    Runs work one batch at a time per key.
+    Items submitted for the same key queue in that key's lane. One caller at
+    a time drains the lane, handing up to ``max_batch`` queued items to
+    ``handler(key, items)``, which returns one outcome per item: a result,
+    or an exception to raise in that item's caller. Items that arrive while
+    a batch runs make up the next one, so the busier a key is the larger its
+    batches get. When a caller's own item is done it passes the lane to the
+    next waiting caller. Different keys never wait on each other.
+    A batch runs the handler of its first item; callers of one key are
+    expected to submit the same one. It runs on the draining caller's
+    thread, so its Firestore reads and writes are tallied apart and split
+    evenly over the request costs of the batch's callers.
+    """
+    
+    def __init__(self, name: str, max_batch: int = 50):
+        self.name = name
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._lanes: Dict[Hashable, _Lane] = {}
+    
+    def submit(self, key: Hashable, item: Any, handler: Callable[[Hashable, List[Any]], List[Any]]) -> Any:
+        """Queue ``item`` in the lane of ``key`` and return its outcome once its batch ran."""
+        request = _Request(item, handler)
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = self._lanes[key] = _Lane()
+            lane.queue.append(request)
+            request.leads = not lane.busy
+            lane.busy = True
+        
+        if not request.leads:
+            request.wake.wait()
+        if request.leads:
+            self._drain(key, lane, request)
+        # Back in this caller's own context: take its share of the batch
+        cost.charge(request.share)
+        span = tracer.current_span()
+        if span is not None:
+            span.set_attribute("lane.batch_size", request.batch_size)
+        if isinstance(request.outcome, BaseException):
+            raise request.outcome
+        return request.outcome
+    
+    def _drain(self, key: Hashable, lane: _Lane, own: _Request):
+        while True:
+            with self._lock:
+                if not lane.queue:
+                    lane.busy = False
+                    del self._lanes[key]
+                    return
+                if own.finished:
+                    # Done with our own item: the next caller in line drains
+                    successor = lane.queue[0]
+                    successor.leads = True
+                    successor.wake.set()
+                    return
+                batch = [lane.queue.popleft() for _ in range(min(len(lane.queue), self.max_batch))]
+            self._run(key, batch)
+    
+    def _run(self, key: Hashable, batch: List[_Request]):
+        metrics.lane_batch_size.labels(self.name).observe(len(batch))
+        tally = cost.RequestCost()
+        token = cost.bind_cost(tally)
+        try:
+            outcomes = batch[0].handler(key, [request.item for request in batch])
+            if len(outcomes) != len(batch):
+                raise RuntimeError(f"Lane handler returned {len(outcomes)} outcomes for {len(batch)} items")
+        except BaseException as e:
+            outcomes = [e] * len(batch)
+        finally:
+            cost.unbind_cost(token)
+        for request, outcome, share in zip(batch, outcomes, tally.split(len(batch))):
+            request.outcome = outcome
+            request.batch_size = len(batch)
+            request.share = share
+            request.finished = True
+            request.wake.set()
+    
+    def active(self) -> int:
+        """Number of keys with queued or running work."""
+        with self._lock:
+            return len(self._lanes)
@@ -0,0 +1,69 @@
+"""Single-flight coalescing of identical concurrent calls."""
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple, Type
+from observability import metrics
+
+
+class _Call:
+    """One in-flight call and its outcome."""
+    
+    __slots__ = ("done", "result", "error", "followers")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+    Callers arriving while a call for their key is in flight wait for it and
+    receive the same result (or exception) instead of repeating the work.
+    Exceptions of the ``caller_errors`` types belong to the caller that ran
+    the call (e.g. its own read budget), not to the call: waiting callers
+    then make the call again themselves. Nothing is cached: once the call
+    returns, the next caller starts a new one.
+    """
+    
+    def __init__(self, group: str, caller_errors: Tuple[Type[BaseException], ...] = ()):
+        self.group = group
+        self.caller_errors = caller_errors
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+    
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` or join the in-flight call for ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+        metrics.record_coalesced_call(self.group, leader)
+        
+        if not leader:
+            call.done.wait()
+            if isinstance(call.error, self.caller_errors):
+                return self.do(key, fn, *args, **kwargs)
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def in_flight(self) -> int:
+        """Number of distinct keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
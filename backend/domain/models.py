@@ -1,8 +1,8 @@
 """Domain models representing business entities."""
 from datetime import datetime
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, Field, EmailStr
+from typing import Any, Dict, List, Optional, Type
+from pydantic import BaseModel, Field, EmailStr, create_model
 
 
 class UserRole(str, Enum):
@@ -26,6 +26,40 @@ class BookingStatus(str, Enum):
     REFUNDED = "refunded"
 
 
+class CancellationStatus(str, Enum):
+    """Progress of a cascading flight cancellation."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class TaskStatus(str, Enum):
+    """Lifecycle of a background task."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    DEAD = "dead"  # out of attempts, kept for inspection and manual retry
+
+
+class HoldStatus(str, Enum):
+    """Lifecycle of a checkout seat hold."""
+    ACTIVE = "active"
+    CONVERTED = "converted"  # turned into a booking
+    RELEASED = "released"  # given up by the user
+    EXPIRED = "expired"
+
+
+def partial_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Subclass of ``model`` with every field optional, for sparse fieldsets.
+    Its instances pass a ``model`` response model as they are, and with
+    ``exclude_unset`` carry only the fields that were read.
+    """
+    fields = {name: (Optional[field.annotation], None) for name, field in model.model_fields.items()}
+    return create_model(f"{model.__name__}Fields", __base__=model, **fields)
+
+
 class User(BaseModel):
     """User domain model."""
     id: str
@@ -69,6 +103,8 @@ class Flight(BaseModel):
     stops: int = 0
     status: FlightStatus = FlightStatus.SCHEDULED
     created_at: datetime
+    effective_price: Optional[float] = None  # price after the best active offer
+    offer_id: Optional[str] = None
     
     class Config:
         use_enum_values = True
@@ -85,12 +121,19 @@ class Booking(BaseModel):
     status: BookingStatus = BookingStatus.CONFIRMED
     booked_at: datetime
     cancelled_at: Optional[datetime] = None
+    offer_id: Optional[str] = None
+    seats: List[str] = Field(default_factory=list)  # assigned seat labels, e.g. ["12A", "12B"]
     flight: Optional[Flight] = None
     
     class Config:
         use_enum_values = True
 
 
+# Sparse fieldsets of list endpoints (``?fields=``)
+UserFields = partial_model(User)
+FlightFields = partial_model(Flight)
+
+
 class Banner(BaseModel):
     """Banner domain model for landing page."""
     id: str
@@ -122,6 +165,156 @@ class Offer(BaseModel):
         use_enum_values = True
 
 
+class FlightCancellation(BaseModel):
+    """Checkpointed progress of refunding the bookings of a cancelled flight."""
+    id: str  # the flight ID
+    status: CancellationStatus = CancellationStatus.PENDING
+    requested_by: Optional[str] = None
+    bookings_refunded: int = 0
+    amount_refunded: float = 0.0
+    pages: int = 0
+    last_booking_id: Optional[str] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        use_enum_values = True
+
+
+class SeatHold(BaseModel):
+    """Seats taken off sale for one user while they check out."""
+    id: str
+    user_id: str
+    flight_id: str
+    passengers: int
+    total_price: float
+    offer_id: Optional[str] = None
+    status: HoldStatus = HoldStatus.ACTIVE
+    expires_at: datetime
+    booking_id: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        use_enum_values = True
+
+
+class WaitlistEntry(BaseModel):
+    """A request waiting for seats on a full flight."""
+    id: str
+    flight_id: str
+    user_id: str
+    passengers: int
+    priority: int = 0  # higher is served first; first come, first served within a priority
+    joined_at: datetime
+    position: Optional[int] = None  # 1-based place in the queue
+
+
+class Task(BaseModel):
+    """Durable record of a background task."""
+    id: str
+    name: str
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    status: TaskStatus = TaskStatus.PENDING
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: datetime
+    claimed_by: Optional[str] = None
+    claim_expires_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        use_enum_values = True
+
+
+class Notification(BaseModel):
+    """Outgoing message queued for delivery to a user."""
+    id: str
+    user_id: str
+    channel: str = "email"
+    recipient: str
+    subject: str
+    body: str
+    kind: str
+    reference_id: Optional[str] = None
+    created_at: datetime
+
+
+class SeatMapView(BaseModel):
+    """Seat map of a flight as shown to customers."""
+    flight_id: str
+    layout: str  # seat columns, spaces for aisles
+    rows: List[str]  # per row: "." free, "X" occupied
+    free_seats: int
+    total_seats: int
+
+
+class PlatformStats(BaseModel):
+    """Platform-wide counters shown in the admin panel."""
+    users_total: int = 0
+    users_by_role: Dict[str, int] = Field(default_factory=dict)
+    users_blocked: int = 0
+    flights_total: int = 0
+    flights_by_status: Dict[str, int] = Field(default_factory=dict)
+    bookings_total: int = 0
+    bookings_by_status: Dict[str, int] = Field(default_factory=dict)
+    revenue_gross: float = 0.0
+    revenue_net: float = 0.0  # confirmed bookings only
+
+
+class FlightRollup(BaseModel):
+    """Sales of one flight, maintained with each booking write."""
+    flight_id: str
+    company_id: Optional[str] = None
+    flight_number: Optional[str] = None
+    departure_date: Optional[str] = None  # YYYY-MM-DD, UTC
+    total_seats: int = 0
+    bookings: int = 0
+    seats_sold: int = 0
+    cancellations: int = 0
+    cancelled_seats: int = 0
+    gross_revenue: float = 0.0
+    net_revenue: float = 0.0  # confirmed bookings only
+    load_factor: float = 0.0
+
+
+class CompanyDayRollup(BaseModel):
+    """Sales of a company's flights departing on one day."""
+    company_id: str
+    date: str  # YYYY-MM-DD, UTC
+    flights: int = 0
+    cancelled_flights: int = 0
+    seats_offered: int = 0
+    bookings: int = 0
+    seats_sold: int = 0
+    cancellations: int = 0
+    cancelled_seats: int = 0
+    gross_revenue: float = 0.0
+    net_revenue: float = 0.0
+    load_factor: float = 0.0
+
+
+class CompanyDashboard(BaseModel):
+    """Company sales over a range of departure days."""
+    company_id: str
+    start_date: str
+    end_date: str
+    seats_offered: int = 0
+    seats_sold: int = 0
+    cancellations: int = 0
+    gross_revenue: float = 0.0
+    net_revenue: float = 0.0
+    load_factor: float = 0.0
+    days: List[CompanyDayRollup] = Field(default_factory=list)
+    flights: List[FlightRollup] = Field(default_factory=list)
+
+
 # Request/Response DTOs
 class UserCreate(BaseModel):
     """DTO for creating a new user."""
@@ -164,6 +357,25 @@ class BookingCreate(BaseModel):
     """DTO for creating a new booking."""
     flight_id: str
     passengers: int
+    seats: Optional[List[str]] = None  # chosen seats; assigned automatically when omitted
+
+
+class SeatHoldCreate(BaseModel):
+    """DTO for holding seats during checkout."""
+    flight_id: str
+    passengers: int
+
+
+class WaitlistCreate(BaseModel):
+    """DTO for joining a flight's waitlist."""
+    flight_id: str
+    passengers: int
+    priority: int = 0  # honoured for company and admin users only
+
+
+class HoldConfirm(BaseModel):
+    """DTO for confirming a seat hold."""
+    seats: Optional[List[str]] = None  # chosen seats; assigned automatically when omitted
 
 
 class BannerCreate(BaseModel):
@@ -0,0 +1,24 @@
+"""
+Slotted internal records.
+
+In-memory indexes hold many entities for as long as the process runs and
+only look at a few of their fields. A slotted record takes a fraction of a
+Pydantic model's memory and is built without validation.
+"""
+from datetime import datetime
+from typing import Any, Dict
+
+
+class OfferRecord:
+    """The fields of a stored offer that the offer index works with."""
+    
+    __slots__ = ("id", "flight_id", "discount", "valid_until")
+    
+    def __init__(self, id: str, flight_id: str, discount: float, valid_until: datetime):
+        self.id = id
+        self.flight_id = flight_id
+        self.discount = discount
+        self.valid_until = valid_until  # naive UTC
+    
+    def __repr__(self) -> str:
+        return f"OfferRecord({self.id!r}, {self.flight_id!r}, {self.discount!r}, {self.valid_until!r})"
@@ -0,0 +1,159 @@
+"""
+Compact cabin seat map.
+
+Seats are numbered row by row following a layout string such as
+``"ABC DEF"``: letters are seat columns, spaces are aisles. Occupancy is one
+bit per seat held in a Python int, so a 400-seat cabin is stored in 50
+bytes, and free-seat searches work on a whole row's bits at a time with
+shifts and masks rather than seat by seat.
+"""
+import re
+from typing import Iterable, List, Optional, Tuple
+
+DEFAULT_LAYOUT = "ABC DEF"
+
+_LABEL = re.compile(r"^(\d+)([A-Z])$")
+
+
+class SeatMap:
+    """Layout and occupancy of one flight's cabin."""
+    
+    __slots__ = ("layout", "columns", "per_row", "seats", "rows", "_occupied", "_blocks")
+    
+    def __init__(self, layout: str, seats: int, occupied: int = 0):
+        columns = layout.replace(" ", "")
+        if not columns or not columns.isalpha() or not columns.isupper() or len(set(columns)) != len(columns):
+            raise ValueError(f"Invalid seat layout {layout!r}")
+        if seats < 0:
+            raise ValueError("Seat count cannot be negative")
+        self.layout = layout
+        self.columns = columns
+        self.per_row = len(columns)
+        self.seats = seats
+        self.rows = -(-seats // self.per_row)
+        self._occupied = occupied & ((1 << seats) - 1)
+        # (first column, width) of each run of columns between aisles
+        self._blocks: List[Tuple[int, int]] = []
+        offset = 0
+        for block in layout.split():
+            self._blocks.append((offset, len(block)))
+            offset += len(block)
+    
+    @classmethod
+    def empty(cls, seats: int, taken: int = 0, layout: str = DEFAULT_LAYOUT) -> "SeatMap":
+        """A cabin of ``seats`` seats whose first ``taken`` seats are occupied."""
+        return cls(layout, seats, (1 << max(0, min(taken, seats))) - 1)
+    
+    @classmethod
+    def from_bytes(cls, layout: str, seats: int, data: bytes) -> "SeatMap":
+        """Rebuild a map stored with ``to_bytes``."""
+        return cls(layout, seats, int.from_bytes(data, "little"))
+    
+    def to_bytes(self) -> bytes:
+        """Occupancy bitmap, one bit per seat, little-endian."""
+        return self._occupied.to_bytes((self.seats + 7) // 8, "little")
+    
+    @property
+    def free_count(self) -> int:
+        return self.seats - self._occupied.bit_count()
+    
+    def label(self, index: int) -> str:
+        """Seat label of a seat index, e.g. ``12C``."""
+        return f"{index // self.per_row + 1}{self.columns[index % self.per_row]}"
+    
+    def index(self, label: str) -> int:
+        """Seat index of a label; ValueError for seats not in this cabin."""
+        match = _LABEL.match(label.strip().upper())
+        if match is None or match.group(2) not in self.columns:
+            raise ValueError(f"Unknown seat {label!r}")
+        index = (int(match.group(1)) - 1) * self.per_row + self.columns.index(match.group(2))
+        if not 0 <= index < self.seats or int(match.group(1)) < 1:
+            raise ValueError(f"Unknown seat {label!r}")
+        return index
+    
+    def is_free(self, index: int) -> bool:
+        return not (self._occupied >> index) & 1
+    
+    def _row_free(self, row: int) -> int:
+        """Bits of the free seats of ``row``, column 0 lowest."""
+        width = min(self.per_row, self.seats - row * self.per_row)
+        return ~(self._occupied >> (row * self.per_row)) & ((1 << width) - 1)
+    
+    @staticmethod
+    def _run_start(free: int, count: int) -> int:
+        """Lowest bit starting ``count`` consecutive set bits of ``free``, or -1."""
+        runs = free
+        for shift in range(1, count):
+            runs &= free >> shift
+        return (runs & -runs).bit_length() - 1 if runs else -1
+    
+    def find_adjacent(self, count: int) -> Optional[List[int]]:
+        """
+        The frontmost ``count`` side-by-side free seats of one row, preferring
+        seats between the same aisles over a group split by an aisle.
+        None when no row has them.
+        """
+        if count < 1 or count > self.per_row:
+            return None
+        across_aisle = None
+        for row in range(self.rows):
+            free = self._row_free(row)
+            if free.bit_count() < count:
+                continue
+            base = row * self.per_row
+            for offset, width in self._blocks:
+                if width >= count:
+                    start = self._run_start((free >> offset) & ((1 << width) - 1), count)
+                    if start >= 0:
+                        return list(range(base + offset + start, base + offset + start + count))
+            if across_aisle is None:
+                start = self._run_start(free, count)
+                if start >= 0:
+                    across_aisle = list(range(base + start, base + start + count))
+        return across_aisle
+    
+    def allocate(self, count: int) -> List[int]:
+        """Occupy ``count`` seats, together if possible, else the frontmost free ones."""
+        if count > self.free_count:
+            raise ValueError(f"Only {self.free_count} seats left on the seat map")
+        indices = self.find_adjacent(count)
+        if indices is None:
+            free = ~self._occupied & ((1 << self.seats) - 1)
+            indices = []
+            while len(indices) < count:
+                lowest = free & -free
+                indices.append(lowest.bit_length() - 1)
+                free ^= lowest
+        self.occupy(indices)
+        return indices
+    
+    def occupy(self, indices: Iterable[int]):
+        """Mark seats occupied; ValueError (and no change) if any is taken."""
+        mask = 0
+        for index in indices:
+            if not self.is_free(index) or (mask >> index) & 1:
+                raise ValueError(f"Seat {self.label(index)} is not available")
+            mask |= 1 << index
+        self._occupied |= mask
+    
+    def release(self, indices: Iterable[int]):
+        """Mark seats free again."""
+        for index in indices:
+            self._occupied &= ~(1 << index)
+    
+    def rows_view(self) -> List[str]:
+        """One string per row in layout form: ``.`` free, ``X`` occupied, spaces for aisles."""
+        view = []
+        for row in range(self.rows):
+            free, column, cells = self._row_free(row), 0, []
+            for char in self.layout:
+                if char == " ":
+                    cells.append(" ")
+                    continue
+                if row * self.per_row + column >= self.seats:
+                    cells.append(" ")
+                else:
+                    cells.append("." if (free >> column) & 1 else "X")
+                column += 1
+            view.append("".join(cells).rstrip())
+        return view
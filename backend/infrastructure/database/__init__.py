@@ -1,5 +1,8 @@
 """Database infrastructure package."""
 from .firebase_connection import FirebaseConnection, get_firebase_db, get_firebase_auth
+from .memory_firestore import InMemoryFirestore
+from .fake_firebase import LatencyDistribution, FaultProfile, FaultInjectingFirestore, FakeFirebaseAuth
 
-__all__ = ["FirebaseConnection", "get_firebase_db", "get_firebase_auth"]
+__all__ = ["FirebaseConnection", "get_firebase_db", "get_firebase_auth", "InMemoryFirestore",
+    "LatencyDistribution", "FaultProfile", "FaultInjectingFirestore", "FakeFirebaseAuth"]
 
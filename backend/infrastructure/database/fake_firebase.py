@@ -0,0 +1,231 @@
+"""
+Fault-injecting fakes of Firestore and Firebase Auth.
+
+``FaultInjectingFirestore`` wraps the in-memory store with the behaviour of a
+remote database: every RPC waits for a sampled network latency and can fail
+with ``ServiceUnavailable``, and commits that touch a recently written document
+can fail with ``Aborted`` like Firestore does under write contention.
+Snapshot listeners see changes one sampled write latency late.
+``FakeFirebaseAuth`` mirrors the ``firebase_admin.auth`` functions the services
+use. Together they let caches, batching and retries be measured on a laptop
+under realistic network conditions.
+"""
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional
+from firebase_admin import auth as firebase_auth
+from google.api_core.exceptions import Aborted, ServiceUnavailable
+from .memory_firestore import InMemoryFirestore, DocumentReference, DocumentSnapshot, Query
+
+# z-score of the 99th percentile of a standard normal distribution
+_Z99 = 2.3263
+
+
+class LatencyDistribution:
+    """
+    Log-normal latency described by its median and 99th percentile in milliseconds,
+    the two numbers usually known about a network path. Equal values give a
+    constant latency; zero disables it.
+    """
+    
+    def __init__(self, median_ms: float = 0.0, p99_ms: Optional[float] = None):
+        self.median_ms = max(0.0, median_ms)
+        self.p99_ms = max(self.median_ms, p99_ms if p99_ms is not None else self.median_ms)
+        self._sigma = math.log(self.p99_ms / self.median_ms) / _Z99 if self.median_ms > 0 else 0.0
+    
+    def sample(self, rng: random.Random) -> float:
+        """One latency in seconds."""
+        if self.median_ms <= 0:
+            return 0.0
+        if self._sigma == 0:
+            return self.median_ms / 1000.0
+        return rng.lognormvariate(math.log(self.median_ms), self._sigma) / 1000.0
+
+
+class FaultProfile:
+    """Latency, error and contention settings shared by the fakes."""
+    
+    def __init__(
+        self,
+        read_latency: Optional[LatencyDistribution] = None,
+        write_latency: Optional[LatencyDistribution] = None,
+        per_document_ms: float = 0.0,
+        error_rate: float = 0.0,
+        contention_rate: float = 0.0,
+        contention_window_ms: float = 1000.0,
+        seed: Optional[int] = None
+    ):
+        self.read_latency = read_latency or LatencyDistribution()
+        self.write_latency = write_latency or LatencyDistribution()
+        self.per_document_ms = per_document_ms
+        self.error_rate = error_rate
+        self.contention_rate = contention_rate
+        self.contention_window_ms = contention_window_ms
+        self.rng = random.Random(seed)
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_settings(cls, settings) -> "FaultProfile":
+        return cls(
+            read_latency=LatencyDistribution(settings.fake_read_latency_ms, settings.fake_read_latency_p99_ms),
+            write_latency=LatencyDistribution(settings.fake_write_latency_ms, settings.fake_write_latency_p99_ms),
+            error_rate=settings.fake_error_rate,
+            contention_rate=settings.fake_contention_rate,
+            contention_window_ms=settings.fake_contention_window_ms,
+            seed=settings.fake_seed
+        )
+    
+    def _count(self, key: str, amount: float = 1):
+        with self._lock:
+            self.counts[key] += amount
+    
+    def rpc(self, kind: str, latency: LatencyDistribution, documents: int = 0):
+        """Simulate the network part of one RPC: wait, then maybe fail."""
+        delay = latency.sample(self.rng) + documents * self.per_document_ms / 1000.0
+        if delay:
+            time.sleep(delay)
+        self._count(f"{kind}_rpcs")
+        self._count("latency_seconds", delay)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self._count("errors")
+            raise ServiceUnavailable(f"Injected fault: {kind} unavailable")
+
+
+class FaultInjectingFirestore(InMemoryFirestore):
+    """``InMemoryFirestore`` with injected latency, transient errors and write contention."""
+    
+    def __init__(self, profile: Optional[FaultProfile] = None):
+        super().__init__()
+        self.profile = profile or FaultProfile()
+        self._last_write: Dict[str, float] = {}
+    
+    def _read(self, reference: DocumentReference, field_paths=None) -> DocumentSnapshot:
+        self.profile.rpc("read", self.profile.read_latency, 1)
+        return super()._read(reference, field_paths)
+    
+    def get_all(self, references, field_paths=None, transaction=None) -> Iterator[DocumentSnapshot]:
+        # A multi-get is one BatchGetDocuments RPC, not one per document
+        references = list(references)
+        self.profile.rpc("read", self.profile.read_latency, len(references))
+        return iter([InMemoryFirestore._read(self, ref, field_paths) for ref in references])
+    
+    def _query(self, query: Query) -> List[DocumentSnapshot]:
+        results = super()._query(query)
+        self.profile.rpc("query", self.profile.read_latency, len(results))
+        return results
+    
+    def _commit(self, writes: List[tuple]):
+        self.profile.rpc("commit", self.profile.write_latency, len(writes))
+        paths = [reference.path for _, reference, *_ in writes]
+        with self._lock:
+            now = time.monotonic()
+            window = self.profile.contention_window_ms / 1000.0
+            contended = any(now - self._last_write.get(path, -math.inf) < window for path in paths)
+            if contended and self.profile.contention_rate and self.profile.rng.random() < self.profile.contention_rate:
+                self.profile._count("contention")
+                raise Aborted("Too much contention on these documents. Please try again.")
+            result = super()._commit(writes)
+            for path in paths:
+                self._last_write[path] = now
+            return result
+    
+    def _listener_delay(self) -> float:
+        # Changes reach listeners roughly one write latency after the commit
+        return self.profile.write_latency.sample(self.profile.rng)
+    
+    def reset(self):
+        with self._lock:
+            super().reset()
+            self._last_write.clear()
+
+
+class FakeFirebaseAuth:
+    """
+    In-memory replacement for the ``firebase_admin.auth`` module.
+    ID tokens it accepts have the form ``fake-id-token:<uid>``.
+    """
+    
+    # Re-exported so callers can catch them the same way as with the real module
+    UserNotFoundError = firebase_auth.UserNotFoundError
+    EmailAlreadyExistsError = firebase_auth.EmailAlreadyExistsError
+    InvalidIdTokenError = firebase_auth.InvalidIdTokenError
+    
+    def __init__(self, profile: Optional[FaultProfile] = None):
+        self.profile = profile or FaultProfile()
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def _record(self, data: Dict[str, Any]) -> firebase_auth.UserRecord:
+        return firebase_auth.UserRecord(dict(data))
+    
+    def _find(self, uid: str) -> Dict[str, Any]:
+        data = self._users.get(uid)
+        if data is None:
+            raise firebase_auth.UserNotFoundError(f"No user record found for the provided user ID: {uid}.")
+        return data
+    
+    def create_user(self, email: Optional[str] = None, password: Optional[str] = None,
+                    display_name: Optional[str] = None, uid: Optional[str] = None, **kwargs) -> firebase_auth.UserRecord:
+        self.profile.rpc("auth_write", self.profile.write_latency)
+        with self._lock:
+            if email and any(u.get("email") == email for u in self._users.values()):
+                raise firebase_auth.EmailAlreadyExistsError(
+                    "The user with the provided email already exists.", None, None
+                )
+            uid = uid or uuid.uuid4().hex[:28]
+            self._users[uid] = {"localId": uid, "email": email, "displayName": display_name, "disabled": False}
+            return self._record(self._users[uid])
+    
+    def get_user(self, uid: str) -> firebase_auth.UserRecord:
+        self.profile.rpc("auth_read", self.profile.read_latency)
+        with self._lock:
+            return self._record(self._find(uid))
+    
+    def get_user_by_email(self, email: str) -> firebase_auth.UserRecord:
+        self.profile.rpc("auth_read", self.profile.read_latency)
+        with self._lock:
+            for data in self._users.values():
+                if data.get("email") == email:
+                    return self._record(data)
+        raise firebase_auth.UserNotFoundError(f"No user record found for the provided email: {email}.")
+    
+    def update_user(self, uid: str, **kwargs) -> firebase_auth.UserRecord:
+        self.profile.rpc("auth_write", self.profile.write_latency)
+        fields = {"email": "email", "display_name": "displayName", "disabled": "disabled"}
+        with self._lock:
+            data = self._find(uid)
+            for name, value in kwargs.items():
+                if name in fields:
+                    data[fields[name]] = value
+            return self._record(data)
+    
+    def set_custom_user_claims(self, uid: str, custom_claims: Optional[Dict[str, Any]]):
+        self.profile.rpc("auth_write", self.profile.write_latency)
+        with self._lock:
+            self._find(uid)["customAttributes"] = json.dumps(custom_claims or {})
+    
+    def delete_user(self, uid: str):
+        self.profile.rpc("auth_write", self.profile.write_latency)
+        with self._lock:
+            self._find(uid)
+            del self._users[uid]
+    
+    def create_id_token(self, uid: str) -> str:
+        """Token that ``verify_id_token`` accepts, for tests and load scripts."""
+        return f"fake-id-token:{uid}"
+    
+    def verify_id_token(self, id_token: str, check_revoked: bool = False) -> Dict[str, Any]:
+        self.profile.rpc("auth_read", self.profile.read_latency)
+        prefix, _, uid = (id_token or "").partition(":")
+        with self._lock:
+            data = self._users.get(uid)
+            if prefix != "fake-id-token" or data is None:
+                raise firebase_auth.InvalidIdTokenError("Invalid ID token")
+            claims = json.loads(data.get("customAttributes") or "{}")
+            return {"uid": uid, "email": data.get("email"), **claims}
@@ -4,6 +4,7 @@ from typing import Optional
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
 from config.settings import Settings
+from .fake_firebase import FaultProfile, FaultInjectingFirestore, FakeFirebaseAuth
 
 
 class FirebaseConnection:
@@ -30,6 +31,13 @@ class FirebaseConnection:
         """Initialize Firebase Admin SDK."""
         settings = Settings()
         
+        if settings.firebase_backend == "fake":
+            # In-process stand-in, no credentials or network needed
+            profile = FaultProfile.from_settings(settings)
+            self._db = FaultInjectingFirestore(profile)
+            self._auth = FakeFirebaseAuth(profile)
+            return
+        
         # Create credentials dictionary
         cred_dict = {
             "type": "service_account",
@@ -0,0 +1,564 @@
+"""
+In-memory stand-in for the Firestore client.
+
+Implements the subset of the ``google.cloud.firestore`` client surface that the
+repositories use (collections, documents, filtered/ordered/limited queries,
+batched writes, write preconditions, field transforms and snapshot listeners)
+on top of plain dictionaries, so the application can run in-process without
+Firebase credentials, e.g. for benchmarks and local experiments.
+"""
+import copy
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1._helpers import ExistsOption, LastUpdateOption
+from google.cloud.firestore_v1.watch import ChangeType, DocumentChange
+
+DESCENDING = "DESCENDING"
+ASCENDING = "ASCENDING"
+
+
+def _get_path(data: Dict[str, Any], path: str):
+    """Resolve a dotted field path; returns (found, value)."""
+    current: Any = data
+    for part in path.split("."):
+        if not isinstance(current, dict) or part not in current:
+            return False, None
+        current = current[part]
+    return True, current
+
+
+def _apply_value(current: Any, value: Any, now: datetime) -> Tuple[bool, Any]:
+    """Resolve sentinels and transforms. Returns (keep, value)."""
+    if value is transforms.DELETE_FIELD:
+        return False, None
+    if value is transforms.SERVER_TIMESTAMP:
+        return True, now
+    if isinstance(value, transforms.Increment):
+        base = current if isinstance(current, (int, float)) else 0
+        return True, base + value.value
+    if isinstance(value, transforms.Maximum):
+        return True, value.value if not isinstance(current, (int, float)) else max(current, value.value)
+    if isinstance(value, transforms.Minimum):
+        return True, value.value if not isinstance(current, (int, float)) else min(current, value.value)
+    if isinstance(value, transforms.ArrayUnion):
+        result = list(current) if isinstance(current, list) else []
+        result.extend(v for v in value.values if v not in result)
+        return True, result
+    if isinstance(value, transforms.ArrayRemove):
+        result = list(current) if isinstance(current, list) else []
+        return True, [v for v in result if v not in value.values]
+    return True, copy.deepcopy(value)
+
+
+def _set_path(data: Dict[str, Any], path: str, value: Any, now: datetime):
+    """Assign a dotted field path, creating intermediate maps."""
+    parts = path.split(".")
+    target = data
+    for part in parts[:-1]:
+        nested = target.get(part)
+        if not isinstance(nested, dict):
+            nested = target[part] = {}
+        target = nested
+    keep, resolved = _apply_value(target.get(parts[-1]), value, now)
+    if keep:
+        target[parts[-1]] = resolved
+    else:
+        target.pop(parts[-1], None)
+
+
+def _merge(target: Dict[str, Any], data: Dict[str, Any], now: datetime):
+    """Deep-merge ``data`` into ``target`` (``set(..., merge=True)`` semantics)."""
+    for key, value in data.items():
+        if isinstance(value, dict):
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            _merge(target[key], value, now)
+            continue
+        keep, resolved = _apply_value(target.get(key), value, now)
+        if keep:
+            target[key] = resolved
+        else:
+            target.pop(key, None)
+
+
+def _order_key(value: Any):
+    """Cross-type ordering in the spirit of Firestore's value type order."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, datetime):
+        return (3, value.replace(tzinfo=None) if value.tzinfo else value)
+    if isinstance(value, str):
+        return (4, value)
+    if isinstance(value, bytes):
+        return (5, value)
+    return (6, repr(value))
+
+
+def _matches(op: str, actual: Any, expected: Any) -> bool:
+    if op == "==":
+        return actual == expected
+    if op == "!=":
+        return actual is not None and actual != expected
+    if op == "in":
+        return actual in expected
+    if op == "not-in":
+        return actual is not None and actual not in expected
+    if op == "array-contains":
+        return isinstance(actual, list) and expected in actual
+    if op == "array-contains-any":
+        return isinstance(actual, list) and any(v in actual for v in expected)
+    if actual is None:
+        return False
+    try:
+        if op == "<":
+            return _order_key(actual) < _order_key(expected)
+        if op == "<=":
+            return _order_key(actual) <= _order_key(expected)
+        if op == ">":
+            return _order_key(actual) > _order_key(expected)
+        if op == ">=":
+            return _order_key(actual) >= _order_key(expected)
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+class DocumentSnapshot:
+    """Snapshot of a document at read time."""
+    
+    def __init__(self, reference: "DocumentReference", data: Optional[Dict[str, Any]],
+                 update_time: Optional[datetime] = None):
+        self.reference = reference
+        self._data = data
+        self.update_time = update_time
+    
+    @property
+    def id(self) -> str:
+        return self.reference.id
+    
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+    
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+    
+    def get(self, field_path: str):
+        found, value = _get_path(self._data or {}, field_path)
+        if not found:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class DocumentReference:
+    """Reference to a single document."""
+    
+    def __init__(self, client: "InMemoryFirestore", collection: "CollectionReference", document_id: str):
+        self._client = client
+        self.parent = collection
+        self.id = document_id
+    
+    @property
+    def path(self) -> str:
+        return f"{self.parent.id}/{self.id}"
+    
+    def get(self, field_paths=None, transaction=None) -> DocumentSnapshot:
+        return self._client._read(self, field_paths)
+    
+    def set(self, document_data: Dict[str, Any], merge: bool = False):
+        self._client._commit([("set", self, document_data, merge, None)])
+    
+    def create(self, document_data: Dict[str, Any]):
+        self._client._commit([("create", self, document_data, False, None)])
+    
+    def update(self, field_updates: Dict[str, Any], option=None):
+        self._client._commit([("update", self, field_updates, False, option)])
+    
+    def delete(self, option=None):
+        self._client._commit([("delete", self, None, False, option)])
+    
+    def collection(self, name: str) -> "CollectionReference":
+        return self._client.collection(f"{self.path}/{name}")
+
+
+class Query:
+    """Immutable query over one collection."""
+    
+    def __init__(self, collection: "CollectionReference", filters=(), orders=(), limit=None,
+                 offset=0, projection=None, start_after=None):
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._offset = offset
+        self._projection = projection
+        self._start_after = start_after
+    
+    def _copy(self, **changes) -> "Query":
+        params = dict(
+            filters=self._filters, orders=self._orders, limit=self._limit, offset=self._offset,
+            projection=self._projection, start_after=self._start_after
+        )
+        params.update(changes)
+        return Query(self._collection, **params)
+    
+    def where(self, field_path: Optional[str] = None, op_string: Optional[str] = None,
+              value: Any = None, *, filter=None) -> "Query":
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+    
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> "Query":
+        return self._copy(orders=self._orders + ((field_path, direction),))
+    
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit=count)
+    
+    def offset(self, num_to_skip: int) -> "Query":
+        return self._copy(offset=num_to_skip)
+    
+    def select(self, field_paths) -> "Query":
+        return self._copy(projection=tuple(field_paths))
+    
+    def start_after(self, document_fields_or_snapshot) -> "Query":
+        return self._copy(start_after=document_fields_or_snapshot)
+    
+    def _effective_orders(self) -> Tuple[Tuple[str, str], ...]:
+        # Like Firestore, inequality filters imply ordering by that field first
+        if self._orders:
+            return self._orders
+        for field, op, _ in self._filters:
+            if op in ("<", "<=", ">", ">=", "!=", "not-in"):
+                return ((field, ASCENDING),)
+        return ()
+    
+    def _run(self) -> List[Tuple[str, Dict[str, Any]]]:
+        rows = []
+        for doc_id, data in self._collection._documents().items():
+            ok = True
+            for field, op, expected in self._filters:
+                if field == "__name__":
+                    found, actual = True, doc_id
+                else:
+                    found, actual = _get_path(data, field)
+                if not found or not _matches(op, actual, expected):
+                    ok = False
+                    break
+            if ok:
+                rows.append((doc_id, data))
+        
+        orders = self._effective_orders()
+        rows.sort(key=lambda item: item[0])
+        # Stable multi-key sort honouring per-field direction
+        for field, direction in reversed(orders):
+            rows.sort(
+                key=lambda item, f=field: _order_key(_get_path(item[1], f)[1]),
+                reverse=(direction == DESCENDING)
+            )
+        
+        if self._start_after is not None:
+            rows = self._apply_cursor(rows, orders)
+        if self._offset:
+            rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        return rows
+    
+    def _apply_cursor(self, rows, orders):
+        cursor = self._start_after
+        if isinstance(cursor, DocumentSnapshot):
+            cursor_id = cursor.id
+            for index, (doc_id, _) in enumerate(rows):
+                if doc_id == cursor_id:
+                    return rows[index + 1:]
+            cursor = {field: cursor.get(field) for field, _ in orders}
+        values = [cursor[field] for field, _ in orders] if isinstance(cursor, dict) else list(cursor)
+        result = []
+        for doc_id, data in rows:
+            key = [_order_key(_get_path(data, f)[1]) for f, _ in orders[:len(values)]]
+            target = [_order_key(v) for v in values]
+            descending = bool(orders) and orders[0][1] == DESCENDING
+            if (key < target) if descending else (key > target):
+                result.append((doc_id, data))
+        return result
+    
+    def stream(self, transaction=None) -> Iterator[DocumentSnapshot]:
+        return iter(self._collection._client._query(self))
+    
+    def get(self, transaction=None) -> List[DocumentSnapshot]:
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    """Reference to a collection; also the unfiltered query over it."""
+    
+    def __init__(self, client: "InMemoryFirestore", collection_id: str):
+        super().__init__(self)
+        self._client = client
+        self.id = collection_id
+    
+    def _documents(self) -> Dict[str, Dict[str, Any]]:
+        return self._client._store.setdefault(self.id, {})
+    
+    def document(self, document_id: Optional[str] = None) -> DocumentReference:
+        return DocumentReference(self._client, self, document_id or uuid.uuid4().hex[:20])
+    
+    def add(self, document_data: Dict[str, Any], document_id: Optional[str] = None):
+        ref = self.document(document_id)
+        ref.set(document_data)
+        return None, ref
+    
+    def list_documents(self) -> List[DocumentReference]:
+        return [self.document(doc_id) for doc_id in list(self._documents())]
+    
+    def on_snapshot(self, callback) -> "Watch":
+        """
+        Listen to the collection like ``CollectionReference.on_snapshot``.
+        The first call carries every document as ``ADDED``; later calls carry
+        the changes of one commit, with ``docs`` holding just the changed
+        documents rather than the whole collection.
+        """
+        return self._client._listen(self, callback)
+
+
+class Watch:
+    """Delivers snapshots to one listener callback on its own thread."""
+    
+    def __init__(self, client: "InMemoryFirestore", collection_id: str, callback):
+        self._client = client
+        self._collection_id = collection_id
+        self._callback = callback
+        self._queue: "queue.Queue" = queue.Queue()
+        self._active = True
+        self._thread = threading.Thread(target=self._run, name=f"watch-{collection_id}", daemon=True)
+        self._thread.start()
+    
+    @property
+    def is_active(self) -> bool:
+        return self._active
+    
+    def _push(self, docs, changes, read_time: datetime, delay: float):
+        self._queue.put((time.monotonic() + delay, docs, changes, read_time))
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            due, docs, changes, read_time = item
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            if self._active:
+                self._callback(docs, changes, read_time)
+    
+    def unsubscribe(self):
+        self._active = False
+        self._client._unlisten(self)
+        self._queue.put(None)
+    
+    close = unsubscribe
+
+
+class WriteBatch:
+    """Accumulates writes and applies them atomically on ``commit``."""
+    
+    def __init__(self, client: "InMemoryFirestore"):
+        self._client = client
+        self._writes: List[tuple] = []
+    
+    def __len__(self):
+        return len(self._writes)
+    
+    def set(self, reference: DocumentReference, document_data: Dict[str, Any], merge: bool = False):
+        self._writes.append(("set", reference, document_data, merge, None))
+        return self
+    
+    def create(self, reference: DocumentReference, document_data: Dict[str, Any]):
+        self._writes.append(("create", reference, document_data, False, None))
+        return self
+    
+    def update(self, reference: DocumentReference, field_updates: Dict[str, Any], option=None):
+        self._writes.append(("update", reference, field_updates, False, option))
+        return self
+    
+    def delete(self, reference: DocumentReference, option=None):
+        self._writes.append(("delete", reference, None, False, option))
+        return self
+    
+    def commit(self):
+        writes, self._writes = self._writes, []
+        return self._client._commit(writes)
+
+
+class InMemoryFirestore:
+    """Thread-safe dictionary-backed replacement for ``firestore.Client``."""
+    
+    def __init__(self):
+        self._store: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._update_times: Dict[str, datetime] = {}
+        self._listeners: Dict[str, List[Watch]] = {}
+        self._lock = threading.RLock()
+        self._last_commit = datetime.min
+    
+    def collection(self, collection_id: str) -> CollectionReference:
+        return CollectionReference(self, collection_id)
+    
+    def document(self, path: str) -> DocumentReference:
+        collection_path, _, document_id = path.rpartition("/")
+        return self.collection(collection_path).document(document_id)
+    
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+    
+    @staticmethod
+    def write_option(**kwargs):
+        """Write precondition, as ``Client.write_option``."""
+        if set(kwargs) == {"last_update_time"}:
+            return LastUpdateOption(kwargs["last_update_time"])
+        if set(kwargs) == {"exists"}:
+            return ExistsOption(kwargs["exists"])
+        raise TypeError("write_option takes exactly one of last_update_time or exists")
+    
+    def get_all(self, references, field_paths=None, transaction=None) -> Iterator[DocumentSnapshot]:
+        return iter([self._read(ref, field_paths) for ref in references])
+    
+    def reset(self):
+        """Drop every collection."""
+        with self._lock:
+            self._store.clear()
+            self._update_times.clear()
+    
+    def _listen(self, collection: CollectionReference, callback) -> Watch:
+        with self._lock:
+            watch = Watch(self, collection.id, callback)
+            docs = [
+                DocumentSnapshot(collection.document(doc_id), copy.deepcopy(data),
+                                 self._update_times.get(f"{collection.id}/{doc_id}"))
+                for doc_id, data in sorted(collection._documents().items())
+            ]
+            changes = [DocumentChange(ChangeType.ADDED, doc, -1, i) for i, doc in enumerate(docs)]
+            self._listeners.setdefault(collection.id, []).append(watch)
+            watch._push(docs, changes, datetime.utcnow(), self._listener_delay())
+            return watch
+    
+    def _unlisten(self, watch: Watch):
+        with self._lock:
+            watchers = self._listeners.get(watch._collection_id, [])
+            if watch in watchers:
+                watchers.remove(watch)
+    
+    def _notify(self, before: Dict[str, bool], references: Dict[str, DocumentReference], now: datetime):
+        """Queue the changes of one commit for listeners of the touched collections."""
+        by_collection: Dict[str, List[DocumentChange]] = {}
+        for path, reference in references.items():
+            if not self._listeners.get(reference.parent.id):
+                continue
+            data = reference.parent._documents().get(reference.id)
+            if data is None and not before[path]:
+                continue
+            kind = ChangeType.REMOVED if data is None else (ChangeType.MODIFIED if before[path] else ChangeType.ADDED)
+            snapshot = DocumentSnapshot(reference, copy.deepcopy(data), now if data is not None else None)
+            by_collection.setdefault(reference.parent.id, []).append(DocumentChange(kind, snapshot, -1, -1))
+        for collection_id, changes in by_collection.items():
+            for watch in self._listeners[collection_id]:
+                watch._push([c.document for c in changes], changes, now, self._listener_delay())
+    
+    # Internal storage primitives, overridden by the fault-injecting fake
+    
+    def _listener_delay(self) -> float:
+        """Seconds between a commit and its delivery to listeners."""
+        return 0.0
+    
+    def _read(self, reference: DocumentReference, field_paths=None) -> DocumentSnapshot:
+        with self._lock:
+            data = reference.parent._documents().get(reference.id)
+            data = self._project(data, field_paths) if data is not None else None
+            return DocumentSnapshot(reference, copy.deepcopy(data), self._update_times.get(reference.path))
+    
+    def _query(self, query: Query) -> List[DocumentSnapshot]:
+        with self._lock:
+            rows = query._run()
+            collection = query._collection
+            return [
+                DocumentSnapshot(
+                    collection.document(doc_id),
+                    copy.deepcopy(self._project(data, query._projection)),
+                    self._update_times.get(f"{collection.id}/{doc_id}")
+                )
+                for doc_id, data in rows
+            ]
+    
+    @staticmethod
+    def _project(data: Dict[str, Any], field_paths) -> Dict[str, Any]:
+        if not field_paths:
+            return data
+        projected: Dict[str, Any] = {}
+        for path in field_paths:
+            found, value = _get_path(data, path)
+            if found:
+                _set_path(projected, path, value, datetime.utcnow())
+        return projected
+    
+    def _commit(self, writes: List[tuple]) -> List[datetime]:
+        with self._lock:
+            # Update times are unique so last-update preconditions are exact
+            now = max(datetime.utcnow(), self._last_commit + timedelta(microseconds=1))
+            self._last_commit = now
+            # Validate first so a failing batch leaves no partial writes. Each
+            # write sees the document as the earlier writes of the batch left it.
+            state: Dict[str, Tuple[bool, Optional[datetime]]] = {}
+            for kind, reference, _, _, option in writes:
+                path = reference.path
+                if path in state:
+                    exists, update_time = state[path]
+                else:
+                    exists, update_time = reference.id in reference.parent._documents(), self._update_times.get(path)
+                if kind == "update" and not exists:
+                    raise NotFound(f"No document to update: {path}")
+                if kind == "create" and exists:
+                    raise AlreadyExists(f"Document already exists: {path}")
+                if isinstance(option, LastUpdateOption) and (not exists or update_time != option._last_update_time):
+                    raise FailedPrecondition(f"Document changed since it was read: {path}")
+                if isinstance(option, ExistsOption) and exists != option._exists:
+                    raise FailedPrecondition(f"Document existence precondition failed: {path}")
+                state[path] = (False, None) if kind == "delete" else (True, now)
+            references: Dict[str, DocumentReference] = {}
+            before: Dict[str, bool] = {}
+            for _, reference, *_ in writes:
+                if reference.path not in references:
+                    references[reference.path] = reference
+                    before[reference.path] = reference.id in reference.parent._documents()
+            for kind, reference, data, merge, _ in writes:
+                documents = reference.parent._documents()
+                if kind == "delete":
+                    documents.pop(reference.id, None)
+                    self._update_times.pop(reference.path, None)
+                    continue
+                if kind in ("set", "create") and not merge:
+                    target: Dict[str, Any] = {}
+                    for key, value in data.items():
+                        keep, resolved = _apply_value(None, value, now)
+                        if keep:
+                            target[key] = resolved
+                    documents[reference.id] = target
+                elif kind == "set":
+                    target = documents.setdefault(reference.id, {})
+                    _merge(target, data, now)
+                else:
+                    target = documents[reference.id]
+                    for path, value in data.items():
+                        _set_path(target, path, value, now)
+                self._update_times[reference.path] = now
+            self._notify(before, references, now)
+            return [now] * len(writes)
@@ -0,0 +1,4 @@
+"""In-process real-time fan-out."""
+from .seat_broadcaster import SEAT_FIELDS, SeatBroadcaster, SeatSubscription, SubscriberLimitReached, seat_broadcaster
+
+__all__ = ["SEAT_FIELDS", "SeatBroadcaster", "SeatSubscription", "SubscriberLimitReached", "seat_broadcaster"]
@@ -0,0 +1,143 @@
+"""
+Fan-out of seat availability changes to streaming subscribers.
+
+Publishers are synchronous repository code running on any thread; subscribers
+are asyncio tasks. Each subscription keeps only the latest pending delta per
+flight, so a slow client never queues more than one entry per flight it
+watches: intermediate values are conflated instead of buffered, which is the
+backpressure policy. One publish wakes every subscriber of the flight with a
+single ``call_soon_threadsafe`` per event loop.
+"""
+import asyncio
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+from observability import metrics
+
+# Flight fields streamed to subscribers
+SEAT_FIELDS = ("available_seats", "status")
+
+
+class SubscriberLimitReached(Exception):
+    """Raised when a worker already serves the maximum number of subscribers."""
+
+
+class SeatSubscription:
+    """Pending deltas of one subscriber, drained by its asyncio task."""
+    
+    def __init__(self, broadcaster: "SeatBroadcaster", flight_ids: Iterable[str]):
+        self.flight_ids = frozenset(flight_ids)
+        self._broadcaster = broadcaster
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._sent: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.closed = False
+    
+    def _offer(self, flight_id: str, delta: Dict[str, Any]) -> bool:
+        """Merge a delta; returns whether the subscriber needs waking."""
+        with self._lock:
+            pending = self._pending.get(flight_id)
+            if pending is None:
+                self._pending[flight_id] = dict(delta)
+                return True
+            pending.update(delta)
+        metrics.seat_stream_conflated.inc()
+        return False
+    
+    def prime(self, flight_id: str, state: Dict[str, Any]):
+        """Record the state the client already has so unchanged values are not resent."""
+        with self._lock:
+            self._sent[flight_id] = {k: state[k] for k in SEAT_FIELDS if k in state}
+    
+    async def next_deltas(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Wait for changes and return them as ``{"flight_id", <changed fields>}``
+        dicts; an empty list means the timeout expired.
+        """
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        with self._lock:
+            self._wake.clear()
+            pending, self._pending = self._pending, {}
+            deltas = []
+            for flight_id, delta in pending.items():
+                sent = self._sent.setdefault(flight_id, {})
+                changed = {k: v for k, v in delta.items() if sent.get(k) != v}
+                if changed:
+                    sent.update(changed)
+                    deltas.append({"flight_id": flight_id, **changed})
+        return deltas
+    
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._broadcaster._unsubscribe(self)
+
+
+class SeatBroadcaster:
+    """Routes seat deltas from publishers to the subscriptions of each flight."""
+    
+    def __init__(self, max_subscribers: int = 10000):
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._by_flight: Dict[str, Set[SeatSubscription]] = {}
+        self._count = 0
+    
+    def subscribe(self, flight_ids: Iterable[str]) -> SeatSubscription:
+        """Subscribe the calling event loop's task to ``flight_ids``."""
+        subscription = SeatSubscription(self, flight_ids)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise SubscriberLimitReached(f"Seat stream limit of {self.max_subscribers} subscribers reached")
+            self._count += 1
+            for flight_id in subscription.flight_ids:
+                self._by_flight.setdefault(flight_id, set()).add(subscription)
+        metrics.seat_stream_subscribers.inc()
+        return subscription
+    
+    def _unsubscribe(self, subscription: SeatSubscription):
+        with self._lock:
+            self._count -= 1
+            for flight_id in subscription.flight_ids:
+                subscribers = self._by_flight.get(flight_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._by_flight[flight_id]
+        metrics.seat_stream_subscribers.dec()
+    
+    def has_subscribers(self, flight_id: str) -> bool:
+        return flight_id in self._by_flight
+    
+    def publish(self, flight_id: str, changes: Dict[str, Any]):
+        """Publish the seat fields present in ``changes``; safe from any thread."""
+        delta = {k: getattr(changes[k], "value", changes[k]) for k in SEAT_FIELDS if k in changes}
+        if not delta:
+            return
+        with self._lock:
+            subscribers = list(self._by_flight.get(flight_id, ()))
+        if not subscribers:
+            return
+        metrics.seat_stream_published.inc()
+        to_wake: Dict[asyncio.AbstractEventLoop, List[SeatSubscription]] = {}
+        for subscription in subscribers:
+            if subscription._offer(flight_id, delta):
+                to_wake.setdefault(subscription._loop, []).append(subscription)
+        for loop, batch in to_wake.items():
+            try:
+                loop.call_soon_threadsafe(_wake_all, batch)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                pass
+
+
+def _wake_all(subscriptions: List[SeatSubscription]):
+    for subscription in subscriptions:
+        subscription._wake.set()
+
+
+# Process-wide broadcaster shared by publishers and the stream endpoint
+seat_broadcaster = SeatBroadcaster()
@@ -0,0 +1,5 @@
+"""In-memory replicas of Firestore collections."""
+from .flight_replica import FlightReplica, flight_replica
+from .offer_index import OfferIndex, offer_index
+
+__all__ = ["FlightReplica", "flight_replica", "OfferIndex", "offer_index"]
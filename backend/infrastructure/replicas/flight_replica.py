@@ -0,0 +1,201 @@
+"""
+Live in-memory replica of the flights collection.
+
+The replica subscribes to ``flights`` with a Firestore snapshot listener: the
+first snapshot loads every document, later ones apply per-document deltas.
+Reads served from it cost no Firestore reads and no network round trip. It
+serves a repository only while the listener is active and its view is at
+most ``max_staleness_seconds`` old: the last snapshot's delay from its read
+time plus the time since it arrived. A listener that stalls (or a quiet
+collection) thus ages out, and the repository falls back to Firestore until
+the next snapshot arrives.
+"""
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from google.cloud.firestore_v1.watch import ChangeType
+from domain.models import Flight, FlightStatus
+from infrastructure.repositories.base_repository import naive_utc
+from infrastructure.repositories.flight_repository import FlightRepository
+from infrastructure.realtime import seat_broadcaster
+from observability import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class FlightReplica:
+    """Snapshot-listener replica of ``flights`` with route indexes."""
+    
+    def __init__(self, max_staleness_seconds: float = 5.0):
+        self.max_staleness_seconds = max_staleness_seconds
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._db = None
+        self._repo: Optional[FlightRepository] = None
+        self._watch = None
+        self._lag = math.inf
+        self._received = -math.inf  # monotonic time the last snapshot arrived
+        self._flights: Dict[str, Flight] = {}
+        self._by_route: Dict[Tuple[str, str], Set[str]] = {}
+        self._by_origin: Dict[str, Set[str]] = {}
+    
+    # Lifecycle
+    
+    def start(self, db):
+        """Subscribe to the flights collection of ``db``."""
+        with self._lock:
+            if self._watch is not None:
+                return
+            self._db = db
+            self._repo = FlightRepository(db)
+            self._watch = self._repo.collection.on_snapshot(self._on_snapshot)
+    
+    def stop(self):
+        """Unsubscribe and drop the local copy."""
+        with self._lock:
+            if self._watch is not None:
+                self._watch.unsubscribe()
+            self._watch = None
+            self._db = None
+            self._ready.clear()
+            self._lag = math.inf
+            self._received = -math.inf
+            self._flights.clear()
+            self._by_route.clear()
+            self._by_origin.clear()
+        metrics.replica_ready.labels("flights").set(0)
+        metrics.replica_documents.labels("flights").set(0)
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the initial snapshot has been loaded."""
+        return self._ready.wait(timeout)
+    
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+    
+    @property
+    def lag_seconds(self) -> float:
+        """Delay between the last applied commit and its arrival here."""
+        return self._lag
+    
+    @property
+    def staleness_seconds(self) -> float:
+        """Age of the replica's view: the last snapshot's lag plus the time since it arrived."""
+        return self._lag + (time.monotonic() - self._received)
+    
+    def serves(self, db) -> bool:
+        """Whether reads against ``db`` may be answered from the replica."""
+        watch = self._watch
+        return (
+            watch is not None
+            and db is self._db
+            and self._ready.is_set()
+            and watch.is_active
+            and self.staleness_seconds <= self.max_staleness_seconds
+        )
+    
+    # Listener
+    
+    def _on_snapshot(self, docs, changes, read_time: datetime):
+        with self._lock:
+            if self._repo is None:
+                return
+            for change in changes:
+                doc = change.document
+                self._remove(doc.id)
+                if change.type == ChangeType.REMOVED:
+                    continue
+                data = doc.to_dict()
+                data['id'] = doc.id
+                try:
+                    self._add(self._repo._to_domain(data))
+                except Exception as e:
+                    logger.warning("Skipping flight %s in replica: %s", doc.id, e)
+                    continue
+                if change.type == ChangeType.MODIFIED:
+                    # Also carries seat changes committed by other workers
+                    seat_broadcaster.publish(doc.id, data)
+            now = datetime.now(timezone.utc) if read_time.tzinfo else datetime.utcnow()
+            self._lag = max(0.0, (now - read_time).total_seconds())
+            self._received = time.monotonic()
+            self._ready.set()
+            count = len(self._flights)
+        metrics.replica_ready.labels("flights").set(1)
+        metrics.replica_lag.labels("flights").set(self._lag)
+        metrics.replica_documents.labels("flights").set(count)
+    
+    def _add(self, flight: Flight):
+        self._flights[flight.id] = flight
+        self._by_route.setdefault((flight.origin, flight.destination), set()).add(flight.id)
+        self._by_origin.setdefault(flight.origin, set()).add(flight.id)
+    
+    def _remove(self, flight_id: str):
+        flight = self._flights.pop(flight_id, None)
+        if flight is None:
+            return
+        route = self._by_route.get((flight.origin, flight.destination))
+        if route is not None:
+            route.discard(flight_id)
+            if not route:
+                del self._by_route[(flight.origin, flight.destination)]
+        origin = self._by_origin.get(flight.origin)
+        if origin is not None:
+            origin.discard(flight_id)
+            if not origin:
+                del self._by_origin[flight.origin]
+    
+    # Reads, matching the semantics of the FlightRepository queries
+    
+    def get(self, flight_id: str) -> Optional[Flight]:
+        flight = self._flights.get(flight_id)
+        return flight.model_copy() if flight is not None else None
+    
+    def all(self, limit: Optional[int] = None) -> List[Flight]:
+        with self._lock:
+            ids = sorted(self._flights)[:limit] if limit else sorted(self._flights)
+            return [self._flights[i].model_copy() for i in ids]
+    
+    def by_company(self, company_id: str) -> List[Flight]:
+        with self._lock:
+            return [
+                self._flights[i].model_copy()
+                for i in sorted(self._flights)
+                if self._flights[i].company_id == company_id
+            ]
+    
+    def search(
+        self,
+        origin: str = None,
+        destination: str = None,
+        departure_date: datetime = None,
+        limit: int = 50
+    ) -> List[Flight]:
+        with self._lock:
+            if origin and destination:
+                candidates = self._by_route.get((origin, destination), ())
+            elif origin:
+                candidates = self._by_origin.get(origin, ())
+            else:
+                candidates = self._flights.keys()
+            flights = [
+                self._flights[i] for i in candidates
+                if (not destination or self._flights[i].destination == destination)
+                and self._flights[i].status == FlightStatus.SCHEDULED
+            ]
+            if departure_date:
+                # Same whole-day window as FlightRepository.search_flights
+                start = naive_utc(departure_date.replace(hour=0, minute=0, second=0, microsecond=0))
+                end = naive_utc(departure_date.replace(hour=23, minute=59, second=59, microsecond=999999))
+                flights = [f for f in flights if start <= naive_utc(f.departure_time) <= end]
+                flights.sort(key=lambda f: (naive_utc(f.departure_time), f.id))
+            else:
+                flights.sort(key=lambda f: f.id)
+            return [f.model_copy() for f in flights[:limit]]
+
+
+# Process-wide replica, started by the application when enabled
+flight_replica = FlightReplica()
@@ -0,0 +1,155 @@
+"""
+In-memory index of the best active offer per flight.
+
+Kept current by a snapshot listener on ``offers``: every added, changed or
+removed offer updates only its flight's entry. Expiry is handled by a min-heap
+on ``valid_until`` that is drained lazily on lookup, so an offer stops applying
+the moment it expires without any timer or re-read. Entries left behind by
+changed or removed offers are skipped when they surface, and the heap is
+rebuilt from the live offers once they outnumber them. Offers are held as
+slotted ``OfferRecord``s rather than models.
+"""
+import heapq
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from google.cloud.firestore_v1.watch import ChangeType
+from domain.records import OfferRecord
+from infrastructure.repositories.content_repository import OfferRepository
+from observability import metrics
+
+logger = logging.getLogger(__name__)
+
+# Heap entries tolerated beyond twice the live offers before a rebuild
+EXPIRY_HEAP_SLACK = 64
+
+
+class OfferIndex:
+    """``flight_id -> best active offer`` maintained from offer deltas."""
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._repo: Optional[OfferRepository] = None
+        self._watch = None
+        self._offers: Dict[str, OfferRecord] = {}
+        self._by_flight: Dict[str, Dict[str, OfferRecord]] = {}
+        self._best: Dict[str, OfferRecord] = {}
+        self._expiry: List[Tuple[datetime, str]] = []
+    
+    # Lifecycle
+    
+    def start(self, db):
+        """Subscribe to the offers collection of ``db``."""
+        with self._lock:
+            if self._watch is not None:
+                return
+            self._repo = OfferRepository(db)
+            self._watch = self._repo.collection.on_snapshot(self._on_snapshot)
+    
+    def stop(self):
+        """Unsubscribe and forget every offer."""
+        with self._lock:
+            if self._watch is not None:
+                self._watch.unsubscribe()
+            self._watch = None
+            self._repo = None
+            self._ready.clear()
+            self._offers.clear()
+            self._by_flight.clear()
+            self._best.clear()
+            self._expiry.clear()
+        metrics.replica_ready.labels("offers").set(0)
+        metrics.replica_documents.labels("offers").set(0)
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the initial snapshot has been loaded."""
+        return self._ready.wait(timeout)
+    
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+    
+    # Listener
+    
+    def _on_snapshot(self, docs, changes, read_time: datetime):
+        with self._lock:
+            if self._repo is None:
+                return
+            for change in changes:
+                doc = change.document
+                self._remove(doc.id)
+                if change.type == ChangeType.REMOVED:
+                    continue
+                data = doc.to_dict()
+                data['id'] = doc.id
+                if not data.get('active', True):
+                    continue
+                try:
+                    self._add(self._repo.to_record(data))
+                except Exception as e:
+                    logger.warning("Skipping offer %s in index: %s", doc.id, e)
+            self._ready.set()
+            count = len(self._offers)
+        metrics.replica_ready.labels("offers").set(1)
+        metrics.replica_documents.labels("offers").set(count)
+    
+    def _add(self, offer: OfferRecord):
+        self._offers[offer.id] = offer
+        self._by_flight.setdefault(offer.flight_id, {})[offer.id] = offer
+        heapq.heappush(self._expiry, (offer.valid_until, offer.id))
+        if len(self._expiry) > 2 * len(self._offers) + EXPIRY_HEAP_SLACK:
+            self._compact()
+        self._refresh(offer.flight_id)
+    
+    def _compact(self):
+        # One entry per live offer; amortized over the pushes that made the heap grow
+        self._expiry = [(offer.valid_until, offer.id) for offer in self._offers.values()]
+        heapq.heapify(self._expiry)
+    
+    def _remove(self, offer_id: str):
+        offer = self._offers.pop(offer_id, None)
+        if offer is None:
+            return
+        offers = self._by_flight.get(offer.flight_id, {})
+        offers.pop(offer_id, None)
+        if not offers:
+            self._by_flight.pop(offer.flight_id, None)
+        self._refresh(offer.flight_id)
+    
+    def _refresh(self, flight_id: str):
+        now = datetime.utcnow()
+        valid = [o for o in self._by_flight.get(flight_id, {}).values() if o.valid_until > now]
+        if valid:
+            self._best[flight_id] = max(valid, key=lambda o: (o.discount, o.valid_until, o.id))
+        else:
+            self._best.pop(flight_id, None)
+    
+    def _expire(self, now: datetime):
+        # Heap entries of changed or removed offers are skipped lazily
+        while self._expiry and self._expiry[0][0] <= now:
+            valid_until, offer_id = heapq.heappop(self._expiry)
+            offer = self._offers.get(offer_id)
+            if offer is not None and offer.valid_until == valid_until:
+                self._remove(offer_id)
+    
+    # Lookups
+    
+    def best_offer(self, flight_id: str) -> Optional[OfferRecord]:
+        """The largest currently valid discount for a flight, if any."""
+        with self._lock:
+            self._expire(datetime.utcnow())
+            return self._best.get(flight_id)
+    
+    def price(self, flight_id: str, base_price: float) -> Tuple[float, Optional[OfferRecord]]:
+        """Effective price of a flight and the offer that produced it."""
+        offer = self.best_offer(flight_id)
+        if offer is None:
+            return base_price, None
+        discount = min(max(offer.discount, 0.0), 100.0)
+        return round(base_price * (1 - discount / 100.0), 2), offer
+
+
+# Process-wide index, started with the application
+offer_index = OfferIndex()
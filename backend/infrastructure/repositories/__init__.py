@@ -4,6 +4,14 @@ from .flight_repository import FlightRepository
 from .booking_repository import BookingRepository
 from .company_repository import CompanyRepository
 from .content_repository import BannerRepository, OfferRepository
+from .stats_repository import StatsRepository
+from .rollup_repository import RollupRepository
+from .cancellation_repository import CancellationRepository
+from .task_repository import TaskRepository
+from .notification_repository import NotificationRepository, AuditRepository
+from .hold_repository import HoldRepository
+from .seat_map_repository import SeatMapRepository
+from .waitlist_repository import WaitlistRepository
 
 __all__ = [
     "UserRepository",
@@ -11,6 +19,15 @@ __all__ = [
     "BookingRepository",
     "CompanyRepository",
     "BannerRepository",
-    "OfferRepository"
+    "OfferRepository",
+    "StatsRepository",
+    "RollupRepository",
+    "CancellationRepository",
+    "TaskRepository",
+    "NotificationRepository",
+    "AuditRepository",
+    "HoldRepository",
+    "SeatMapRepository",
+    "WaitlistRepository"
 ]
 
@@ -1,18 +1,124 @@
 """Base repository with common CRUD operations."""
+import contextvars
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, List, Optional, Dict, Any
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import wraps
+from itertools import islice
+from typing import (
+    Generic, TypeVar, List, Optional, Dict, Any, Callable, Iterable, Iterator, Mapping, Tuple, Type, Union,
+    AbstractSet
+)
+from datetime import datetime, timezone
+from google.api_core.exceptions import (
+    Aborted, DeadlineExceeded, FailedPrecondition, GoogleAPICallError, NotFound, ServiceUnavailable
+)
 from google.cloud.firestore_v1 import FieldFilter
+from observability import metrics, cost
+from observability.tracing import tracer
+from .counters import RollupContributions, add_rollups, contribution_delta, platform_stats, queue_rollups, sum_contributions
 
 T = TypeVar('T')
+M = TypeVar('M')
+
+# Commit errors a bulk write retries; conditional writes fail with
+# FailedPrecondition when a document changed since it was read
+RETRYABLE_WRITE_ERRORS = (Aborted, DeadlineExceeded, FailedPrecondition, ServiceUnavailable)
+# Upper bound of the first retry's jittered wait, doubled per attempt; long
+# enough for contention on shared counter documents to clear
+BULK_BACKOFF_SECONDS = 0.05
+
+Documents = Union[Mapping[str, Dict[str, Any]], Iterable[Tuple[str, Dict[str, Any]]]]
+
+
+def naive_utc(value: Optional[datetime]) -> datetime:
+    """Naive UTC form of a stored timestamp (Firestore returns aware ones); None sorts first."""
+    if value is None:
+        return datetime.min
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class BulkWriteResult:
+    """
+    Outcome of a bulk write: how many documents were written and, by
+    entity ID, the error that kept each of the others from being written.
+    """
+    
+    __slots__ = ("written", "failed")
+    
+    def __init__(self, written: int = 0, failed: Optional[Dict[str, Exception]] = None):
+        self.written = written
+        self.failed: Dict[str, Exception] = failed or {}
+    
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+    
+    def add(self, other: "BulkWriteResult"):
+        self.written += other.written
+        self.failed.update(other.failed)
+    
+    def __repr__(self) -> str:
+        return f"BulkWriteResult(written={self.written}, failed={len(self.failed)})"
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _pairs(documents: Documents) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    return documents.items() if isinstance(documents, Mapping) else documents
+
+
+def instrumented(operation: str):
+    """
+    Decorator recording latency and errors of a repository method and
+    wrapping it in a trace span. Both are labelled with the repository's
+    collection and ``operation``.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with tracer.start_span(f"{self.collection_name}.{operation}") as span:
+                span.set_attribute("db.collection", self.collection_name)
+                span.set_attribute("db.operation", operation)
+                with metrics.repository_timer(self.collection_name, operation):
+                    return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 
 class BaseRepository(ABC, Generic[T]):
     """
     Abstract base repository implementing Repository pattern.
     Provides common CRUD operations for all entities.
+    
+    Repositories contributing to the platform statistics or to rollups
+    override ``_stats_contribution`` / ``_rollup_contributions`` and list the
+    fields those depend on in ``derived_fields``; their writes then update the
+    counters in the same batch.
     """
     
+    derived_fields: frozenset = frozenset()
+    
+    # Stored documents were validated when written. Repositories whose models
+    # are costly to validate (EmailStr) build them from stored fields
+    # without validating again; elsewhere pydantic's compiled validation is
+    # cheaper than model_construct. ``validate_reads`` validates every read.
+    trusted_reads: bool = False
+    validate_reads: bool = False
+    
+    # Model with every field optional, built from reads with a field mask
+    partial_model: Optional[Type] = None
+    
     def __init__(self, db, collection_name: str):
         """Initialize repository with database and collection name."""
         self.db = db
@@ -29,15 +135,214 @@ class BaseRepository(ABC, Generic[T]):
         """Convert domain model to Firestore document."""
         pass
     
-    def create(self, entity_id: str, data: Dict[str, Any]) -> str:
-        """Create a new document."""
+    def _model(self, model: Type[M], **fields) -> M:
+        """
+        Domain model from stored fields, given in their validated form
+        (enum values, not members); not validated again for ``trusted_reads``.
+        """
+        if self.trusted_reads and not self.validate_reads:
+            return model.model_construct(**fields)
+        return model(**fields)
+    
+    def _record_reads(self, count: int):
+        """Account for billable document reads on this collection."""
+        metrics.record_documents_read(self.collection_name, count)
+        cost.record_reads(self.collection_name, count)
+    
+    def _record_writes(self, count: int):
+        """Account for document writes on this collection."""
+        metrics.record_documents_written(self.collection_name, count)
+        cost.record_writes(self.collection_name, count)
+    
+    def _stats_contribution(self, doc: Dict[str, Any]) -> Dict[str, float]:
+        """Platform counters one stored document accounts for."""
+        return {}
+    
+    def _rollup_contributions(self, entity_id: str, doc: Dict[str, Any]) -> RollupContributions:
+        """Rollup documents and counters one stored document accounts for."""
+        return {}
+    
+    def _derived_writes(self, batch, changes: Iterable[Tuple[str, Optional[Dict[str, Any]],
+                                                             Optional[Dict[str, Any]]]]) -> Dict[str, int]:
+        """
+        Queue the writes derived from ``(entity_id, before, after)`` document
+        changes on ``batch``, summed so each counter document is written once.
+        Returns the number of queued writes per collection.
+        """
+        stats_before, stats_after = [], []
+        rollups_before: RollupContributions = {}
+        rollups_after: RollupContributions = {}
+        for entity_id, before, after in changes:
+            if before:
+                stats_before.append(self._stats_contribution(before))
+                add_rollups(rollups_before, self._rollup_contributions(entity_id, before))
+            if after:
+                stats_after.append(self._stats_contribution(after))
+                add_rollups(rollups_after, self._rollup_contributions(entity_id, after))
+        writes = queue_rollups(self.db, batch, rollups_before, rollups_after)
+        delta = contribution_delta(sum_contributions(stats_before), sum_contributions(stats_after))
+        if platform_stats.add_to_batch(self.db, batch, delta):
+            writes[platform_stats.collection] = writes.get(platform_stats.collection, 0) + 1
+        return writes
+    
+    def _commit_with_derived(self, batch, entity_id: str, before: Optional[Dict[str, Any]],
+                             after: Optional[Dict[str, Any]], extra: Optional[Dict[str, int]] = None):
+        """
+        Commit ``batch`` together with the derived writes of the change;
+        ``extra`` counts other writes already queued, per collection.
+        """
+        derived = self._derived_writes(batch, [(entity_id, before, after)])
+        for collection, count in (extra or {}).items():
+            derived[collection] = derived.get(collection, 0) + count
+        batch.commit()
+        self._record_writes(1)
+        self._record_derived_writes(derived)
+    
+    def _update_snapshots(self, snapshots: List, data: Dict[str, Any], batch_size: int = 200,
+                          extra_writes: Optional[Callable[[Any, List], Dict[str, int]]] = None) -> int:
+        """
+        Apply ``data`` to already-read documents in batched writes carrying
+        their derived writes. Each write is conditional on the document being
+        unchanged since it was read, so a concurrent change fails the batch
+        instead of skewing the counters. ``extra_writes(batch, chunk)`` may
+        queue more writes (e.g. a progress checkpoint) into each batch and
+        returns their count per collection. Returns the number of documents updated.
+        """
+        data = {**data, 'updated_at': datetime.utcnow()}
+        updated = 0
+        for start in range(0, len(snapshots), batch_size):
+            chunk = snapshots[start:start + batch_size]
+            batch = self.db.batch()
+            changes = []
+            for snapshot in chunk:
+                before = snapshot.to_dict()
+                batch.update(snapshot.reference, data,
+                             option=self.db.write_option(last_update_time=snapshot.update_time))
+                changes.append((snapshot.id, before, {**before, **data}))
+            derived = self._derived_writes(batch, changes)
+            if extra_writes is not None:
+                for collection, count in extra_writes(batch, chunk).items():
+                    derived[collection] = derived.get(collection, 0) + count
+            batch.commit()
+            updated += len(chunk)
+            self._record_writes(len(chunk))
+            self._record_derived_writes(derived)
+        return updated
+    
+    def queue_update(self, batch, snapshot, data: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Queue an update of an already-read document and its derived writes
+        into ``batch``, conditional on the document being unchanged since it
+        was read. Returns the queued writes per collection.
+        """
+        data = {**data, 'updated_at': datetime.utcnow()}
+        before = snapshot.to_dict()
+        batch.update(snapshot.reference, data, option=self.db.write_option(last_update_time=snapshot.update_time))
+        writes = self._derived_writes(batch, [(snapshot.id, before, {**before, **data})])
+        writes[self.collection_name] = writes.get(self.collection_name, 0) + 1
+        return writes
+    
+    def commit_batch(self, batch, writes: Dict[str, int]):
+        """
+        Commit a batch assembled from ``queue_*`` calls of several
+        repositories and account for its writes (per collection).
+        """
+        batch.commit()
+        self._record_derived_writes(writes)
+    
+    def _record_derived_writes(self, derived: Dict[str, int]):
+        """Account for derived writes by collection."""
+        for collection, count in derived.items():
+            metrics.record_documents_written(collection, count)
+            cost.record_writes(collection, count)
+    
+    def _write_with_derived(self, entity_id: str, queue: Callable[[Any, Any], Optional[Dict[str, Any]]],
+                            attempts: int = 5):
+        """
+        Read a document, let ``queue(batch, snapshot)`` queue a write of it
+        and return the document it leaves (None when deleted), and commit
+        that with its derived writes. The write should be conditional on the
+        snapshot, so a concurrent change fails the commit instead of skewing
+        the counters; the document is then read again and the write retried.
+        """
+        ref = self.collection.document(entity_id)
+        for attempt in range(attempts):
+            snapshot = ref.get()
+            self._record_reads(1)
+            batch = self.db.batch()
+            after = queue(batch, snapshot)
+            try:
+                self._commit_with_derived(batch, entity_id, snapshot.to_dict() if snapshot.exists else None, after)
+                return
+            except FailedPrecondition:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(random.uniform(0, BULK_BACKOFF_SECONDS * 2 ** attempt))
+    
+    def _docs_to_domain(self, docs: Iterable, fields: Optional[AbstractSet[str]] = None) -> List[T]:
+        """
+        Convert streamed query results to domain models, or to partial
+        models of the documents read with the field mask ``fields``.
+        A query is billed at least one read even when it matches nothing.
+        """
+        results = []
+        for doc in docs:
+            doc_dict = doc.to_dict()
+            doc_dict['id'] = doc.id
+            results.append(self._to_domain(doc_dict) if fields is None else self._model(self.partial_model, **doc_dict))
+        self._record_reads(max(len(results), 1))
+        return results
+    
+    def _select(self, query, fields: Optional[AbstractSet[str]]):
+        """``query`` reading only the stored ``fields`` (the ID always comes along); all of them for None."""
+        if fields is None:
+            return query
+        return query.select(sorted(set(fields) - {'id'}))
+    
+    def _project(self, entities: List[T], fields: Optional[AbstractSet[str]]) -> List[Any]:
+        """Partial models with only ``fields`` of already decoded entities; the entities for None."""
+        if fields is None:
+            return entities
+        return [self.partial_model.model_construct(**{name: getattr(entity, name) for name in fields})
+                for entity in entities]
+    
+    @instrumented("create")
+    def create(self, entity_id: str, data: Dict[str, Any],
+               extra_writes: Optional[Callable[[Any], Dict[str, int]]] = None) -> str:
+        """
+        Create a new document. ``extra_writes(batch)`` may queue more writes
+        to commit atomically with it and returns their count per collection;
+        it runs before the document is queued, so it may still add to ``data``.
+        """
         data['created_at'] = datetime.utcnow()
-        self.collection.document(entity_id).set(data)
+        ref = self.collection.document(entity_id)
+        if self.derived_fields or extra_writes is not None:
+            batch = self.db.batch()
+            extra = extra_writes(batch) if extra_writes is not None else None
+            batch.set(ref, data)
+            self._commit_with_derived(batch, entity_id, None, data, extra)
+        else:
+            ref.set(data)
+            self._record_writes(1)
         return entity_id
     
+    def queue_create(self, batch, entity_id: str, data: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Queue creating a document and its derived writes into ``batch``,
+        for callers committing it together with other writes. Returns the
+        queued writes per collection.
+        """
+        data['created_at'] = datetime.utcnow()
+        batch.set(self.collection.document(entity_id), data)
+        writes = self._derived_writes(batch, [(entity_id, None, data)])
+        writes[self.collection_name] = writes.get(self.collection_name, 0) + 1
+        return writes
+    
+    @instrumented("get_by_id")
     def get_by_id(self, entity_id: str) -> Optional[T]:
         """Get entity by ID."""
         doc = self.collection.document(entity_id).get()
+        self._record_reads(1)
         if not doc.exists:
             return None
         
@@ -45,43 +350,257 @@ class BaseRepository(ABC, Generic[T]):
         doc_dict['id'] = doc.id
         return self._to_domain(doc_dict)
     
-    def get_all(self, limit: Optional[int] = None) -> List[T]:
-        """Get all entities with optional limit."""
-        query = self.collection
+    @instrumented("get_snapshot")
+    def get_snapshot(self, entity_id: str):
+        """Snapshot of a document, for a later conditional write; None if missing."""
+        snapshot = self.collection.document(entity_id).get()
+        self._record_reads(1)
+        return snapshot if snapshot.exists else None
+    
+    def from_snapshot(self, snapshot) -> T:
+        """Domain model of a document snapshot."""
+        doc_dict = snapshot.to_dict()
+        doc_dict['id'] = snapshot.id
+        return self._to_domain(doc_dict)
+    
+    @instrumented("get_many")
+    def get_many(self, entity_ids: Iterable[str], chunk_size: int = 300) -> Dict[str, T]:
+        """
+        Get entities by ID with batched multi-gets, one round-trip per
+        ``chunk_size`` distinct IDs. Duplicates are fetched once; missing
+        IDs are absent from the result.
+        """
+        unique = list(dict.fromkeys(entity_ids))
+        found: Dict[str, T] = {}
+        for start in range(0, len(unique), chunk_size):
+            refs = [self.collection.document(entity_id) for entity_id in unique[start:start + chunk_size]]
+            for doc in self.db.get_all(refs):
+                if doc.exists:
+                    doc_dict = doc.to_dict()
+                    doc_dict['id'] = doc.id
+                    found[doc.id] = self._to_domain(doc_dict)
+            self._record_reads(len(refs))
+        return found
+    
+    @instrumented("get_all")
+    def get_all(self, limit: Optional[int] = None, fields: Optional[AbstractSet[str]] = None) -> List[T]:
+        """Get all entities with optional limit; only ``fields`` of them with a field mask."""
+        query = self._select(self.collection, fields)
         if limit:
             query = query.limit(limit)
         
-        docs = query.stream()
-        results = []
-        for doc in docs:
-            doc_dict = doc.to_dict()
-            doc_dict['id'] = doc.id
-            results.append(self._to_domain(doc_dict))
-        return results
+        return self._docs_to_domain(query.stream(), fields)
     
+    @instrumented("update")
     def update(self, entity_id: str, data: Dict[str, Any]) -> bool:
         """Update an entity."""
         data['updated_at'] = datetime.utcnow()
-        self.collection.document(entity_id).update(data)
+        ref = self.collection.document(entity_id)
+        if self.derived_fields.intersection(data):
+            # The counter delta needs the values being replaced
+            def queue(batch, snapshot) -> Optional[Dict[str, Any]]:
+                if not snapshot.exists:
+                    batch.update(ref, data)  # fails with NotFound
+                    return None
+                batch.update(ref, data, option=self.db.write_option(last_update_time=snapshot.update_time))
+                return {**snapshot.to_dict(), **data}
+            
+            self._write_with_derived(entity_id, queue)
+        else:
+            ref.update(data)
+            self._record_writes(1)
         return True
     
+    @instrumented("delete")
     def delete(self, entity_id: str) -> bool:
         """Delete an entity."""
-        self.collection.document(entity_id).delete()
+        ref = self.collection.document(entity_id)
+        if self.derived_fields:
+            def queue(batch, snapshot) -> None:
+                if snapshot.exists:
+                    batch.delete(ref, option=self.db.write_option(last_update_time=snapshot.update_time))
+                else:
+                    batch.delete(ref)
+            
+            self._write_with_derived(entity_id, queue)
+        else:
+            ref.delete()
+            self._record_writes(1)
         return True
     
-    def find_by_field(self, field: str, value: Any) -> List[T]:
-        """Find entities by a specific field value."""
-        docs = self.collection.where(filter=FieldFilter(field, "==", value)).stream()
-        results = []
-        for doc in docs:
-            doc_dict = doc.to_dict()
-            doc_dict['id'] = doc.id
-            results.append(self._to_domain(doc_dict))
-        return results
+    @instrumented("create_many")
+    def create_many(self, documents: Documents, batch_size: int = 200, workers: int = 4,
+                    attempts: int = 5) -> BulkWriteResult:
+        """
+        Create documents from an ``{id: data}`` mapping or a stream of
+        ``(id, data)`` pairs in batched writes; see ``_bulk_write``.
+        """
+        def queue(batch, chunk) -> Dict[str, int]:
+            now = datetime.utcnow()
+            changes = []
+            for entity_id, data in chunk:
+                doc = {**data, 'created_at': now}
+                batch.set(self.collection.document(entity_id), doc)
+                changes.append((entity_id, None, doc))
+            return self._queued_with_derived(batch, changes)
+        
+        return self._bulk_write("create_many", _pairs(documents), queue, batch_size, workers, attempts)
+    
+    @instrumented("update_many")
+    def update_many(self, updates: Documents, batch_size: int = 200, workers: int = 4,
+                    attempts: int = 5) -> BulkWriteResult:
+        """
+        Apply per-document field updates from an ``{id: fields}`` mapping or
+        a stream of ``(id, fields)`` pairs in batched writes; see
+        ``_bulk_write``. A missing document fails with ``NotFound``.
+        """
+        def queue(batch, chunk) -> Dict[str, int]:
+            now = datetime.utcnow()
+            if not any(self.derived_fields.intersection(data) for _, data in chunk):
+                for entity_id, data in chunk:
+                    batch.update(self.collection.document(entity_id), {**data, 'updated_at': now})
+                return {self.collection_name: len(chunk)}
+            
+            # The counter deltas need the values being replaced
+            snapshots = self._chunk_snapshots(chunk)
+            changes = []
+            for entity_id, data in chunk:
+                snapshot = snapshots.get(entity_id)
+                if snapshot is None:
+                    raise NotFound(f"No document to update: {self.collection_name}/{entity_id}")
+                data = {**data, 'updated_at': now}
+                before = snapshot.to_dict()
+                batch.update(snapshot.reference, data,
+                             option=self.db.write_option(last_update_time=snapshot.update_time))
+                changes.append((entity_id, before, {**before, **data}))
+            return self._queued_with_derived(batch, changes)
+        
+        return self._bulk_write("update_many", _pairs(updates), queue, batch_size, workers, attempts)
     
+    @instrumented("delete_many")
+    def delete_many(self, entity_ids: Iterable[str], batch_size: int = 200, workers: int = 4,
+                    attempts: int = 5) -> BulkWriteResult:
+        """Delete documents by ID in batched writes; see ``_bulk_write``. Missing IDs count as deleted."""
+        def queue(batch, chunk) -> Dict[str, int]:
+            if not self.derived_fields:
+                for entity_id, _ in chunk:
+                    batch.delete(self.collection.document(entity_id))
+                return {self.collection_name: len(chunk)}
+            
+            snapshots = self._chunk_snapshots(chunk)
+            changes = []
+            for entity_id, _ in chunk:
+                snapshot = snapshots.get(entity_id)
+                if snapshot is None:
+                    batch.delete(self.collection.document(entity_id))
+                    continue
+                batch.delete(snapshot.reference, option=self.db.write_option(last_update_time=snapshot.update_time))
+                changes.append((entity_id, snapshot.to_dict(), None))
+            return self._queued_with_derived(batch, changes, len(chunk))
+        
+        return self._bulk_write("delete_many", ((entity_id, None) for entity_id in entity_ids),
+                                queue, batch_size, workers, attempts)
+    
+    def _chunk_snapshots(self, chunk: List[Tuple[str, Any]]) -> Dict[str, Any]:
+        """Existing documents of a bulk write chunk by ID, in one multi-get."""
+        unique = dict.fromkeys(entity_id for entity_id, _ in chunk)
+        refs = [self.collection.document(entity_id) for entity_id in unique]
+        found = {doc.id: doc for doc in self.db.get_all(refs) if doc.exists}
+        self._record_reads(len(refs))
+        return found
+    
+    def _queued_with_derived(self, batch, changes: List[Tuple[str, Optional[Dict[str, Any]],
+                                                              Optional[Dict[str, Any]]]],
+                             written: Optional[int] = None) -> Dict[str, int]:
+        """
+        Queue the derived writes of the changes already queued on ``batch``;
+        returns all queued writes per collection (``written`` of this one,
+        one per change by default).
+        """
+        writes = self._derived_writes(batch, changes) if self.derived_fields else {}
+        writes[self.collection_name] = writes.get(self.collection_name, 0) + (
+            len(changes) if written is None else written
+        )
+        return writes
+    
+    def _bulk_write(self, operation: str, items: Iterable[Tuple[str, Any]],
+                    queue: Callable[[Any, List[Tuple[str, Any]]], Dict[str, int]],
+                    batch_size: int, workers: int, attempts: int) -> BulkWriteResult:
+        """
+        Write ``(entity_id, value)`` items in chunks of ``batch_size``, each
+        one batched write that ``queue(batch, chunk)`` fills with the chunk's
+        writes and their derived writes. Up to ``workers`` chunks commit at a
+        time and at most twice as many are held, so a stream of any length
+        is written in constant memory. A chunk failing with a retryable error
+        is rebuilt and retried up to ``attempts`` times with jittered
+        exponential backoff; one rejected for its content is split in halves
+        until the documents at fault are isolated. Nothing is raised for
+        documents that could not be written: they are reported in the result.
+        Chunks run in copies of the caller's context and are charged to its
+        request; a request rejected for its read budget raises
+        ``ReadBudgetExceeded`` before any further chunk commits.
+        """
+        result = BulkWriteResult()
+        chunks = _chunks(items, max(1, batch_size))
+        if workers <= 1:
+            for chunk in chunks:
+                result.add(self._write_chunk(operation, chunk, queue, attempts))
+            return result
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.collection_name}-bulk") as pool:
+            pending = set()
+            for chunk in chunks:
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result.add(future.result())
+                # In a copy of the caller's context, so reads and writes are charged to its request
+                pending.add(pool.submit(contextvars.copy_context().run,
+                                        self._write_chunk, operation, chunk, queue, attempts))
+            for future in pending:
+                result.add(future.result())
+        return result
+    
+    def _write_chunk(self, operation: str, chunk: List[Tuple[str, Any]],
+                     queue: Callable[[Any, List[Tuple[str, Any]]], Dict[str, int]],
+                     attempts: int) -> BulkWriteResult:
+        """Commit one chunk of a bulk write; see ``_bulk_write``."""
+        error: Optional[Exception] = None
+        for attempt in range(attempts):
+            try:
+                batch = self.db.batch()
+                writes = queue(batch, chunk)
+                # A request rejected for its reads must not go on writing
+                cost.check_budget()
+                batch.commit()
+            except RETRYABLE_WRITE_ERRORS as e:
+                error = e
+                if attempt < attempts - 1:
+                    metrics.bulk_write_retries.labels(self.collection_name, operation).inc()
+                    time.sleep(random.uniform(0, BULK_BACKOFF_SECONDS * 2 ** attempt))
+                continue
+            except (GoogleAPICallError, ValueError, TypeError) as e:
+                if len(chunk) == 1:
+                    error = e
+                    break
+                middle = len(chunk) // 2
+                result = self._write_chunk(operation, chunk[:middle], queue, attempts)
+                result.add(self._write_chunk(operation, chunk[middle:], queue, attempts))
+                return result
+            self._record_derived_writes(writes)
+            return BulkWriteResult(len(chunk))
+        metrics.bulk_write_failures.labels(self.collection_name, operation).inc(len(chunk))
+        return BulkWriteResult(failed={entity_id: error for entity_id, _ in chunk})
+    
+    @instrumented("find_by_field")
+    def find_by_field(self, field: str, value: Any, fields: Optional[AbstractSet[str]] = None) -> List[T]:
+        """Find entities by a specific field value; only ``fields`` of them with a field mask."""
+        docs = self._select(self.collection.where(filter=FieldFilter(field, "==", value)), fields).stream()
+        return self._docs_to_domain(docs, fields)
+    
+    @instrumented("exists")
     def exists(self, entity_id: str) -> bool:
         """Check if entity exists."""
         doc = self.collection.document(entity_id).get()
+        self._record_reads(1)
         return doc.exists
-
@@ -1,27 +1,67 @@
 """Booking repository implementation."""
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from google.cloud.firestore_v1 import FieldFilter
 from domain.models import Booking, BookingStatus
-from .base_repository import BaseRepository
+from .base_repository import BaseRepository, instrumented
+from .counters import RollupContributions, day_key
 
 
 class BookingRepository(BaseRepository[Booking]):
     """Repository for Booking entity operations."""
     
+    derived_fields = frozenset({'status', 'total_price', 'passengers'})
+    
     def __init__(self, db):
         super().__init__(db, "bookings")
     
+    def _stats_contribution(self, doc: Dict[str, Any]) -> Dict[str, float]:
+        """Bookings by status; gross revenue of all bookings, net of confirmed ones."""
+        status = doc.get('status', 'confirmed')
+        price = doc.get('total_price', 0)
+        return {
+            "bookings.total": 1,
+            f"bookings.status.{status}": 1,
+            "revenue.gross": price,
+            "revenue.net": price if status == BookingStatus.CONFIRMED.value else 0,
+        }
+    
+    def _rollup_contributions(self, entity_id: str, doc: Dict[str, Any]) -> RollupContributions:
+        """
+        Sales of the booking on its flight's rollup and, when the booking
+        carries the flight's company and departure, on the company's day.
+        """
+        confirmed = doc.get('status', 'confirmed') == BookingStatus.CONFIRMED.value
+        passengers, price = doc.get('passengers', 0), doc.get('total_price', 0)
+        counters = {
+            'bookings': 1,
+            'seats_sold': passengers if confirmed else 0,
+            'cancellations': 0 if confirmed else 1,
+            'cancelled_seats': 0 if confirmed else passengers,
+            'gross_revenue': price,
+            'net_revenue': price if confirmed else 0,
+        }
+        company_id, day = doc.get('company_id'), day_key(doc.get('departure_time'))
+        labels = {'company_id': company_id, 'departure_date': day} if company_id and day else {}
+        contributions: RollupContributions = {("flight_rollups", doc['flight_id']): (labels, counters)}
+        if company_id and day:
+            contributions[("company_rollups", f"{company_id}_{day}")] = ({'company_id': company_id, 'date': day}, counters)
+        return contributions
+    
     def _to_domain(self, doc_dict: Dict[str, Any]) -> Booking:
         """Convert Firestore document to Booking domain model."""
-        return Booking(
+        return self._model(
+            Booking,
             id=doc_dict['id'],
             user_id=doc_dict['user_id'],
             flight_id=doc_dict['flight_id'],
             confirmation_id=doc_dict['confirmation_id'],
             passengers=doc_dict['passengers'],
             total_price=doc_dict['total_price'],
-            status=BookingStatus(doc_dict.get('status', 'confirmed')),
+            status=doc_dict.get('status', 'confirmed'),
             booked_at=doc_dict['booked_at'],
-            cancelled_at=doc_dict.get('cancelled_at')
+            cancelled_at=doc_dict.get('cancelled_at'),
+            offer_id=doc_dict.get('offer_id'),
+            seats=doc_dict.get('seats', [])
         )
     
     def _from_domain(self, entity: Booking) -> Dict[str, Any]:
@@ -37,15 +77,52 @@ class BookingRepository(BaseRepository[Booking]):
         }
         if entity.cancelled_at:
             data['cancelled_at'] = entity.cancelled_at
+        if entity.offer_id:
+            data['offer_id'] = entity.offer_id
+        if entity.seats:
+            data['seats'] = entity.seats
         return data
     
     def get_by_user(self, user_id: str) -> List[Booking]:
         """Get all bookings for a specific user."""
         return self.find_by_field('user_id', user_id)
     
-    def get_by_flight(self, flight_id: str) -> List[Booking]:
-        """Get all bookings for a specific flight."""
-        return self.find_by_field('flight_id', flight_id)
+    def get_by_flight(self, flight_id: str, status: Optional[BookingStatus] = None) -> List[Booking]:
+        """Get all bookings for a specific flight, optionally only those in ``status``."""
+        if status is None:
+            return self.find_by_field('flight_id', flight_id)
+        return self._get_by_flight_and_status(flight_id, status)
+    
+    @instrumented("find_by_flight_and_status")
+    def _get_by_flight_and_status(self, flight_id: str, status: BookingStatus) -> List[Booking]:
+        docs = (self.collection
+                .where(filter=FieldFilter('flight_id', '==', flight_id))
+                .where(filter=FieldFilter('status', '==', BookingStatus(status).value))
+                .stream())
+        return self._docs_to_domain(docs)
+    
+    @instrumented("page_by_flight")
+    def page_by_flight(self, flight_id: str, status: BookingStatus, limit: int) -> list:
+        """Snapshots of up to ``limit`` bookings of a flight in ``status``, for batched updates."""
+        docs = list(self.collection
+                    .where(filter=FieldFilter('flight_id', '==', flight_id))
+                    .where(filter=FieldFilter('status', '==', BookingStatus(status).value))
+                    .limit(limit)
+                    .stream())
+        self._record_reads(max(len(docs), 1))
+        return docs
+    
+    @instrumented("refund")
+    def refund(self, snapshots: list, batch_size: int = 200, extra_writes=None) -> int:
+        """
+        Move bookings (snapshots from ``page_by_flight``) to refunded in
+        batched conditional writes; ``extra_writes`` as in ``_update_snapshots``.
+        """
+        from datetime import datetime
+        return self._update_snapshots(snapshots, {
+            'status': BookingStatus.REFUNDED.value,
+            'cancelled_at': datetime.utcnow()
+        }, batch_size, extra_writes)
     
     def cancel_booking(self, booking_id: str) -> bool:
         """Cancel a booking."""
@@ -0,0 +1,79 @@
+"""Flight cancellation progress repository."""
+from datetime import datetime
+from typing import Dict, Any, List
+from google.cloud.firestore_v1 import FieldFilter, Increment
+from domain.models import FlightCancellation, CancellationStatus
+from .base_repository import BaseRepository, instrumented
+
+
+class CancellationRepository(BaseRepository[FlightCancellation]):
+    """Repository for cascading flight cancellations, keyed by flight ID."""
+    
+    def __init__(self, db):
+        super().__init__(db, "flight_cancellations")
+    
+    def _to_domain(self, doc_dict: Dict[str, Any]) -> FlightCancellation:
+        """Convert Firestore document to FlightCancellation domain model."""
+        return self._model(
+            FlightCancellation,
+            id=doc_dict['id'],
+            status=doc_dict.get('status', 'pending'),
+            requested_by=doc_dict.get('requested_by'),
+            bookings_refunded=doc_dict.get('bookings_refunded', 0),
+            amount_refunded=round(doc_dict.get('amount_refunded', 0.0), 2),
+            pages=doc_dict.get('pages', 0),
+            last_booking_id=doc_dict.get('last_booking_id'),
+            attempts=doc_dict.get('attempts', 0),
+            error=doc_dict.get('error'),
+            created_at=doc_dict['created_at'],
+            updated_at=doc_dict.get('updated_at'),
+            completed_at=doc_dict.get('completed_at')
+        )
+    
+    def _from_domain(self, entity: FlightCancellation) -> Dict[str, Any]:
+        """Convert FlightCancellation domain model to Firestore document."""
+        return {
+            'status': entity.status,
+            'requested_by': entity.requested_by,
+            'bookings_refunded': entity.bookings_refunded,
+            'amount_refunded': entity.amount_refunded,
+            'pages': entity.pages,
+            'last_booking_id': entity.last_booking_id,
+            'attempts': entity.attempts,
+            'error': entity.error,
+            'created_at': entity.created_at
+        }
+    
+    def queue_checkpoint(self, batch, flight_id: str, bookings: list) -> Dict[str, int]:
+        """
+        Queue the progress of refunding ``bookings`` (snapshots) into the
+        batch that refunds them, so progress and refunds commit together.
+        """
+        batch.update(self.collection.document(flight_id), {
+            'bookings_refunded': Increment(len(bookings)),
+            'amount_refunded': Increment(round(sum(doc.to_dict().get('total_price', 0) for doc in bookings), 2)),
+            'pages': Increment(1),
+            'last_booking_id': bookings[-1].id,
+            'updated_at': datetime.utcnow()
+        })
+        return {self.collection_name: 1}
+    
+    def mark(self, flight_id: str, status: CancellationStatus, **fields) -> bool:
+        """Move a cancellation to ``status``."""
+        data = {'status': status.value, **fields}
+        if status == CancellationStatus.COMPLETED:
+            data['completed_at'] = datetime.utcnow()
+        return self.update(flight_id, data)
+    
+    @instrumented("find_unfinished")
+    def find_unfinished(self, limit: int = 50) -> List[FlightCancellation]:
+        """Cancellations that are pending, running or failed."""
+        docs = (self.collection
+                .where(filter=FieldFilter('status', 'in', [
+                    CancellationStatus.PENDING.value,
+                    CancellationStatus.RUNNING.value,
+                    CancellationStatus.FAILED.value
+                ]))
+                .limit(limit)
+                .stream())
+        return self._docs_to_domain(docs)
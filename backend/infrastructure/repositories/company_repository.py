@@ -12,7 +12,8 @@ class CompanyRepository(BaseRepository[AirlineCompany]):
     
     def _to_domain(self, doc_dict: Dict[str, Any]) -> AirlineCompany:
         """Convert Firestore document to AirlineCompany domain model."""
-        return AirlineCompany(
+        return self._model(
+            AirlineCompany,
             id=doc_dict['id'],
             name=doc_dict['name'],
             code=doc_dict['code'],
@@ -1,7 +1,8 @@
 """Content repositories for banners and offers."""
 from typing import Dict, Any, List
 from domain.models import Banner, Offer
-from .base_repository import BaseRepository
+from domain.records import OfferRecord
+from .base_repository import BaseRepository, instrumented, naive_utc
 from google.cloud.firestore_v1 import FieldFilter
 
 
@@ -13,7 +14,8 @@ class BannerRepository(BaseRepository[Banner]):
     
     def _to_domain(self, doc_dict: Dict[str, Any]) -> Banner:
         """Convert Firestore document to Banner domain model."""
-        return Banner(
+        return self._model(
+            Banner,
             id=doc_dict['id'],
             title=doc_dict['title'],
             description=doc_dict['description'],
@@ -41,6 +43,7 @@ class BannerRepository(BaseRepository[Banner]):
             data['updated_at'] = entity.updated_at
         return data
     
+    @instrumented("get_active_banners")
     def get_active_banners(self) -> List[Banner]:
         """Get all active banners ordered by order field."""
         docs = (self.collection
@@ -48,12 +51,7 @@ class BannerRepository(BaseRepository[Banner]):
                 .order_by("order")
                 .stream())
         
-        results = []
-        for doc in docs:
-            doc_dict = doc.to_dict()
-            doc_dict['id'] = doc.id
-            results.append(self._to_domain(doc_dict))
-        return results
+        return self._docs_to_domain(docs)
 
 
 class OfferRepository(BaseRepository[Offer]):
@@ -64,7 +62,8 @@ class OfferRepository(BaseRepository[Offer]):
     
     def _to_domain(self, doc_dict: Dict[str, Any]) -> Offer:
         """Convert Firestore document to Offer domain model."""
-        return Offer(
+        return self._model(
+            Offer,
             id=doc_dict['id'],
             flight_id=doc_dict['flight_id'],
             image_url=doc_dict.get('image_url'),
@@ -75,6 +74,13 @@ class OfferRepository(BaseRepository[Offer]):
             updated_at=doc_dict.get('updated_at')
         )
     
+    def to_record(self, doc_dict: Dict[str, Any]) -> OfferRecord:
+        """Slotted record of a stored offer, for the offer index."""
+        if self.validate_reads:
+            self._to_domain(doc_dict)
+        return OfferRecord(doc_dict['id'], doc_dict['flight_id'], float(doc_dict['discount']),
+                           naive_utc(doc_dict['valid_until']))
+    
     def _from_domain(self, entity: Offer) -> Dict[str, Any]:
         """Convert Offer domain model to Firestore document."""
         data = {
@@ -90,6 +96,7 @@ class OfferRepository(BaseRepository[Offer]):
             data['updated_at'] = entity.updated_at
         return data
     
+    @instrumented("get_active_offers")
     def get_active_offers(self) -> List[Offer]:
         """Get all active offers that are still valid."""
         from datetime import datetime
@@ -98,10 +105,5 @@ class OfferRepository(BaseRepository[Offer]):
                 .where(filter=FieldFilter("valid_until", ">=", datetime.utcnow()))
                 .stream())
         
-        results = []
-        for doc in docs:
-            doc_dict = doc.to_dict()
-            doc_dict['id'] = doc.id
-            results.append(self._to_domain(doc_dict))
-        return results
+        return self._docs_to_domain(docs)
 
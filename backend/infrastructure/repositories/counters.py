@@ -0,0 +1,164 @@
+"""
+Counters maintained with Firestore ``Increment`` transforms.
+
+A single counter document tops out at about one write per second, so every
+counter set is spread over ``shards`` documents: writers increment one random
+shard inside their own write batch, readers sum all shards. Counter names are
+dotted paths (``"bookings.status.confirmed"``) stored as nested maps.
+
+Rollups are counter documents keyed by what they summarize (a flight, a
+company and day). A repository describes the rollups one document
+contributes to; writes queue the difference between the old and the new
+contribution. Rollups of the collections in ``ROLLUP_SHARDS`` are sharded
+the same way: each write lands on a random ``{id}-{shard}`` document carrying
+the rollup's labels, and readers sum the shards of each rollup.
+"""
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+from google.cloud.firestore_v1 import Increment
+
+# (collection, document id) -> (label fields, counters)
+RollupContributions = Dict[Tuple[str, str], Tuple[Dict[str, Any], Dict[str, float]]]
+
+# Shards per rollup collection; a company's day is written by every booking
+# of every flight it sells, so it would otherwise serialize them
+ROLLUP_SHARDS: Dict[str, int] = {"company_rollups": 16}
+
+
+def contribution_delta(before: Mapping[str, float], after: Mapping[str, float]) -> Dict[str, float]:
+    """Counter changes turning ``before``'s contribution into ``after``'s."""
+    delta: Dict[str, float] = {}
+    for name in set(before) | set(after):
+        change = after.get(name, 0) - before.get(name, 0)
+        if change:
+            delta[name] = change
+    return delta
+
+
+def _nested(values: Mapping[str, float], wrap=Increment) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    for name, amount in values.items():
+        target = result
+        parts = name.split(".")
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = wrap(amount)
+    return result
+
+
+def _add(total: Dict[str, Any], shard: Mapping[str, Any]):
+    for key, value in shard.items():
+        if isinstance(value, Mapping):
+            _add(total.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)):
+            total[key] = total.get(key, 0) + value
+
+
+class ShardedCounters:
+    """A named set of counters spread over shard documents."""
+    
+    def __init__(self, collection: str, name: str, shards: int = 16):
+        self.collection = collection
+        self.name = name
+        self.shards = shards
+    
+    def shard_refs(self, db) -> list:
+        """References of every shard document."""
+        return [db.collection(self.collection).document(f"{self.name}-{i}") for i in range(self.shards)]
+    
+    def add_to_batch(self, db, batch, delta: Mapping[str, float]) -> bool:
+        """Queue ``delta`` on a random shard; returns whether anything was queued."""
+        if not delta:
+            return False
+        ref = db.collection(self.collection).document(f"{self.name}-{random.randrange(self.shards)}")
+        batch.set(ref, _nested(delta), merge=True)
+        return True
+    
+    def read(self, db) -> Dict[str, Any]:
+        """Sum of all shards as a nested map."""
+        total: Dict[str, Any] = {}
+        for snapshot in db.get_all(self.shard_refs(db)):
+            if snapshot.exists:
+                _add(total, snapshot.to_dict())
+        return total
+    
+    def overwrite(self, db, totals: Mapping[str, float]):
+        """Replace every shard so the counters sum to ``totals``."""
+        batch = db.batch()
+        for i, ref in enumerate(self.shard_refs(db)):
+            if i == 0:
+                batch.set(ref, _nested(totals, wrap=lambda amount: amount))
+            else:
+                batch.delete(ref)
+        batch.commit()
+
+
+def day_key(value) -> Optional[str]:
+    """UTC calendar day of a timestamp as ``YYYY-MM-DD``."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date().isoformat()
+
+
+def rollup_document_id(collection: str, document_id: str, shard: Optional[int] = None) -> str:
+    """Stored ID of a rollup: itself, or in a sharded collection one of its shards (random unless given)."""
+    shards = ROLLUP_SHARDS.get(collection)
+    if not shards:
+        return document_id
+    return f"{document_id}-{random.randrange(shards) if shard is None else shard}"
+
+
+def sum_shards(shards: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+    """One rollup from its shard documents: counters summed, labels kept."""
+    total: Dict[str, Any] = {}
+    for shard in shards:
+        _add(total, shard)
+        for key, value in shard.items():
+            if not isinstance(value, (Mapping, int, float)):
+                total.setdefault(key, value)
+    return total
+
+
+def add_rollups(total: RollupContributions, contributions: RollupContributions) -> RollupContributions:
+    """Add ``contributions`` into ``total`` (counters summed, labels merged); returns ``total``."""
+    for key, (labels, counters) in contributions.items():
+        stored_labels, totals = total.setdefault(key, ({}, {}))
+        stored_labels.update({name: value for name, value in labels.items() if value is not None})
+        for name, amount in counters.items():
+            totals[name] = totals.get(name, 0) + amount
+    return total
+
+
+def queue_rollups(db, batch, before: RollupContributions, after: RollupContributions) -> Dict[str, int]:
+    """
+    Queue the increments turning ``before`` into ``after`` on ``batch``.
+    Returns the number of queued writes per collection.
+    """
+    writes: Dict[str, int] = {}
+    for key in set(before) | set(after):
+        old_labels, old_counters = before.get(key, ({}, {}))
+        labels, counters = after.get(key, (old_labels, {}))
+        delta = contribution_delta(old_counters, counters)
+        if not delta:
+            continue
+        collection, document_id = key
+        ref = db.collection(collection).document(rollup_document_id(collection, document_id))
+        batch.set(ref, {**labels, **_nested(delta)}, merge=True)
+        writes[collection] = writes.get(collection, 0) + 1
+    return writes
+
+
+def sum_contributions(contributions: Iterable[Mapping[str, float]]) -> Dict[str, float]:
+    """Total of many documents' contributions."""
+    totals: Dict[str, float] = {}
+    for contribution in contributions:
+        for name, amount in contribution.items():
+            totals[name] = totals.get(name, 0) + amount
+    return totals
+
+
+# Platform-wide statistics shown in the admin panel
+platform_stats = ShardedCounters("stats", "platform")
@@ -1,20 +1,69 @@
 """Flight repository implementation."""
-from typing import Dict, Any, List
+import random
+import time
+from typing import AbstractSet, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
-from domain.models import Flight, FlightStatus
-from .base_repository import BaseRepository
-from google.cloud.firestore_v1 import FieldFilter
+from domain.models import Flight, FlightFields, FlightStatus
+from .base_repository import BaseRepository, BulkWriteResult, Documents, instrumented
+from .counters import RollupContributions, day_key
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+from google.cloud.firestore_v1 import FieldFilter, Increment
+from infrastructure.realtime import seat_broadcaster, SEAT_FIELDS
+from observability import metrics
+
+# Fields read by the repricing job
+PRICING_FIELDS = ['company_id', 'price', 'base_price', 'available_seats', 'total_seats', 'departure_time']
 
 
 class FlightRepository(BaseRepository[Flight]):
     """Repository for Flight entity operations."""
     
-    def __init__(self, db):
+    derived_fields = frozenset({'status', 'total_seats', 'departure_time', 'company_id', 'flight_number'})
+    partial_model = FlightFields
+    
+    def __init__(self, db, replica=None):
+        """
+        ``replica`` (a ``FlightReplica``) may answer reads with bounded
+        staleness. Seat checks always read Firestore, and after a write the
+        repository stops using the replica so callers read their own writes.
+        """
         super().__init__(db, "flights")
+        self.replica = replica
+    
+    def _serving_replica(self):
+        """The replica if it may answer this read, recording whether it did."""
+        if self.replica is None:
+            return None
+        usable = self.replica.serves(self.db)
+        metrics.record_cache_lookup("flight_replica", usable)
+        return self.replica if usable else None
+    
+    def _stats_contribution(self, doc: Dict[str, Any]) -> Dict[str, float]:
+        """Flights counted in total and by status."""
+        return {"flights.total": 1, f"flights.status.{doc.get('status', 'scheduled')}": 1}
+    
+    def _rollup_contributions(self, entity_id: str, doc: Dict[str, Any]) -> RollupContributions:
+        """Seats offered by the flight, on its own rollup and its company's departure day."""
+        company_id, day = doc.get('company_id'), day_key(doc.get('departure_time'))
+        seats = doc.get('total_seats', 0)
+        cancelled = doc.get('status') == FlightStatus.CANCELLED.value
+        contributions: RollupContributions = {
+            ("flight_rollups", entity_id): (
+                {'company_id': company_id, 'flight_number': doc.get('flight_number'), 'departure_date': day},
+                {'total_seats': seats}
+            )
+        }
+        if company_id and day:
+            contributions[("company_rollups", f"{company_id}_{day}")] = (
+                {'company_id': company_id, 'date': day},
+                {'cancelled_flights': 1} if cancelled else {'flights': 1, 'seats_offered': seats}
+            )
+        return contributions
     
     def _to_domain(self, doc_dict: Dict[str, Any]) -> Flight:
         """Convert Firestore document to Flight domain model."""
-        return Flight(
+        return self._model(
+            Flight,
             id=doc_dict['id'],
             company_id=doc_dict['company_id'],
             company_name=doc_dict['company_name'],
@@ -28,7 +77,7 @@ class FlightRepository(BaseRepository[Flight]):
             available_seats=doc_dict['available_seats'],
             total_seats=doc_dict['total_seats'],
             stops=doc_dict.get('stops', 0),
-            status=FlightStatus(doc_dict.get('status', 'scheduled')),
+            status=doc_dict.get('status', 'scheduled'),
             created_at=doc_dict['created_at']
         )
     
@@ -51,15 +100,21 @@ class FlightRepository(BaseRepository[Flight]):
             'created_at': entity.created_at
         }
     
+    @instrumented("search_flights")
     def search_flights(
         self,
         origin: str = None,
         destination: str = None,
         departure_date: datetime = None,
-        limit: int = 50
+        limit: int = 50,
+        fields: Optional[AbstractSet[str]] = None
     ) -> List[Flight]:
-        """Search flights with filters."""
-        query = self.collection
+        """Search flights with filters; only ``fields`` of them with a field mask."""
+        replica = self._serving_replica()
+        if replica is not None:
+            return self._project(replica.search(origin, destination, departure_date, limit), fields)
+        
+        query = self._select(self.collection, fields)
         
         if origin:
             query = query.where(filter=FieldFilter("origin", "==", origin))
@@ -78,24 +133,190 @@ class FlightRepository(BaseRepository[Flight]):
         query = query.where(filter=FieldFilter("status", "==", "scheduled"))
         query = query.limit(limit)
         
-        docs = query.stream()
-        results = []
-        for doc in docs:
-            doc_dict = doc.to_dict()
-            doc_dict['id'] = doc.id
-            results.append(self._to_domain(doc_dict))
-        return results
-    
-    def get_by_company(self, company_id: str) -> List[Flight]:
+        return self._docs_to_domain(query.stream(), fields)
+    
+    def get_by_company(self, company_id: str, fields: Optional[AbstractSet[str]] = None) -> List[Flight]:
         """Get all flights for a specific company."""
-        return self.find_by_field('company_id', company_id)
+        replica = self._serving_replica()
+        if replica is not None:
+            return self._project(replica.by_company(company_id), fields)
+        return self.find_by_field('company_id', company_id, fields)
+    
+    def get_by_id(self, entity_id: str) -> Optional[Flight]:
+        """Get flight by ID."""
+        replica = self._serving_replica()
+        if replica is not None:
+            return replica.get(entity_id)
+        return super().get_by_id(entity_id)
+    
+    def get_all(self, limit: Optional[int] = None, fields: Optional[AbstractSet[str]] = None) -> List[Flight]:
+        """Get all flights with optional limit."""
+        replica = self._serving_replica()
+        if replica is not None:
+            return self._project(replica.all(limit), fields)
+        return super().get_all(limit, fields)
+    
+    def create(self, entity_id: str, data: Dict[str, Any]) -> str:
+        """Create a flight."""
+        self.replica = None
+        return super().create(entity_id, data)
+    
+    def update(self, entity_id: str, data: Dict[str, Any]) -> bool:
+        """Update a flight and push seat/status changes to stream subscribers."""
+        self.replica = None
+        result = super().update(entity_id, data)
+        seat_broadcaster.publish(entity_id, data)
+        return result
+    
+    def delete(self, entity_id: str) -> bool:
+        """Delete a flight."""
+        self.replica = None
+        return super().delete(entity_id)
+    
+    def create_many(self, documents: Documents, **options) -> BulkWriteResult:
+        """Create flights in batched writes."""
+        self.replica = None
+        return super().create_many(documents, **options)
+    
+    def update_many(self, updates: Documents, **options) -> BulkWriteResult:
+        """Update flights in batched writes and push seat/status changes to stream subscribers."""
+        self.replica = None
+        updates = dict(updates)
+        result = super().update_many(updates, **options)
+        for flight_id, data in updates.items():
+            if flight_id not in result.failed:
+                seat_broadcaster.publish(flight_id, data)
+        return result
+    
+    def delete_many(self, entity_ids: Iterable[str], **options) -> BulkWriteResult:
+        """Delete flights in batched writes."""
+        self.replica = None
+        return super().delete_many(entity_ids, **options)
+    
+    def iter_pricing_fields(self) -> Iterator[Dict[str, Any]]:
+        """Stream the fields repricing needs for every scheduled flight."""
+        query = (self.collection
+                 .where(filter=FieldFilter("status", "==", "scheduled"))
+                 .select(PRICING_FIELDS))
+        count = 0
+        try:
+            for doc in query.stream():
+                row = doc.to_dict()
+                row['id'] = doc.id
+                count += 1
+                yield row
+        finally:
+            self._record_reads(max(count, 1))
+    
+    @instrumented("find_departed")
+    def find_departed(self, arrived_before: datetime, limit: int) -> list:
+        """Snapshots of scheduled flights that arrived before ``arrived_before``, oldest first."""
+        docs = list(self.collection
+                    .where(filter=FieldFilter("status", "==", FlightStatus.SCHEDULED.value))
+                    .where(filter=FieldFilter("arrival_time", "<", arrived_before))
+                    .order_by("arrival_time")
+                    .limit(limit)
+                    .stream())
+        self._record_reads(max(len(docs), 1))
+        return docs
+    
+    @instrumented("mark_completed")
+    def mark_completed(self, flights: list, batch_size: int = 200) -> int:
+        """Move flights (snapshots from ``find_departed``) to completed in batched conditional writes."""
+        self.replica = None
+        return self._update_snapshots(flights, {'status': FlightStatus.COMPLETED.value}, batch_size)
+    
+    @instrumented("reserve_seats")
+    def reserve_seats(self, flight_id: str, seats: int,
+                      extra_writes: Optional[Callable[[Any, Flight], Dict[str, int]]] = None,
+                      attempts: int = 5) -> Tuple[Optional[Flight], bool]:
+        """
+        Take ``seats`` off sale on a scheduled flight, as in ``take_seats``.
+        ``extra_writes(batch, flight)`` may queue writes (e.g. a seat hold)
+        to commit atomically with it. Returns the flight as read (None if it
+        does not exist) and whether the seats were taken.
+        """
+        def plan(batch, flight: Flight) -> Tuple[int, Dict[str, int]]:
+            if flight.status != FlightStatus.SCHEDULED or flight.available_seats < seats:
+                return 0, {}
+            return seats, extra_writes(batch, flight) if extra_writes is not None else {}
+        
+        flight, taken = self.take_seats(flight_id, plan, attempts)
+        return flight, taken > 0
+    
+    def take_seats(self, flight_id: str, plan: Callable[[Any, Flight], Tuple[int, Dict[str, int]]],
+                   attempts: int = 5) -> Tuple[Optional[Flight], int]:
+        """
+        Take seats off sale in one write conditional on the flight being
+        unchanged since it was read, retried on a concurrent change, so seats
+        are never oversold. ``plan(batch, flight)`` decides from the flight
+        as read how many seats to take, queues the writes that use them and
+        returns ``(seats, writes)``; it runs again on every retry, so its own
+        conditional writes are retried as well. Nothing is committed when it
+        takes no seats. Returns the flight as read, with the seats taken off
+        (None if it does not exist), and the seats taken.
+        """
+        self.replica = None
+        ref = self.collection.document(flight_id)
+        for attempt in range(attempts):
+            # Seat checks must see the latest count, never the replica
+            snapshot = ref.get()
+            self._record_reads(1)
+            if not snapshot.exists:
+                return None, 0
+            doc = snapshot.to_dict()
+            doc['id'] = snapshot.id
+            flight = self._to_domain(doc)
+            
+            batch = self.db.batch()
+            seats, extra = plan(batch, flight)
+            if seats <= 0:
+                return flight, 0
+            if seats > flight.available_seats:
+                raise ValueError(f"Only {flight.available_seats} seats left")
+            remaining = flight.available_seats - seats
+            batch.update(ref, {'available_seats': remaining, 'updated_at': datetime.utcnow()},
+                         option=self.db.write_option(last_update_time=snapshot.update_time))
+            try:
+                batch.commit()
+            except (FailedPrecondition, AlreadyExists):
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(random.uniform(0, 0.005 * 2 ** attempt))
+                continue
+            self._record_writes(1)
+            self._record_derived_writes(extra)
+            seat_broadcaster.publish(flight_id, {'available_seats': remaining})
+            flight.available_seats = remaining
+            return flight, seats
+    
+    def queue_seat_release(self, batch, flight_id: str, seats: int) -> Dict[str, int]:
+        """Queue putting ``seats`` back on sale into ``batch``; a blind increment, so it never conflicts."""
+        self.replica = None
+        batch.update(self.collection.document(flight_id), {
+            'available_seats': Increment(seats),
+            'updated_at': datetime.utcnow()
+        })
+        return {self.collection_name: 1}
+    
+    def publish_seats(self, flight_ids: Iterable[str]):
+        """
+        Push the seat counts of flights changed by a committed batch (e.g.
+        a ``queue_seat_release`` increment) to stream subscribers. The batch
+        only knows the delta, so the flights watched in this process are read
+        back in one multi-get; nothing is read when nobody watches.
+        """
+        watched = [flight_id for flight_id in dict.fromkeys(flight_ids) if seat_broadcaster.has_subscribers(flight_id)]
+        if not watched:
+            return
+        refs = [self.collection.document(flight_id) for flight_id in watched]
+        for doc in self.db.get_all(refs, field_paths=list(SEAT_FIELDS)):
+            if doc.exists:
+                seat_broadcaster.publish(doc.id, doc.to_dict())
+        self._record_reads(len(refs))
     
     def update_available_seats(self, flight_id: str, seats_to_book: int) -> bool:
         """Update available seats after booking."""
-        flight = self.get_by_id(flight_id)
-        if not flight or flight.available_seats < seats_to_book:
-            return False
-        
-        new_available = flight.available_seats - seats_to_book
-        return self.update(flight_id, {'available_seats': new_available})
+        _, reserved = self.reserve_seats(flight_id, seats_to_book)
+        return reserved
 
@@ -0,0 +1,117 @@
+"""Seat hold repository."""
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+from google.cloud.firestore_v1 import FieldFilter
+from domain.models import SeatHold, HoldStatus
+from .base_repository import BaseRepository, instrumented, naive_utc
+
+
+class HoldRepository(BaseRepository[SeatHold]):
+    """
+    Repository for checkout seat holds.
+    
+    A hold is created in the batch that takes its seats off the flight and is
+    settled (converted, released or expired) with a write conditional on the
+    hold being unchanged since it was read, so exactly one outcome wins.
+    """
+    
+    def __init__(self, db):
+        super().__init__(db, "seat_holds")
+    
+    def _to_domain(self, doc_dict: Dict[str, Any]) -> SeatHold:
+        """Convert Firestore document to SeatHold domain model."""
+        return self._model(
+            SeatHold,
+            id=doc_dict['id'],
+            user_id=doc_dict['user_id'],
+            flight_id=doc_dict['flight_id'],
+            passengers=doc_dict['passengers'],
+            total_price=doc_dict['total_price'],
+            offer_id=doc_dict.get('offer_id'),
+            status=doc_dict.get('status', 'active'),
+            expires_at=naive_utc(doc_dict['expires_at']),
+            booking_id=doc_dict.get('booking_id'),
+            created_at=doc_dict['created_at'],
+            updated_at=doc_dict.get('updated_at')
+        )
+    
+    def _from_domain(self, entity: SeatHold) -> Dict[str, Any]:
+        """Convert SeatHold domain model to Firestore document."""
+        return {
+            'user_id': entity.user_id,
+            'flight_id': entity.flight_id,
+            'passengers': entity.passengers,
+            'total_price': entity.total_price,
+            'offer_id': entity.offer_id,
+            'status': entity.status,
+            'expires_at': entity.expires_at,
+            'booking_id': entity.booking_id,
+            'created_at': entity.created_at
+        }
+    
+    def queue_settle(self, batch, snapshot, status: HoldStatus, **fields) -> Dict[str, int]:
+        """Queue moving a read hold to ``status`` into ``batch``, conditional on it being unchanged."""
+        batch.update(snapshot.reference, {'status': status.value, 'updated_at': datetime.utcnow(), **fields},
+                     option=self.db.write_option(last_update_time=snapshot.update_time))
+        return {self.collection_name: 1}
+    
+    @instrumented("get_snapshots")
+    def get_snapshots(self, hold_ids: Iterable[str], chunk_size: int = 300) -> list:
+        """Snapshots of existing holds among ``hold_ids``, one multi-get per chunk."""
+        unique = list(dict.fromkeys(hold_ids))
+        found = []
+        for start in range(0, len(unique), chunk_size):
+            refs = [self.collection.document(hold_id) for hold_id in unique[start:start + chunk_size]]
+            found.extend(doc for doc in self.db.get_all(refs) if doc.exists)
+            self._record_reads(len(refs))
+        return found
+    
+    @instrumented("find_expired")
+    def find_expired(self, now: datetime, limit: int = 200) -> list:
+        """Snapshots of active holds past their expiry, oldest first."""
+        docs = list(self.collection
+                    .where(filter=FieldFilter('status', '==', HoldStatus.ACTIVE.value))
+                    .where(filter=FieldFilter('expires_at', '<=', now))
+                    .order_by('expires_at')
+                    .limit(limit)
+                    .stream())
+        self._record_reads(max(len(docs), 1))
+        return docs
+    
+    def iter_active_expiries(self) -> Iterator[Tuple[str, datetime]]:
+        """Stream the ID and expiry of every active hold."""
+        query = (self.collection
+                 .where(filter=FieldFilter('status', '==', HoldStatus.ACTIVE.value))
+                 .select(['expires_at']))
+        count = 0
+        try:
+            for doc in query.stream():
+                count += 1
+                yield doc.id, naive_utc(doc.to_dict()['expires_at'])
+        finally:
+            self._record_reads(max(count, 1))
+    
+    @instrumented("held_seats")
+    def held_seats(self, flight_id: str) -> int:
+        """Seats of a flight taken off sale by active holds (expired ones included until settled)."""
+        docs = list(self.collection
+                    .where(filter=FieldFilter('flight_id', '==', flight_id))
+                    .where(filter=FieldFilter('status', '==', HoldStatus.ACTIVE.value))
+                    .select(['passengers'])
+                    .stream())
+        self._record_reads(max(len(docs), 1))
+        return sum(doc.to_dict().get('passengers', 0) for doc in docs)
+    
+    def settle(self, snapshots: List, status: HoldStatus, extra_writes=None) -> int:
+        """
+        Move read holds to ``status`` in one conditional batched write;
+        ``extra_writes`` as in ``_update_snapshots``. A hold changed since it
+        was read fails the whole batch with ``FailedPrecondition``.
+        """
+        return self._update_snapshots(snapshots, {'status': status.value}, len(snapshots) or 1, extra_writes)
+    
+    @staticmethod
+    def is_expired(snapshot, now: datetime) -> bool:
+        """Whether a hold snapshot is still active but past its expiry."""
+        doc = snapshot.to_dict()
+        return doc.get('status') == HoldStatus.ACTIVE.value and naive_utc(doc.get('expires_at')) <= now
@@ -0,0 +1,75 @@
+"""Notification outbox and audit log repositories."""
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from domain.models import Notification
+from observability import metrics, cost
+from .base_repository import BaseRepository, instrumented
+
+
+class NotificationRepository(BaseRepository[Notification]):
+    """
+    Repository for outgoing notifications. Documents are written once and
+    picked up by the delivery integration (e-mail, push) from this outbox.
+    """
+    
+    def __init__(self, db):
+        super().__init__(db, "notifications")
+    
+    def _to_domain(self, doc_dict: Dict[str, Any]) -> Notification:
+        """Convert Firestore document to Notification domain model."""
+        return self._model(
+            Notification,
+            id=doc_dict['id'],
+            user_id=doc_dict['user_id'],
+            channel=doc_dict.get('channel', 'email'),
+            recipient=doc_dict['recipient'],
+            subject=doc_dict['subject'],
+            body=doc_dict['body'],
+            kind=doc_dict['kind'],
+            reference_id=doc_dict.get('reference_id'),
+            created_at=doc_dict['created_at']
+        )
+    
+    def _from_domain(self, entity: Notification) -> Dict[str, Any]:
+        """Convert Notification domain model to Firestore document."""
+        return {
+            'user_id': entity.user_id,
+            'channel': entity.channel,
+            'recipient': entity.recipient,
+            'subject': entity.subject,
+            'body': entity.body,
+            'kind': entity.kind,
+            'reference_id': entity.reference_id,
+            'created_at': entity.created_at
+        }
+    
+    def get_by_user(self, user_id: str) -> List[Notification]:
+        """Get all notifications sent to a user."""
+        return self.find_by_field('user_id', user_id)
+
+
+class AuditRepository:
+    """Append-only log of who did what to which entity."""
+    
+    def __init__(self, db):
+        self.db = db
+        self.collection_name = "audit_log"
+        self.collection = db.collection(self.collection_name)
+    
+    @instrumented("record")
+    def record(self, entry_id: str, action: str, actor_id: Optional[str], entity_type: str,
+               entity_id: str, details: Optional[Dict[str, Any]] = None, at: Optional[datetime] = None):
+        """
+        Write one audit entry. ``entry_id`` makes the write idempotent, so a
+        retried task does not log the same action twice.
+        """
+        self.collection.document(entry_id).set({
+            'action': action,
+            'actor_id': actor_id,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'details': details or {},
+            'at': at or datetime.utcnow()
+        })
+        metrics.record_documents_written(self.collection_name, 1)
+        cost.record_writes(self.collection_name, 1)
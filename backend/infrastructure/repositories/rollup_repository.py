@@ -0,0 +1,141 @@
+"""Flight and company sales rollup repository."""
+from typing import Any, Dict, List, Optional
+from google.cloud.firestore_v1 import FieldFilter
+from domain.models import FlightRollup, CompanyDayRollup
+from observability import metrics, cost
+from .base_repository import instrumented
+from .counters import RollupContributions, add_rollups, rollup_document_id, sum_shards
+from .booking_repository import BookingRepository
+from .flight_repository import FlightRepository
+
+ROLLUP_COLLECTIONS = ("flight_rollups", "company_rollups")
+
+
+def _load_factor(sold: float, offered: float) -> float:
+    return round(sold / offered, 4) if offered else 0.0
+
+
+class RollupRepository:
+    """
+    Reads the per-flight and per-company-day rollups maintained by the
+    flight and booking repositories, and rebuilds them from a full scan.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self.collection_name = "rollups"
+    
+    def _record_reads(self, collection: str, count: int):
+        metrics.record_documents_read(collection, count)
+        cost.record_reads(collection, count)
+    
+    @staticmethod
+    def _flight_rollup(flight_id: str, doc: Dict[str, Any]) -> FlightRollup:
+        rollup = FlightRollup(flight_id=flight_id, **{k: v for k, v in doc.items() if k in FlightRollup.model_fields})
+        rollup.gross_revenue, rollup.net_revenue = round(rollup.gross_revenue, 2), round(rollup.net_revenue, 2)
+        rollup.load_factor = _load_factor(rollup.seats_sold, rollup.total_seats)
+        return rollup
+    
+    @staticmethod
+    def _company_day(doc: Dict[str, Any]) -> CompanyDayRollup:
+        rollup = CompanyDayRollup(**{k: v for k, v in doc.items() if k in CompanyDayRollup.model_fields})
+        rollup.gross_revenue, rollup.net_revenue = round(rollup.gross_revenue, 2), round(rollup.net_revenue, 2)
+        rollup.load_factor = _load_factor(rollup.seats_sold, rollup.seats_offered)
+        return rollup
+    
+    @instrumented("get_flight_rollup")
+    def get_flight(self, flight_id: str) -> Optional[FlightRollup]:
+        """Rollup of one flight, or None when it has none yet."""
+        doc = self.db.collection("flight_rollups").document(flight_id).get()
+        self._record_reads("flight_rollups", 1)
+        return self._flight_rollup(doc.id, doc.to_dict()) if doc.exists else None
+    
+    @instrumented("get_company_days")
+    def get_company_days(self, company_id: str, start_date: str, end_date: str) -> List[CompanyDayRollup]:
+        """Day rollups of a company between two ``YYYY-MM-DD`` dates, inclusive (their shards summed)."""
+        docs = list(
+            self.db.collection("company_rollups")
+            .where(filter=FieldFilter("company_id", "==", company_id))
+            .where(filter=FieldFilter("date", ">=", start_date))
+            .where(filter=FieldFilter("date", "<=", end_date))
+            .order_by("date")
+            .stream()
+        )
+        self._record_reads("company_rollups", max(len(docs), 1))
+        days: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in docs:
+            shard = doc.to_dict()
+            days.setdefault(shard["date"], []).append(shard)
+        return [self._company_day(sum_shards(shards)) for shards in days.values()]
+    
+    @instrumented("get_company_flights")
+    def get_company_flights(self, company_id: str, start_date: str, end_date: str) -> List[FlightRollup]:
+        """Flight rollups of a company departing between two dates, inclusive."""
+        docs = list(
+            self.db.collection("flight_rollups")
+            .where(filter=FieldFilter("company_id", "==", company_id))
+            .where(filter=FieldFilter("departure_date", ">=", start_date))
+            .where(filter=FieldFilter("departure_date", "<=", end_date))
+            .order_by("departure_date")
+            .stream()
+        )
+        self._record_reads("flight_rollups", max(len(docs), 1))
+        return [self._flight_rollup(doc.id, doc.to_dict()) for doc in docs]
+    
+    @instrumented("rebuild_rollups")
+    def rebuild(self, flight_repo: FlightRepository, booking_repo: BookingRepository,
+                batch_size: int = 500) -> Dict[str, int]:
+        """
+        Recompute every rollup from all flights and bookings and replace the
+        stored ones. Bookings written before rollups existed lack their
+        flight's company and departure; they are taken from the flight.
+        Sharded rollups are stored whole in their first shard and their
+        other shards deleted. Writes landing during the scan may be lost, so
+        run it while quiet.
+        """
+        rollups: RollupContributions = {}
+        
+        flights: Dict[str, Dict[str, Any]] = {}
+        for doc in flight_repo.collection.stream():
+            flights[doc.id] = doc.to_dict()
+            add_rollups(rollups, flight_repo._rollup_contributions(doc.id, flights[doc.id]))
+        flight_repo._record_reads(max(len(flights), 1))
+        
+        bookings = 0
+        for doc in booking_repo.collection.stream():
+            booking = doc.to_dict()
+            flight = flights.get(booking.get('flight_id'), {})
+            booking.setdefault('company_id', flight.get('company_id'))
+            booking.setdefault('departure_time', flight.get('departure_time'))
+            add_rollups(rollups, booking_repo._rollup_contributions(doc.id, booking))
+            bookings += 1
+        booking_repo._record_reads(max(bookings, 1))
+        
+        stored = {(collection, rollup_document_id(collection, document_id, shard=0)): values
+                  for (collection, document_id), values in rollups.items()}
+        stale = []
+        for collection in ROLLUP_COLLECTIONS:
+            existing = list(self.db.collection(collection).select([]).stream())
+            self._record_reads(collection, max(len(existing), 1))
+            stale.extend((collection, doc.id) for doc in existing if (collection, doc.id) not in stored)
+        
+        writes = [(key, {**labels, **counters}) for key, (labels, counters) in stored.items()]
+        writes.extend((key, None) for key in stale)
+        for start in range(0, len(writes), batch_size):
+            batch = self.db.batch()
+            for (collection, document_id), values in writes[start:start + batch_size]:
+                ref = self.db.collection(collection).document(document_id)
+                if values is None:
+                    batch.delete(ref)
+                else:
+                    batch.set(ref, values)
+            batch.commit()
+        for collection in ROLLUP_COLLECTIONS:
+            count = sum(1 for (name, _), _ in writes if name == collection)
+            metrics.record_documents_written(collection, count)
+            cost.record_writes(collection, count)
+        return {
+            "flight_rollups": sum(1 for (name, _) in rollups if name == "flight_rollups"),
+            "company_rollups": sum(1 for (name, _) in rollups if name == "company_rollups"),
+            "deleted": len(stale),
+        }
@@ -0,0 +1,86 @@
+"""Flight seat map repository."""
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from domain.models import Flight
+from domain.seat_map import SeatMap
+from .base_repository import BaseRepository, instrumented
+from .hold_repository import HoldRepository
+
+
+class SeatMapRepository(BaseRepository[SeatMap]):
+    """
+    Repository for flight seat maps, keyed by flight ID.
+    
+    A flight without a stored map gets one on first use, sized from its seat
+    counts with the seats already sold marked occupied; seats under a hold
+    are off sale but not sold, so they stay free on the map. Writes are
+    conditional on the map being unchanged since it was read, so two
+    bookings can never be given the same seat.
+    """
+    
+    def __init__(self, db):
+        super().__init__(db, "seat_maps")
+        self.hold_repo = HoldRepository(db)
+    
+    def _to_domain(self, doc_dict: Dict[str, Any]) -> SeatMap:
+        """Convert Firestore document to SeatMap."""
+        return SeatMap.from_bytes(doc_dict['layout'], doc_dict['seats'], doc_dict.get('occupied', b""))
+    
+    def _from_domain(self, entity: SeatMap) -> Dict[str, Any]:
+        """Convert SeatMap to Firestore document."""
+        return {
+            'layout': entity.layout,
+            'seats': entity.seats,
+            'occupied': entity.to_bytes(),
+            'free': entity.free_count
+        }
+    
+    @instrumented("read")
+    def read(self, flight: Flight) -> Tuple[SeatMap, Any]:
+        """The flight's seat map and the snapshot to make a later write conditional on."""
+        snapshot = self.collection.document(flight.id).get()
+        self._record_reads(1)
+        if snapshot.exists:
+            return self._to_domain(snapshot.to_dict()), snapshot
+        # Held seats get their bits when the hold is confirmed, never before
+        sold = flight.total_seats - flight.available_seats - self.hold_repo.held_seats(flight.id)
+        return SeatMap.empty(flight.total_seats, max(sold, 0)), snapshot
+    
+    def queue_save(self, batch, flight_id: str, seat_map: SeatMap, snapshot) -> Dict[str, int]:
+        """Queue writing ``seat_map``, conditional on the map read as ``snapshot``."""
+        ref = self.collection.document(flight_id)
+        data = {**self._from_domain(seat_map), 'updated_at': datetime.utcnow()}
+        if snapshot.exists:
+            batch.update(ref, data, option=self.db.write_option(last_update_time=snapshot.update_time))
+        else:
+            batch.create(ref, data)
+        return {self.collection_name: 1}
+    
+    def queue_assign(self, batch, flight: Flight, count: int,
+                     labels: Optional[List[str]] = None) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Occupy the requested seats, or pick ``count`` (together if
+        possible), and queue the map write into ``batch``. Returns the seat
+        labels and the queued writes. Requested seats that are taken raise
+        ValueError; when the map has too few free seats for an automatic
+        pick (maps seeded from a legacy seat count) nothing is assigned.
+        """
+        seat_map, snapshot = self.read(flight)
+        assigned = self.assign(seat_map, count, labels)
+        if not assigned:
+            return [], {}
+        return assigned, self.queue_save(batch, flight.id, seat_map, snapshot)
+    
+    @staticmethod
+    def assign(seat_map: SeatMap, count: int, labels: Optional[List[str]] = None) -> List[str]:
+        """Occupy seats on ``seat_map`` in memory as ``queue_assign`` does; returns their labels."""
+        if labels:
+            if len(labels) != count:
+                raise ValueError(f"Choose exactly {count} seats")
+            indices = [seat_map.index(label) for label in labels]
+            seat_map.occupy(indices)
+        elif seat_map.free_count >= count:
+            indices = seat_map.allocate(count)
+        else:
+            return []
+        return [seat_map.label(index) for index in indices]
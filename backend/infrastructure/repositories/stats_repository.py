@@ -0,0 +1,63 @@
+"""Platform statistics repository."""
+from typing import Any, Dict, List
+from domain.models import PlatformStats
+from observability import metrics, cost
+from .base_repository import BaseRepository, instrumented
+from .counters import platform_stats, sum_contributions
+
+
+class StatsRepository:
+    """
+    Reads the sharded platform counters maintained by the entity
+    repositories, and rebuilds them from a full scan when needed.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self.counters = platform_stats
+        self.collection_name = platform_stats.collection
+    
+    @instrumented("get_platform_stats")
+    def get_platform_stats(self) -> PlatformStats:
+        """Current statistics; reads one document per shard whatever the data size."""
+        totals = self.counters.read(self.db)
+        metrics.record_documents_read(self.collection_name, self.counters.shards)
+        cost.record_reads(self.collection_name, self.counters.shards)
+        
+        def section(name: str) -> Dict[str, Any]:
+            return totals.get(name, {})
+        
+        def by_key(values: Dict[str, Any]) -> Dict[str, int]:
+            return {key: int(count) for key, count in values.items() if count}
+        
+        users, flights, bookings, revenue = section("users"), section("flights"), section("bookings"), section("revenue")
+        return PlatformStats(
+            users_total=int(users.get("total", 0)),
+            users_by_role=by_key(users.get("role", {})),
+            users_blocked=int(users.get("blocked", 0)),
+            flights_total=int(flights.get("total", 0)),
+            flights_by_status=by_key(flights.get("status", {})),
+            bookings_total=int(bookings.get("total", 0)),
+            bookings_by_status=by_key(bookings.get("status", {})),
+            revenue_gross=round(float(revenue.get("gross", 0.0)), 2),
+            revenue_net=round(float(revenue.get("net", 0.0)), 2)
+        )
+    
+    @instrumented("rebuild_platform_stats")
+    def rebuild(self, repositories: List[BaseRepository]) -> PlatformStats:
+        """
+        Recompute the counters from every document of ``repositories`` and
+        replace the shards. Writes landing during the scan may be lost, so
+        run it while the platform is quiet (initial backfill or repair).
+        """
+        contributions = []
+        for repo in repositories:
+            count = 0
+            for doc in repo.collection.stream():
+                contributions.append(repo._stats_contribution(doc.to_dict()))
+                count += 1
+            repo._record_reads(max(count, 1))
+        self.counters.overwrite(self.db, sum_contributions(contributions))
+        metrics.record_documents_written(self.collection_name, self.counters.shards)
+        cost.record_writes(self.collection_name, self.counters.shards)
+        return self.get_platform_stats()
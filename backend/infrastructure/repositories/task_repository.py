@@ -0,0 +1,137 @@
+"""Background task repository."""
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from google.api_core.exceptions import FailedPrecondition, NotFound
+from google.cloud.firestore_v1 import FieldFilter
+from domain.models import Task, TaskStatus
+from .base_repository import BaseRepository, instrumented, naive_utc
+
+
+class TaskRepository(BaseRepository[Task]):
+    """
+    Repository for durable background task records.
+    
+    A worker claims a task with a write conditional on the record's last
+    update time, so a task is run by one worker at a time; the claim expires
+    after a visibility timeout and the task becomes claimable again if the
+    worker dies.
+    """
+    
+    def __init__(self, db):
+        super().__init__(db, "tasks")
+    
+    def _to_domain(self, doc_dict: Dict[str, Any]) -> Task:
+        """Convert Firestore document to Task domain model."""
+        return self._model(
+            Task,
+            id=doc_dict['id'],
+            name=doc_dict['name'],
+            payload=doc_dict.get('payload', {}),
+            status=doc_dict.get('status', 'pending'),
+            attempts=doc_dict.get('attempts', 0),
+            max_attempts=doc_dict.get('max_attempts', 5),
+            run_at=doc_dict['run_at'],
+            claimed_by=doc_dict.get('claimed_by'),
+            claim_expires_at=doc_dict.get('claim_expires_at'),
+            last_error=doc_dict.get('last_error'),
+            created_at=doc_dict['created_at'],
+            updated_at=doc_dict.get('updated_at'),
+            completed_at=doc_dict.get('completed_at')
+        )
+    
+    def _from_domain(self, entity: Task) -> Dict[str, Any]:
+        """Convert Task domain model to Firestore document."""
+        return {
+            'name': entity.name,
+            'payload': entity.payload,
+            'status': entity.status,
+            'attempts': entity.attempts,
+            'max_attempts': entity.max_attempts,
+            'run_at': entity.run_at,
+            'created_at': entity.created_at
+        }
+    
+    @instrumented("claim")
+    def claim(self, task_id: str, worker: str, visibility_seconds: float) -> Optional[Task]:
+        """Mark a due task as running on ``worker``; None if it is not claimable."""
+        snapshot = self.collection.document(task_id).get()
+        self._record_reads(1)
+        if not snapshot.exists:
+            return None
+        doc = snapshot.to_dict()
+        now = datetime.utcnow()
+        status = doc.get('status')
+        due = status == TaskStatus.PENDING.value and naive_utc(doc['run_at']) <= now
+        abandoned = status == TaskStatus.RUNNING.value and naive_utc(doc.get('claim_expires_at')) <= now
+        if not (due or abandoned):
+            return None
+        
+        claim = {
+            'status': TaskStatus.RUNNING.value,
+            'attempts': doc.get('attempts', 0) + 1,
+            'claimed_by': worker,
+            'claim_expires_at': now + timedelta(seconds=visibility_seconds),
+            'updated_at': now
+        }
+        try:
+            snapshot.reference.update(claim, option=self.db.write_option(last_update_time=snapshot.update_time))
+        except (FailedPrecondition, NotFound):
+            return None
+        self._record_writes(1)
+        doc.update(claim)
+        doc['id'] = task_id
+        return self._to_domain(doc)
+    
+    def complete(self, task_id: str) -> bool:
+        """Mark a task done."""
+        now = datetime.utcnow()
+        return self.update(task_id, {'status': TaskStatus.DONE.value, 'completed_at': now, 'claimed_by': None})
+    
+    def fail(self, task_id: str, error: str, retry_at: Optional[datetime]) -> bool:
+        """Schedule a failed task's next attempt, or dead-letter it when ``retry_at`` is None."""
+        data = {'last_error': error[:2000], 'claimed_by': None}
+        if retry_at is None:
+            data['status'] = TaskStatus.DEAD.value
+        else:
+            data.update({'status': TaskStatus.PENDING.value, 'run_at': retry_at})
+        return self.update(task_id, data)
+    
+    def retry(self, task_id: str) -> bool:
+        """Give a dead task a fresh set of attempts."""
+        return self.update(task_id, {
+            'status': TaskStatus.PENDING.value,
+            'attempts': 0,
+            'run_at': datetime.utcnow(),
+            'last_error': None
+        })
+    
+    @instrumented("find_due")
+    def find_due(self, now: datetime, limit: int = 100) -> List[Task]:
+        """Pending tasks whose run time has come, oldest first."""
+        docs = (self.collection
+                .where(filter=FieldFilter('status', '==', TaskStatus.PENDING.value))
+                .where(filter=FieldFilter('run_at', '<=', now))
+                .order_by('run_at')
+                .limit(limit)
+                .stream())
+        return self._docs_to_domain(docs)
+    
+    @instrumented("find_abandoned")
+    def find_abandoned(self, now: datetime, limit: int = 100) -> List[Task]:
+        """Running tasks whose worker let the claim expire."""
+        docs = (self.collection
+                .where(filter=FieldFilter('status', '==', TaskStatus.RUNNING.value))
+                .where(filter=FieldFilter('claim_expires_at', '<=', now))
+                .limit(limit)
+                .stream())
+        return self._docs_to_domain(docs)
+    
+    @instrumented("find_by_status")
+    def find_by_status(self, status: TaskStatus, limit: int = 100) -> List[Task]:
+        """Tasks in ``status``."""
+        docs = (self.collection
+                .where(filter=FieldFilter('status', '==', TaskStatus(status).value))
+                .limit(limit)
+                .stream())
+        return self._docs_to_domain(docs)
+
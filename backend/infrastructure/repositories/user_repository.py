@@ -1,22 +1,36 @@
 """User repository implementation."""
 from typing import Dict, Any, Optional
-from domain.models import User, UserRole
+from domain.models import User, UserFields, UserRole
 from .base_repository import BaseRepository
 
 
 class UserRepository(BaseRepository[User]):
     """Repository for User entity operations."""
     
+    derived_fields = frozenset({'role', 'blocked'})
+    # Email validation dominates decoding a user, and every authenticated request decodes one
+    trusted_reads = True
+    partial_model = UserFields
+    
     def __init__(self, db):
         super().__init__(db, "users")
     
+    def _stats_contribution(self, doc: Dict[str, Any]) -> Dict[str, float]:
+        """Users counted in total, by role and blocked state."""
+        return {
+            "users.total": 1,
+            f"users.role.{doc.get('role', 'user')}": 1,
+            "users.blocked": 1 if doc.get('blocked') else 0,
+        }
+    
     def _to_domain(self, doc_dict: Dict[str, Any]) -> User:
         """Convert Firestore document to User domain model."""
-        return User(
+        return self._model(
+            User,
             id=doc_dict['id'],
             email=doc_dict['email'],
             name=doc_dict['name'],
-            role=UserRole(doc_dict.get('role', 'user')),
+            role=doc_dict.get('role', 'user'),
             created_at=doc_dict['created_at'],
             blocked=doc_dict.get('blocked', False)
         )
@@ -0,0 +1,97 @@
+"""Flight waitlist repository."""
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+from domain.models import WaitlistEntry
+from .base_repository import BaseRepository, instrumented, naive_utc
+
+
+class WaitlistRepository(BaseRepository[List[WaitlistEntry]]):
+    """
+    Repository for flight waitlists: one document per flight holding the
+    queue as a list of small entries kept in serving order (priority, then
+    arrival), so reading a flight's whole waitlist is a single read. Writes
+    are conditional on the queue being unchanged since it was read.
+    """
+    
+    def __init__(self, db):
+        super().__init__(db, "waitlists")
+    
+    def _to_domain(self, doc_dict: Dict[str, Any]) -> List[WaitlistEntry]:
+        """Convert Firestore document to the ordered waitlist."""
+        return [
+            self._model(
+                WaitlistEntry,
+                id=entry['id'],
+                flight_id=doc_dict['id'],
+                user_id=entry['user_id'],
+                passengers=entry['passengers'],
+                priority=entry.get('priority', 0),
+                joined_at=naive_utc(entry['joined_at']),
+                position=position
+            )
+            for position, entry in enumerate(doc_dict.get('entries', []), 1)
+        ]
+    
+    def _from_domain(self, entity: List[WaitlistEntry]) -> Dict[str, Any]:
+        """Convert the waitlist to a Firestore document."""
+        return {
+            'entries': [
+                {
+                    'id': entry.id,
+                    'user_id': entry.user_id,
+                    'passengers': entry.passengers,
+                    'priority': entry.priority,
+                    'joined_at': entry.joined_at
+                }
+                for entry in sorted(entity, key=serving_order)
+            ]
+        }
+    
+    @instrumented("read")
+    def read(self, flight_id: str) -> Tuple[List[WaitlistEntry], Any]:
+        """The flight's waitlist in serving order and the snapshot to make a later write conditional on."""
+        snapshot = self.collection.document(flight_id).get()
+        self._record_reads(1)
+        if not snapshot.exists:
+            return [], snapshot
+        return self.from_snapshot(snapshot), snapshot
+    
+    def queue_save(self, batch, flight_id: str, entries: List[WaitlistEntry], snapshot) -> Dict[str, int]:
+        """Queue writing the waitlist, conditional on it being the one read as ``snapshot``."""
+        ref = self.collection.document(flight_id)
+        data = {**self._from_domain(entries), 'updated_at': datetime.utcnow()}
+        if snapshot.exists:
+            batch.update(ref, data, option=self.db.write_option(last_update_time=snapshot.update_time))
+        else:
+            batch.create(ref, data)
+        return {self.collection_name: 1}
+    
+    @instrumented("modify")
+    def modify(self, flight_id: str, change: Callable[[List[WaitlistEntry]], List[WaitlistEntry]],
+               attempts: int = 5) -> List[WaitlistEntry]:
+        """
+        Replace the waitlist with ``change(entries)``, re-reading and retrying
+        on a concurrent change. Exceptions raised by ``change`` propagate with
+        nothing written. Returns the new waitlist in serving order.
+        """
+        for attempt in range(attempts):
+            entries, snapshot = self.read(flight_id)
+            updated = change(entries)
+            batch = self.db.batch()
+            writes = self.queue_save(batch, flight_id, updated, snapshot)
+            try:
+                self.commit_batch(batch, writes)
+            except (FailedPrecondition, AlreadyExists):
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(random.uniform(0, 0.005 * 2 ** attempt))
+                continue
+            return sorted(updated, key=serving_order)
+
+
+def serving_order(entry: WaitlistEntry):
+    """Sort key of waitlist entries: higher priority first, then first come, first served."""
+    return (-entry.priority, entry.joined_at, entry.id)
@@ -0,0 +1,6 @@
+"""Lease-coordinated background jobs."""
+from .lease import Lease
+from .scheduler import PeriodicJob, Scheduler, scheduler
+from .timer_wheel import ExpiryReaper, TimerWheel, hold_reaper
+
+__all__ = ["Lease", "PeriodicJob", "Scheduler", "scheduler", "ExpiryReaper", "TimerWheel", "hold_reaper"]
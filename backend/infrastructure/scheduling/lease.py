@@ -0,0 +1,77 @@
+"""
+Leases on Firestore documents for single-worker background work.
+
+A lease is a document ``leases/<name>`` holding the current holder and an
+expiry time. A worker takes the lease when it is free or expired and keeps it
+by renewing before it expires. Every change is a conditional write on the
+document's last update time, so two workers racing for the same lease cannot
+both win. Expiry uses the workers' clocks; keep the lease duration well above
+the expected clock skew.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from infrastructure.repositories.base_repository import naive_utc
+from observability import metrics, cost
+
+LEASE_COLLECTION = "leases"
+
+
+def default_holder() -> str:
+    """Identity of this worker process."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Lease:
+    """A named, expiring claim held by at most one worker at a time."""
+    
+    def __init__(self, db, name: str, duration_seconds: float = 60.0, holder: Optional[str] = None):
+        self.db = db
+        self.name = name
+        self.duration = timedelta(seconds=duration_seconds)
+        self.holder = holder or default_holder()
+        self.ref = db.collection(LEASE_COLLECTION).document(name)
+        self.held = False
+    
+    def acquire(self) -> bool:
+        """Take or renew the lease; returns whether this worker holds it."""
+        snapshot = self.ref.get()
+        metrics.record_documents_read(LEASE_COLLECTION, 1)
+        cost.record_reads(LEASE_COLLECTION, 1)
+        now = datetime.utcnow()
+        current = snapshot.to_dict() if snapshot.exists else None
+        if current and current.get('holder') != self.holder and naive_utc(current['expires_at']) > now:
+            self.held = False
+            return False
+        
+        claim = {'holder': self.holder, 'expires_at': now + self.duration}
+        if current is None or current.get('holder') != self.holder:
+            claim['acquired_at'] = now
+        try:
+            if current is None:
+                self.ref.create(claim)
+            else:
+                self.ref.update(claim, option=self.db.write_option(last_update_time=snapshot.update_time))
+        except (AlreadyExists, FailedPrecondition, NotFound):
+            # Another worker changed the lease since we read it
+            self.held = False
+            return False
+        metrics.record_documents_written(LEASE_COLLECTION, 1)
+        cost.record_writes(LEASE_COLLECTION, 1)
+        self.held = True
+        return True
+    
+    def release(self):
+        """Give the lease up early if this worker holds it."""
+        if not self.held:
+            return
+        self.held = False
+        snapshot = self.ref.get()
+        if snapshot.exists and snapshot.to_dict().get('holder') == self.holder:
+            try:
+                self.ref.delete(option=self.db.write_option(last_update_time=snapshot.update_time))
+            except (FailedPrecondition, NotFound):
+                pass
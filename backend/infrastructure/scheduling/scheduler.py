@@ -0,0 +1,137 @@
+"""
+In-process periodic scheduler for deployment-wide background jobs.
+
+Each job runs on its own daemon thread in every worker, but only the worker
+holding the job's lease executes it; the others keep trying to take the lease
+and step in when the holder stops renewing it.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from observability import metrics
+from .lease import Lease
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """A function run every ``interval_seconds`` by the lease holder."""
+    
+    def __init__(self, name: str, fn: Callable[[], Optional[Dict[str, Any]]], interval_seconds: float):
+        self.name = name
+        self.fn = fn
+        self.interval_seconds = interval_seconds
+        self.lease: Optional[Lease] = None
+        self.runs = 0
+        self.failures = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+        self.last_duration_seconds: Optional[float] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, db, lease_seconds: float):
+        """Start ticking on a daemon thread, coordinated through a lease in ``db``."""
+        self.lease = Lease(db, f"job-{self.name}", lease_seconds)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop ticking and give the lease up."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        if self.lease is not None:
+            try:
+                self.lease.release()
+            except Exception:
+                logger.exception("Releasing the lease of job %s failed", self.name)
+        metrics.scheduler_leader.labels(self.name).set(0)
+    
+    def _loop(self):
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(self.interval_seconds)
+    
+    def tick(self) -> bool:
+        """Run the job once if this worker holds (or takes) the lease."""
+        try:
+            leader = self.lease.acquire()
+        except Exception:
+            logger.exception("Lease check of job %s failed", self.name)
+            leader = False
+        metrics.scheduler_leader.labels(self.name).set(1 if leader else 0)
+        if not leader:
+            return False
+        
+        started = time.perf_counter()
+        self.last_run_at = datetime.utcnow()
+        self.runs += 1
+        try:
+            self.last_result = self.fn()
+            self.last_error = None
+            self.last_success_at = datetime.utcnow()
+            metrics.record_job_run(self.name, True)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            metrics.record_job_run(self.name, False)
+            logger.exception("Scheduled job %s failed", self.name)
+        finally:
+            self.last_duration_seconds = round(time.perf_counter() - started, 3)
+        return True
+    
+    def status(self) -> Dict[str, Any]:
+        """Leadership and progress of the job on this worker."""
+        return {
+            "interval_seconds": self.interval_seconds,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "leader": bool(self.lease and self.lease.held),
+            "holder": self.lease.holder if self.lease else None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run_at": self.last_run_at,
+            "last_success_at": self.last_success_at,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """Registry of the periodic jobs of this worker."""
+    
+    def __init__(self, lease_seconds: float = 90.0):
+        self.lease_seconds = lease_seconds
+        self.jobs: Dict[str, PeriodicJob] = {}
+    
+    def add(self, name: str, fn: Callable[[], Optional[Dict[str, Any]]], interval_seconds: float) -> PeriodicJob:
+        """Register a job; it starts with the scheduler."""
+        job = PeriodicJob(name, fn, interval_seconds)
+        self.jobs[name] = job
+        return job
+    
+    def start(self, db):
+        """Start every registered job against ``db``."""
+        for job in self.jobs.values():
+            job.start(db, max(self.lease_seconds, 2 * job.interval_seconds))
+    
+    def stop(self):
+        """Stop every job, release its lease and forget it."""
+        for job in self.jobs.values():
+            job.stop(timeout=5)
+        self.jobs.clear()
+    
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Status of every job by name."""
+        return {name: job.status() for name, job in self.jobs.items()}
+
+
+# Process-wide scheduler started with the application
+scheduler = Scheduler()
@@ -0,0 +1,152 @@
+"""
+Hashed timer wheel and the expiry reaper built on it.
+
+``TimerWheel`` files each key in the slot of its deadline tick, so scheduling
+and cancelling are O(1) and advancing the clock only looks at the slots of
+the ticks that passed. Keys whose deadline lies more than one revolution
+ahead stay in their slot until the wheel comes round to them again.
+
+``ExpiryReaper`` ticks a wheel on the event loop and hands the keys that
+expired to a handler on a thread, in batches. The wheel lives in process
+memory: keys scheduled by a worker that died are not reaped here, so users
+pair it with a periodic sweep of the store.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from observability import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TimerWheel:
+    """Deadlines of string keys, bucketed by tick."""
+    
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 1024):
+        if tick_seconds <= 0 or slots <= 0:
+            raise ValueError("Tick length and slot count must be positive")
+        self.tick_seconds = tick_seconds
+        self._slots: List[Dict[str, int]] = [{} for _ in range(slots)]
+        self._slot_of: Dict[str, int] = {}
+        self._cursor: Optional[int] = None  # last tick advanced past
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._slot_of)
+    
+    def schedule(self, key: str, deadline: float):
+        """Expire ``key`` at ``deadline`` (epoch seconds), replacing an earlier schedule."""
+        tick = math.ceil(deadline / self.tick_seconds)
+        with self._lock:
+            self._remove(key)
+            if self._cursor is not None and tick <= self._cursor:
+                # Already due: fire on the next advance
+                tick = self._cursor + 1
+            slot = tick % len(self._slots)
+            self._slots[slot][key] = tick
+            self._slot_of[key] = slot
+    
+    def cancel(self, key: str) -> bool:
+        """Forget ``key``; False if it was not scheduled."""
+        with self._lock:
+            return self._remove(key)
+    
+    def _remove(self, key: str) -> bool:
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+    
+    def advance(self, now: float) -> List[str]:
+        """Move the clock to ``now`` and return the keys that expired, removing them."""
+        target = math.floor(now / self.tick_seconds)
+        expired: List[str] = []
+        with self._lock:
+            if self._cursor is not None and target <= self._cursor:
+                return expired
+            # After a long pause (or on the first advance) every slot is due for a look
+            steps = len(self._slots) if self._cursor is None else min(target - self._cursor, len(self._slots))
+            for tick in range(target - steps + 1, target + 1):
+                slot = self._slots[tick % len(self._slots)]
+                due = [key for key, deadline in slot.items() if deadline <= target]
+                for key in due:
+                    del slot[key]
+                    del self._slot_of[key]
+                expired.extend(due)
+            self._cursor = target
+        return expired
+
+
+def _epoch(value: datetime) -> float:
+    """Epoch seconds of a naive-UTC or aware datetime."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ExpiryReaper:
+    """Calls ``handler(keys)`` for keys whose deadline has passed, checked every tick."""
+    
+    def __init__(self, name: str, tick_seconds: float = 1.0, batch_size: int = 200, slots: int = 1024):
+        self.name = name
+        self.tick_seconds = tick_seconds
+        self.batch_size = batch_size
+        self.slots = slots
+        self.wheel = TimerWheel(tick_seconds, slots)
+        self._handler: Optional[Callable[[List[str]], object]] = None
+        self._runner: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+    
+    def schedule(self, key: str, deadline: datetime):
+        """Reap ``key`` once ``deadline`` passes; a no-op while the reaper is stopped."""
+        if self._handler is None:
+            return
+        self.wheel.schedule(key, _epoch(deadline))
+        metrics.hold_reaper_pending.set(len(self.wheel))
+    
+    def cancel(self, key: str):
+        """Stop tracking ``key`` (it was settled some other way)."""
+        if self.wheel.cancel(key):
+            metrics.hold_reaper_pending.set(len(self.wheel))
+    
+    async def start(self, handler: Callable[[List[str]], object]):
+        """Start ticking on the running event loop."""
+        if self._runner is not None:
+            return
+        self.wheel = TimerWheel(self.tick_seconds, self.slots)
+        self._handler = handler
+        self._runner = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop ticking; keys still in the wheel are left to the store sweep."""
+        self._handler = None
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        metrics.hold_reaper_pending.set(0)
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            keys = self.wheel.advance(time.time())
+            metrics.hold_reaper_pending.set(len(self.wheel))
+            for start in range(0, len(keys), self.batch_size):
+                try:
+                    await asyncio.to_thread(self._handler, keys[start:start + self.batch_size])
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Reaping %d expired %s failed", len(keys[start:start + self.batch_size]), self.name)
+
+
+# Process-wide reaper of checkout seat holds
+hold_reaper = ExpiryReaper("seat_holds")
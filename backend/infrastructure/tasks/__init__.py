@@ -0,0 +1,4 @@
+"""Durable background tasks."""
+from .queue import TaskQueue, UnknownTask, task_queue
+
+__all__ = ["TaskQueue", "UnknownTask", "task_queue"]
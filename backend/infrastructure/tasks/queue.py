@@ -0,0 +1,194 @@
+"""
+Durable in-process task queue.
+
+Tasks are documents in ``tasks`` (see ``TaskRepository``), so they survive a
+worker restart. ``enqueue`` persists the record and, when this worker runs the
+queue on the same store, hands the ID straight to the local asyncio worker
+pool. ``queue_enqueue`` instead queues the record into a caller's batch, so a
+task follows up on a write only if that write commits. A poller picks up everything else: delayed retries, tasks enqueued by
+other processes and tasks abandoned by a crashed worker. Handlers are plain
+functions of ``(db, payload)`` run on a thread; a failure is retried with
+exponential backoff and jitter until ``max_attempts``, then dead-lettered.
+Tasks without a registered handler are dead-lettered on their first run.
+"""
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from domain.models import TaskStatus
+from infrastructure.repositories.task_repository import TaskRepository
+from infrastructure.scheduling.lease import default_holder
+from observability import metrics
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Any, Dict[str, Any]], Any]
+
+
+class UnknownTask(Exception):
+    """Raised when a task has no registered handler."""
+
+
+class TaskQueue:
+    """Registry of task handlers plus the worker pool that runs them."""
+    
+    def __init__(self, workers: int = 4, max_attempts: int = 5, backoff_seconds: float = 1.0,
+                 max_backoff_seconds: float = 300.0, poll_seconds: float = 2.0,
+                 visibility_seconds: float = 60.0):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.poll_seconds = poll_seconds
+        self.visibility_seconds = visibility_seconds
+        self.worker_id = default_holder()
+        self.handlers: Dict[str, Handler] = {}
+        self._db = None
+        self._repo: Optional[TaskRepository] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[str] = set()
+        self._runners: List[asyncio.Task] = []
+    
+    def register(self, name: str, handler: Handler):
+        """Run ``handler(db, payload)`` for tasks called ``name``."""
+        self.handlers[name] = handler
+    
+    # Producing
+    
+    def enqueue(self, db, name: str, payload: Dict[str, Any], delay_seconds: float = 0.0,
+                task_id: Optional[str] = None) -> str:
+        """
+        Persist a task and return its ID. Safe to call from any thread; the
+        caller only pays for one document write.
+        """
+        task_id = task_id or str(uuid.uuid4())
+        TaskRepository(db).create(task_id, self._task_document(name, payload, delay_seconds))
+        self.enqueued(db, name, task_id, delay_seconds)
+        return task_id
+    
+    def queue_enqueue(self, batch, db, name: str, payload: Dict[str, Any], delay_seconds: float = 0.0,
+                      task_id: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+        """
+        Queue persisting a task into ``batch``, to commit atomically with the
+        writes it follows up on. Returns its ID and the queued writes per
+        collection; call ``enqueued`` once the batch has committed.
+        """
+        task_id = task_id or str(uuid.uuid4())
+        return task_id, TaskRepository(db).queue_create(batch, task_id, self._task_document(name, payload, delay_seconds))
+    
+    def enqueued(self, db, name: str, task_id: str, delay_seconds: float = 0.0):
+        """Count a persisted task and, when due now, hand it to this worker's pool."""
+        metrics.tasks_enqueued.labels(name).inc()
+        if db is self._db and not delay_seconds:
+            self._loop.call_soon_threadsafe(self._push, task_id)
+    
+    def _task_document(self, name: str, payload: Dict[str, Any], delay_seconds: float) -> Dict[str, Any]:
+        return {
+            'name': name,
+            'payload': payload,
+            'status': TaskStatus.PENDING.value,
+            'attempts': 0,
+            'max_attempts': self.max_attempts,
+            'run_at': datetime.utcnow() + timedelta(seconds=delay_seconds)
+        }
+    
+    def _push(self, task_id: str):
+        if self._queue is not None and task_id not in self._queued:
+            self._queued.add(task_id)
+            self._queue.put_nowait(task_id)
+            metrics.task_queue_depth.set(self._queue.qsize())
+    
+    # Consuming
+    
+    async def start(self, db):
+        """Start the worker pool and poller on the running event loop."""
+        if self._runners:
+            return
+        self._db = db
+        self._repo = TaskRepository(db)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._runners = [asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))]
+        self._runners.append(asyncio.create_task(self._poller()))
+    
+    async def stop(self):
+        """Stop the workers; unfinished tasks stay in the store for the next start."""
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self._runners = []
+        self._queued.clear()
+        self._queue = None
+        self._db = None
+        self._repo = None
+        metrics.task_queue_depth.set(0)
+    
+    async def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until the local queue is empty and idle (for tests and benchmarks)."""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _poller(self):
+        while True:
+            try:
+                now = datetime.utcnow()
+                due = await asyncio.to_thread(self._repo.find_due, now)
+                abandoned = await asyncio.to_thread(self._repo.find_abandoned, now)
+                for task in due + abandoned:
+                    self._push(task.id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Polling for due tasks failed")
+            await asyncio.sleep(self.poll_seconds)
+    
+    async def _worker(self):
+        while True:
+            task_id = await self._queue.get()
+            self._queued.discard(task_id)
+            metrics.task_queue_depth.set(self._queue.qsize())
+            try:
+                await asyncio.to_thread(self._process, task_id)
+            except Exception:
+                logger.exception("Processing task %s failed", task_id)
+            finally:
+                self._queue.task_done()
+    
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** max(0, attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+    
+    def _process(self, task_id: str):
+        """Claim, run and settle one task."""
+        task = self._repo.claim(task_id, self.worker_id, self.visibility_seconds)
+        if task is None:
+            return
+        handler = self.handlers.get(task.name)
+        try:
+            if handler is None:
+                raise UnknownTask(f"No handler registered for task {task.name!r}")
+            handler(self._db, task.payload)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if task.attempts >= task.max_attempts or isinstance(e, UnknownTask):
+                self._repo.fail(task.id, error, None)
+                metrics.tasks_processed.labels(task.name, "dead").inc()
+                logger.error("Task %s (%s) dead-lettered after %d attempts: %s",
+                             task.id, task.name, task.attempts, error)
+            else:
+                retry_at = datetime.utcnow() + timedelta(seconds=self._backoff(task.attempts))
+                self._repo.fail(task.id, error, retry_at)
+                metrics.tasks_processed.labels(task.name, "retry").inc()
+            return
+        self._repo.complete(task.id)
+        metrics.tasks_processed.labels(task.name, "success").inc()
+
+
+# Process-wide queue; handlers are registered at start-up
+task_queue = TaskQueue()
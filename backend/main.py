@@ -2,9 +2,76 @@
 Main FastAPI application entry point.
 Flight Ticketing Web Service Backend
 """
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import auth_router, flights_router, bookings_router, admin_router
+from api.routes import auth_router, flights_router, bookings_router, admin_router, company_router
+from api.routes.bookings import get_hold_service
+from observability import registry, tracer, MetricsMiddleware, CostMiddleware, TracingMiddleware
+from observability.tracing import build_exporter
+from observability.profiling import profiler_gate
+from infrastructure.database import get_firebase_db
+from infrastructure.replicas import flight_replica, offer_index
+from infrastructure.realtime import seat_broadcaster
+from infrastructure.repositories import FlightRepository, BookingRepository, CancellationRepository
+from infrastructure.repositories.base_repository import BaseRepository
+from infrastructure.scheduling import scheduler, hold_reaper
+from infrastructure.tasks import task_queue
+from services import FlightLifecycleService, CancellationService, register_task_handlers
+from services.booking_service import booking_lanes
+from config.settings import get_settings
+
+settings = get_settings()
+
+# Configure tracing before any request is served
+tracer.configure(
+    exporter=build_exporter(settings.tracing_exporter, settings.tracing_jsonl_path),
+    sample_rate=settings.tracing_sample_rate
+)
+profiler_gate.cooldown_seconds = settings.profiler_cooldown_seconds
+seat_broadcaster.max_subscribers = settings.seat_stream_max_subscribers
+booking_lanes.max_batch = settings.booking_lane_max_batch
+BaseRepository.validate_reads = settings.repository_validate_reads
+task_queue.workers = settings.task_workers
+task_queue.max_attempts = settings.task_max_attempts
+task_queue.backoff_seconds = settings.task_backoff_seconds
+task_queue.poll_seconds = settings.task_poll_seconds
+hold_reaper.tick_seconds = settings.hold_reaper_tick_seconds
+register_task_handlers(task_queue)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background replicas and jobs with the application and stop them on shutdown."""
+    db = get_firebase_db()
+    # Built like the routes build it, so reaper expiries follow the same seat paths as API releases
+    holds = get_hold_service(db)
+    offer_index.start(db)
+    if settings.flight_replica_enabled:
+        flight_replica.max_staleness_seconds = settings.flight_replica_max_staleness_seconds
+        flight_replica.start(db)
+    scheduler.lease_seconds = settings.scheduler_lease_seconds
+    if settings.scheduler_enabled:
+        lifecycle = FlightLifecycleService(FlightRepository(db), settings.flight_lifecycle_page_size)
+        scheduler.add("flight_lifecycle", lifecycle.complete_departed, settings.flight_lifecycle_interval_seconds)
+    # Work a dead worker left behind (seats of its holds, refunds of its cancellations)
+    # is only picked up by these sweeps, so they always run (their first tick at startup)
+    cancellations = CancellationService(FlightRepository(db), BookingRepository(db), CancellationRepository(db))
+    scheduler.add("flight_cancellations", cancellations.resume_unfinished, settings.flight_cancellation_sweep_seconds)
+    scheduler.add("seat_holds", holds.sweep_expired, settings.seat_hold_sweep_seconds)
+    scheduler.start(db)
+    await task_queue.start(db)
+    await hold_reaper.start(holds.expire_holds)
+    # The wheel is process memory: put back the holds placed before this worker started
+    await asyncio.to_thread(holds.track_active)
+    yield
+    await hold_reaper.stop()
+    await task_queue.stop()
+    scheduler.stop()
+    flight_replica.stop()
+    offer_index.stop()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -12,7 +79,8 @@ app = FastAPI(
     description="Backend API for flight ticketing web service with role-based access control",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,11 +92,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Open a root span per request and propagate trace context
+app.add_middleware(TracingMiddleware)
+
+# Tally Firestore reads/writes per request and enforce read budgets
+app.add_middleware(
+    CostMiddleware,
+    route_budgets=settings.read_budget_routes,
+    default_budget=settings.read_budget_default,
+    action=settings.read_budget_action
+)
+
+# Record request latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Register routers
 app.include_router(auth_router, prefix="/api")
 app.include_router(flights_router, prefix="/api")
 app.include_router(bookings_router, prefix="/api")
 app.include_router(admin_router, prefix="/api")
+app.include_router(company_router, prefix="/api")
 
 
 @app.get("/")
@@ -47,11 +130,15 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(content=registry.render(), media_type=registry.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
-    from config.settings import get_settings
     
-    settings = get_settings()
     uvicorn.run(
         "main:app",
         host=settings.api_host,
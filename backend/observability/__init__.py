@@ -0,0 +1,22 @@
+"""Observability package: metrics, cost accounting, tracing and request telemetry."""
+from .metrics import MetricsRegistry, registry
+from .cost import RequestCost, ReadBudgetExceeded, current_cost
+from .tracing import Tracer, SpanExporter, JsonLinesFileExporter, tracer, traced, trace_methods
+from .middleware import MetricsMiddleware, CostMiddleware, TracingMiddleware
+
+__all__ = [
+    "MetricsRegistry",
+    "registry",
+    "RequestCost",
+    "ReadBudgetExceeded",
+    "current_cost",
+    "Tracer",
+    "SpanExporter",
+    "JsonLinesFileExporter",
+    "tracer",
+    "traced",
+    "trace_methods",
+    "MetricsMiddleware",
+    "CostMiddleware",
+    "TracingMiddleware"
+]
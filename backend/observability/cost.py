@@ -0,0 +1,176 @@
+"""
+Per-request Firestore cost accounting.
+
+Repositories report document reads and writes through ``record_reads`` and
+``record_writes``. While a request is being served the tally lands on the
+``RequestCost`` bound to the current context, which the cost middleware
+turns into response headers, a structured log line and read-budget checks.
+"""
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+
+class ReadBudgetExceeded(Exception):
+    """Raised when a request reads more documents than its route allows."""
+    
+    def __init__(self, route: str, reads: int, budget: int):
+        super().__init__(f"Read budget exceeded for {route}: {reads} reads (budget {budget})")
+        self.route = route
+        self.reads = reads
+        self.budget = budget
+
+
+class RequestCost:
+    """
+    Running tally of document reads and writes for one request. Work the
+    request hands to other threads (in a copy of its context) adds to the
+    same tally, so updates are locked.
+    """
+    
+    __slots__ = ("scope", "reads", "writes", "collections", "budget", "reject", "over_budget",
+                 "_budgets", "_default_budget", "_budget_resolved", "_lock")
+    
+    def __init__(
+        self,
+        scope=None,
+        budgets: Optional[Dict[str, int]] = None,
+        default_budget: Optional[int] = None,
+        reject: bool = False
+    ):
+        self.scope = scope
+        self.reads = 0
+        self.writes = 0
+        self.collections: Dict[str, Dict[str, int]] = {}
+        self.budget: Optional[int] = None
+        self.reject = reject
+        self.over_budget = False
+        self._budgets = budgets or {}
+        self._default_budget = default_budget
+        self._budget_resolved = False
+        self._lock = threading.Lock()
+    
+    @property
+    def route(self) -> str:
+        """Matched route template, available once routing has happened."""
+        route = self.scope.get("route") if self.scope else None
+        return getattr(route, "path", None) or "unmatched"
+    
+    def _resolve_budget(self):
+        # The route is only known after routing, i.e. by the time the first
+        # repository call happens, so the budget is looked up lazily.
+        if not self._budget_resolved:
+            self.budget = self._budgets.get(self.route, self._default_budget)
+            self._budget_resolved = True
+    
+    def _bucket(self, collection: str) -> Dict[str, int]:
+        bucket = self.collections.get(collection)
+        if bucket is None:
+            bucket = self.collections[collection] = {"reads": 0, "writes": 0}
+        return bucket
+    
+    def add_reads(self, collection: str, count: int):
+        """Add reads and enforce the read budget."""
+        with self._lock:
+            self.reads += count
+            self._bucket(collection)["reads"] += count
+            self._resolve_budget()
+            if self.budget is not None and self.reads > self.budget:
+                self.over_budget = True
+        self.check_budget()
+    
+    def add_writes(self, collection: str, count: int):
+        """Add writes."""
+        with self._lock:
+            self.writes += count
+            self._bucket(collection)["writes"] += count
+    
+    def check_budget(self):
+        """Raise ``ReadBudgetExceeded`` if the request is over budget and rejected for it."""
+        if self.over_budget and self.reject:
+            raise ReadBudgetExceeded(self.route, self.reads, self.budget)
+    
+    def charge(self, collections: Dict[str, Dict[str, int]]):
+        """
+        Add per-collection reads and writes made on the request's behalf
+        elsewhere (see ``split``). The work is already done, so going over
+        budget is flagged but not raised.
+        """
+        with self._lock:
+            for collection, counts in collections.items():
+                bucket = self._bucket(collection)
+                bucket["reads"] += counts["reads"]
+                bucket["writes"] += counts["writes"]
+                self.reads += counts["reads"]
+                self.writes += counts["writes"]
+            self._resolve_budget()
+            if self.budget is not None and self.reads > self.budget:
+                self.over_budget = True
+    
+    def split(self, parts: int) -> List[Dict[str, Dict[str, int]]]:
+        """Split the per-collection tally into ``parts`` near-even shares; the first shares take the remainders."""
+        shares: List[Dict[str, Dict[str, int]]] = [{} for _ in range(parts)]
+        for collection, counts in self.collections.items():
+            for kind, total in counts.items():
+                base, extra = divmod(total, parts)
+                for i, share in enumerate(shares):
+                    if base + (i < extra):
+                        share.setdefault(collection, {"reads": 0, "writes": 0})[kind] = base + (i < extra)
+        return shares
+    
+    def to_dict(self) -> Dict:
+        """Summary suitable for structured logging."""
+        self._resolve_budget()
+        return {
+            "reads": self.reads,
+            "writes": self.writes,
+            "collections": self.collections,
+            "budget": self.budget,
+            "over_budget": self.over_budget,
+        }
+
+
+_current_cost: ContextVar[Optional[RequestCost]] = ContextVar("request_cost", default=None)
+
+
+def current_cost() -> Optional[RequestCost]:
+    """Get the cost tally of the request being served, if any."""
+    return _current_cost.get()
+
+
+def bind_cost(cost: Optional[RequestCost]):
+    """Bind a tally to the current context. Returns a token for ``unbind_cost``."""
+    return _current_cost.set(cost)
+
+
+def unbind_cost(token):
+    """Restore the tally that was bound before ``bind_cost``."""
+    _current_cost.reset(token)
+
+
+def record_reads(collection: str, count: int):
+    """Charge document reads to the current request."""
+    cost = _current_cost.get()
+    if cost is not None and count:
+        cost.add_reads(collection, count)
+
+
+def record_writes(collection: str, count: int):
+    """Charge document writes to the current request."""
+    cost = _current_cost.get()
+    if cost is not None and count:
+        cost.add_writes(collection, count)
+
+
+def charge(collections: Dict[str, Dict[str, int]]):
+    """Charge reads and writes made on its behalf (see ``RequestCost.charge``) to the current request."""
+    cost = _current_cost.get()
+    if cost is not None and collections:
+        cost.charge(collections)
+
+
+def check_budget():
+    """Raise ``ReadBudgetExceeded`` if the current request was rejected for its reads, before it writes."""
+    cost = _current_cost.get()
+    if cost is not None:
+        cost.check_budget()
@@ -0,0 +1,508 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are kept in memory per worker and rendered
+in the Prometheus text format (version 0.0.4) by ``MetricsRegistry.render``.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Build the ``{a="x",b="y"}`` label block for a sample."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+    
+    type_name = "untyped"
+    
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def labels(self, *values: str):
+        """Get the child metric for a combination of label values."""
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def _default(self):
+        """Child used when the metric has no labels."""
+        return self.labels()
+    
+    def samples(self) -> Iterable[str]:
+        """Yield exposition lines for every child."""
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        """Render HELP/TYPE headers followed by samples."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self.samples())
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+    
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._value += amount
+    
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+    
+    type_name = "counter"
+    
+    def _new_child(self):
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+    
+    def samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            labels = _format_labels(self.label_names, values)
+            yield f"{self.name}{labels} {_format_value(child.value)}"
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_lock")
+    
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+    
+    def set(self, value: float):
+        self._value = float(value)
+    
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+    
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+    
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    
+    type_name = "gauge"
+    
+    def _new_child(self):
+        return _GaugeChild()
+    
+    def set(self, value: float):
+        self._default().set(value)
+    
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+    
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+    
+    def samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            labels = _format_labels(self.label_names, values)
+            yield f"{self.name}{labels} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("_upper_bounds", "_bucket_counts", "_sum", "_count", "_lock")
+    
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self._upper_bounds = upper_bounds
+        self._bucket_counts = [0] * len(upper_bounds)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self._upper_bounds):
+                if value <= bound:
+                    self._bucket_counts[i] += 1
+                    break
+    
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Return cumulative bucket counts, sum and count."""
+        with self._lock:
+            cumulative, running = [], 0
+            for count in self._bucket_counts:
+                running += count
+                cumulative.append(running)
+            return cumulative, self._sum, self._count
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets."""
+    
+    type_name = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        bounds = tuple(sorted(float(b) for b in buckets))
+        if not bounds or bounds[-1] != math.inf:
+            bounds = bounds + (math.inf,)
+        self.buckets = bounds
+    
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+    
+    def observe(self, value: float):
+        self._default().observe(value)
+    
+    @contextmanager
+    def time(self, *label_values: str):
+        """Context manager observing the elapsed wall time in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.labels(*label_values).observe(time.perf_counter() - start)
+    
+    def samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            cumulative, total, count = child.snapshot()
+            for bound, bucket_count in zip(self.buckets, cumulative):
+                labels = _format_labels(self.label_names, values, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {bucket_count}"
+            labels = _format_labels(self.label_names, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in Prometheus text format."""
+    
+    CONTENT_TYPE = "text/plain; version=0.0.4"
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+    
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Create (or fetch) a counter."""
+        return self._register(Counter(name, documentation, label_names))
+    
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        """Create (or fetch) a gauge."""
+        return self._register(Gauge(name, documentation, label_names))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Create (or fetch) a histogram."""
+        return self._register(Histogram(name, documentation, label_names, buckets))
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        """Look up a registered metric by name."""
+        return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """Render every registered metric."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by the application
+registry = MetricsRegistry()
+
+# HTTP layer
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed."
+)
+
+# Repository layer
+repository_operation_duration = registry.histogram(
+    "repository_operation_duration_seconds",
+    "Repository method latency by collection and operation.",
+    ("collection", "operation")
+)
+repository_operation_errors = registry.counter(
+    "repository_operation_errors_total",
+    "Repository method calls that raised, by collection and operation.",
+    ("collection", "operation")
+)
+documents_read = registry.counter(
+    "firestore_documents_read_total",
+    "Billable Firestore document reads by collection.",
+    ("collection",)
+)
+documents_written = registry.counter(
+    "firestore_documents_written_total",
+    "Firestore document writes by collection.",
+    ("collection",)
+)
+bulk_write_retries = registry.counter(
+    "bulk_write_retries_total",
+    "Bulk write chunks retried after a retryable commit error, by collection and operation.",
+    ("collection", "operation")
+)
+bulk_write_failures = registry.counter(
+    "bulk_write_failures_total",
+    "Documents a bulk write could not write, by collection and operation.",
+    ("collection", "operation")
+)
+
+# Caches
+cache_requests = registry.counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss).",
+    ("cache", "result")
+)
+cache_hit_ratio = registry.gauge(
+    "cache_hit_ratio",
+    "Fraction of cache lookups served from the cache since start-up.",
+    ("cache",)
+)
+
+# Collection replicas
+replica_ready = registry.gauge(
+    "replica_ready",
+    "1 once a collection replica has loaded its initial snapshot, else 0.",
+    ("collection",)
+)
+replica_lag = registry.gauge(
+    "replica_lag_seconds",
+    "Delay between the last commit applied to a replica and its arrival.",
+    ("collection",)
+)
+replica_documents = registry.gauge(
+    "replica_documents",
+    "Documents currently held by a collection replica.",
+    ("collection",)
+)
+
+# Seat availability stream
+seat_stream_subscribers = registry.gauge(
+    "seat_stream_subscribers",
+    "Clients currently subscribed to the seat availability stream."
+)
+seat_stream_published = registry.counter(
+    "seat_stream_published_total",
+    "Seat deltas published to at least one subscriber."
+)
+seat_stream_conflated = registry.counter(
+    "seat_stream_conflated_total",
+    "Seat deltas merged into a subscriber's pending delta before it was sent."
+)
+seat_stream_events = registry.counter(
+    "seat_stream_events_total",
+    "Seat events written to subscribers."
+)
+
+# Request coalescing
+coalesced_calls = registry.counter(
+    "singleflight_calls_total",
+    "Coalesced calls by group and role (leader ran the call, follower shared its result).",
+    ("group", "role")
+)
+collapse_ratio = registry.gauge(
+    "singleflight_collapse_ratio",
+    "Fraction of calls served by another caller's in-flight call since start-up.",
+    ("group",)
+)
+
+# Per-key batching lanes
+lane_batch_size = registry.histogram(
+    "lane_batch_size",
+    "Items handed to a lane handler per batch, by lane group.",
+    ("lanes",),
+    buckets=(1, 2, 5, 10, 20, 50, 100)
+)
+
+# Background jobs
+scheduler_leader = registry.gauge(
+    "scheduler_leader",
+    "1 while this worker holds the lease of a scheduled job, else 0.",
+    ("job",)
+)
+scheduler_runs = registry.counter(
+    "scheduler_runs_total",
+    "Scheduled job runs on this worker by outcome.",
+    ("job", "outcome")
+)
+scheduler_last_success = registry.gauge(
+    "scheduler_last_success_timestamp_seconds",
+    "Unix time of the last successful run of a scheduled job on this worker.",
+    ("job",)
+)
+flights_completed = registry.counter(
+    "flights_completed_total",
+    "Departed flights moved to completed by the lifecycle job."
+)
+flight_lifecycle_lag = registry.gauge(
+    "flight_lifecycle_lag_seconds",
+    "Age of the oldest arrived flight still scheduled after the last lifecycle run."
+)
+
+# Task queue
+tasks_enqueued = registry.counter(
+    "tasks_enqueued_total",
+    "Background tasks enqueued by name.",
+    ("task",)
+)
+tasks_processed = registry.counter(
+    "tasks_processed_total",
+    "Background task attempts by name and outcome (success, retry, dead).",
+    ("task", "outcome")
+)
+task_queue_depth = registry.gauge(
+    "task_queue_depth",
+    "Task IDs waiting for a worker of this process."
+)
+
+# Seat holds
+seat_holds = registry.counter(
+    "seat_holds_total",
+    "Seat holds by outcome (placed, converted, released, expired).",
+    ("outcome",)
+)
+waitlist_events = registry.counter(
+    "waitlist_events_total",
+    "Waitlist changes by event (joined, left, promoted).",
+    ("event",)
+)
+hold_reaper_pending = registry.gauge(
+    "hold_reaper_pending",
+    "Seat holds of this process waiting in the expiry timer wheel."
+)
+
+
+@contextmanager
+def repository_timer(collection: str, operation: str):
+    """Time a repository call and count it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        repository_operation_errors.labels(collection, operation).inc()
+        raise
+    finally:
+        repository_operation_duration.labels(collection, operation).observe(
+            time.perf_counter() - start
+        )
+
+
+def record_documents_read(collection: str, count: int):
+    """Count billable document reads against a collection."""
+    if count:
+        documents_read.labels(collection).inc(count)
+
+
+def record_documents_written(collection: str, count: int):
+    """Count document writes against a collection."""
+    if count:
+        documents_written.labels(collection).inc(count)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count a cache lookup and refresh the cache's hit ratio."""
+    cache_requests.labels(cache, "hit" if hit else "miss").inc()
+    hits = cache_requests.labels(cache, "hit").value
+    misses = cache_requests.labels(cache, "miss").value
+    cache_hit_ratio.labels(cache).set(hits / (hits + misses))
+
+
+def record_coalesced_call(group: str, leader: bool):
+    """Count a coalesced call and refresh the group's collapse ratio."""
+    coalesced_calls.labels(group, "leader" if leader else "follower").inc()
+    leaders = coalesced_calls.labels(group, "leader").value
+    followers = coalesced_calls.labels(group, "follower").value
+    collapse_ratio.labels(group).set(followers / (leaders + followers))
+
+
+def record_job_run(job: str, ok: bool):
+    """Count a scheduled job run and stamp the last success."""
+    scheduler_runs.labels(job, "success" if ok else "failure").inc()
+    if ok:
+        scheduler_last_success.labels(job).set(time.time())
@@ -0,0 +1,191 @@
+"""ASGI middleware feeding request telemetry into the observability layer."""
+import json
+import logging
+import time
+from typing import Dict, Optional
+from observability import metrics
+from observability.cost import RequestCost, ReadBudgetExceeded, bind_cost, unbind_cost, current_cost
+from observability.tracing import tracer, parse_traceparent, format_traceparent
+
+cost_logger = logging.getLogger("observability.cost")
+
+
+def route_template(scope) -> str:
+    """
+    Get the matched route template (e.g. ``/api/flights/{flight_id}``).
+    Unmatched paths collapse into one label to keep cardinality bounded.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "unmatched"
+
+
+class MetricsMiddleware:
+    """Records latency per route and status plus the number of in-flight requests."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        start = time.perf_counter()
+        
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        metrics.http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.http_requests_in_flight.dec()
+            metrics.http_request_duration.labels(
+                scope["method"], route_template(scope), str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+class CostMiddleware:
+    """
+    Tallies Firestore reads and writes per request.
+    The tally is returned in ``X-Firestore-Reads``/``X-Firestore-Writes`` headers
+    and logged as one JSON line. Requests over their read budget are logged as
+    warnings or, with ``action="reject"``, answered with 429.
+    """
+    
+    READS_HEADER = b"x-firestore-reads"
+    WRITES_HEADER = b"x-firestore-writes"
+    
+    def __init__(
+        self,
+        app,
+        route_budgets: Optional[Dict[str, int]] = None,
+        default_budget: Optional[int] = None,
+        action: str = "log"
+    ):
+        if action not in ("log", "reject"):
+            raise ValueError("Read budget action must be 'log' or 'reject'")
+        self.app = app
+        self.route_budgets = route_budgets or {}
+        self.default_budget = default_budget
+        self.reject = action == "reject"
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        cost = RequestCost(scope, self.route_budgets, self.default_budget, self.reject)
+        status_code = 500
+        response_started = False
+        replaced = False
+        
+        async def send_rejection():
+            nonlocal status_code, response_started, replaced
+            body = json.dumps({"detail": "Request exceeded its read budget"}).encode()
+            status_code, response_started, replaced = 429, True, True
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": self._cost_headers(cost) + [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+        
+        async def send_wrapper(message):
+            nonlocal status_code, response_started
+            if replaced:
+                # The client already got the 429; drop what the handler produced
+                return
+            if message["type"] == "http.response.start":
+                if cost.reject and cost.over_budget:
+                    # Route handlers turn unexpected exceptions into 500s,
+                    # so a budget rejection may arrive here disguised as one.
+                    await send_rejection()
+                    return
+                status_code = message["status"]
+                response_started = True
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + self._cost_headers(cost)
+            await send(message)
+        
+        token = bind_cost(cost)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except ReadBudgetExceeded:
+            if response_started:
+                raise
+            await send_rejection()
+        finally:
+            unbind_cost(token)
+            self._log(scope, status_code, cost)
+    
+    def _cost_headers(self, cost: RequestCost):
+        return [
+            (self.READS_HEADER, str(cost.reads).encode()),
+            (self.WRITES_HEADER, str(cost.writes).encode()),
+        ]
+    
+    def _log(self, scope, status_code: int, cost: RequestCost):
+        record = {
+            "event": "request_cost",
+            "method": scope["method"],
+            "route": route_template(scope),
+            "status": status_code,
+        }
+        record.update(cost.to_dict())
+        if cost.over_budget:
+            cost_logger.warning(json.dumps(record))
+        elif cost_logger.isEnabledFor(logging.INFO):
+            cost_logger.info(json.dumps(record))
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of each request, continuing the caller's trace when a
+    ``traceparent`` header is present, and echoes the trace context back.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        parent = None
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        
+        with tracer.start_span(f"{scope['method']} {scope['path']}", parent=parent) as span:
+            traceparent = format_traceparent(span).encode()
+            
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [(b"traceparent", traceparent)]
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if span.sampled:
+                    route = route_template(scope)
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.method", scope["method"])
+                    span.set_attribute("http.route", route)
+                    cost = current_cost()
+                    if cost is not None:
+                        span.set_attribute("firestore.reads", cost.reads)
+                        span.set_attribute("firestore.writes", cost.writes)
@@ -0,0 +1,162 @@
+"""
+On-demand sampling profiler for the live worker.
+
+``SamplingProfiler`` periodically snapshots the Python stacks of every other
+thread via ``sys._current_frames`` and aggregates them into collapsed stacks
+(the input format of flamegraph tools) and per-function self/total sample
+counts. It needs no restart, no tracing hooks and no external agent, and its
+overhead is bounded by the sampling interval.
+
+``ProfilerGate`` limits sessions to one at a time with a cooldown in between,
+so the profiler cannot be used to load the worker.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Leaf frames of threads that are parked waiting for work
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("_base.py", "wait"),
+}
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling session cannot start yet."""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"Profiler is busy, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class ProfilerGate:
+    """Allows one profiling session at a time and enforces a cooldown between them."""
+    
+    def __init__(self, cooldown_seconds: float = 30.0):
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._active = False
+        self._last_finished = 0.0
+    
+    def acquire(self):
+        """Claim the profiler or raise ``ProfilerBusy``."""
+        with self._lock:
+            if self._active:
+                raise ProfilerBusy(self.cooldown_seconds)
+            wait = self._last_finished + self.cooldown_seconds - time.monotonic()
+            if self._last_finished and wait > 0:
+                raise ProfilerBusy(wait)
+            self._active = True
+    
+    def release(self):
+        """Mark the running session as finished."""
+        with self._lock:
+            self._active = False
+            self._last_finished = time.monotonic()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler over all threads of the process."""
+    
+    def __init__(self, interval: float = 0.005, max_depth: int = 128, include_idle: bool = False):
+        if interval <= 0:
+            raise ValueError("Sampling interval must be positive")
+        self.interval = interval
+        self.max_depth = max_depth
+        self.include_idle = include_idle
+    
+    def _is_idle(self, frame) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+    
+    def _stack(self, frame) -> Tuple[str, ...]:
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        labels.reverse()
+        return tuple(labels)
+    
+    def run(self, duration: float) -> Dict[str, Any]:
+        """Sample for ``duration`` seconds in the calling thread and aggregate."""
+        own_thread = threading.get_ident()
+        stacks: Counter = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + duration
+        
+        while True:
+            tick = time.perf_counter()
+            if tick >= deadline:
+                break
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                if not self.include_idle and self._is_idle(frame):
+                    continue
+                stacks[self._stack(frame)] += 1
+            samples += 1
+            # Sleep the remainder of the interval so sampling cost stays bounded
+            time.sleep(max(0.0, self.interval - (time.perf_counter() - tick)))
+        
+        return self._report(stacks, samples, time.perf_counter() - started)
+    
+    def _report(self, stacks: Counter, samples: int, elapsed: float, top: int = 30) -> Dict[str, Any]:
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in stacks.items():
+            if not stack:
+                continue
+            self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+        
+        stack_samples = sum(stacks.values()) or 1
+        top_functions: List[Dict[str, Any]] = [
+            {
+                "function": label,
+                "self_samples": count,
+                "self_percent": round(100.0 * count / stack_samples, 2),
+                "total_samples": total_counts[label],
+                "self_seconds": round(count * self.interval, 4),
+            }
+            for label, count in self_counts.most_common(top)
+        ]
+        collapsed = "\n".join(
+            f"{';'.join(stack)} {count}"
+            for stack, count in sorted(stacks.items(), key=lambda item: -item[1])
+        )
+        return {
+            "duration_seconds": round(elapsed, 3),
+            "interval_seconds": self.interval,
+            "sampling_rounds": samples,
+            "stack_samples": sum(stacks.values()),
+            "top_functions": top_functions,
+            "collapsed": collapsed,
+        }
+
+
+# Process-wide gate shared by every profiling entry point
+profiler_gate = ProfilerGate()
+
+
+def profile(duration: float, interval: float = 0.005, include_idle: bool = False,
+            gate: Optional[ProfilerGate] = None) -> Dict[str, Any]:
+    """Run a gated profiling session. Blocks the calling thread for ``duration``."""
+    gate = gate or profiler_gate
+    gate.acquire()
+    try:
+        return SamplingProfiler(interval, include_idle=include_idle).run(duration)
+    finally:
+        gate.release()
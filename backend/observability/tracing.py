@@ -0,0 +1,306 @@
+"""
+Lightweight distributed tracing.
+
+Spans are opened with ``tracer.start_span`` (or the ``traced`` decorators),
+nest through a context variable and carry W3C ``traceparent`` context across
+process boundaries. Sampling is decided once per trace at its root, so
+unsampled requests only pay for a context-variable lookup per span. Finished
+spans of a trace are handed to the configured exporter in one batch when the
+local root span ends.
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("observability.tracing")
+
+
+class Span:
+    """A timed operation within a trace."""
+    
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_time", "duration",
+                 "attributes", "status", "error", "_start", "_buffer")
+    
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], buffer: List["Span"]):
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+        self._buffer = buffer
+    
+    sampled = True
+    
+    def set_attribute(self, key: str, value: Any):
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+    
+    def record_exception(self, exc: BaseException):
+        """Mark the span as failed."""
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+    
+    def finish(self):
+        """Stop the clock and hand the span to its trace buffer."""
+        self.duration = time.perf_counter() - self._start
+        self._buffer.append(self)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable representation used by exporters."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NonRecordingSpan:
+    """Stand-in for spans of unsampled traces; carries context only."""
+    
+    __slots__ = ("trace_id", "span_id")
+    
+    sampled = False
+    
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def record_exception(self, exc: BaseException):
+        pass
+
+
+class SpanContext:
+    """Remote parent extracted from a ``traceparent`` header."""
+    
+    __slots__ = ("trace_id", "span_id", "sampled")
+    
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+def _new_trace_id() -> str:
+    return "%032x" % random.getrandbits(128)
+
+
+def _new_span_id() -> str:
+    return "%016x" % random.getrandbits(64)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """Parse a W3C ``traceparent`` header; returns None when malformed."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    try:
+        if version == "ff" or int(trace_id, 16) == 0 or int(span_id, 16) == 0:
+            return None
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    return SpanContext(trace_id, span_id, sampled)
+
+
+def format_traceparent(span) -> str:
+    """Format the ``traceparent`` header for a span (recording or not)."""
+    return f"00-{span.trace_id}-{span.span_id}-{'01' if span.sampled else '00'}"
+
+
+class SpanExporter:
+    """Base class for span exporters. Receives the finished spans of one trace."""
+    
+    def export(self, spans: List[Span]):
+        raise NotImplementedError
+    
+    def shutdown(self):
+        """Release resources held by the exporter."""
+        pass
+
+
+class NoopExporter(SpanExporter):
+    """Drops every span."""
+    
+    def export(self, spans: List[Span]):
+        pass
+
+
+class LoggingExporter(SpanExporter):
+    """Writes one JSON log line per span to the ``observability.tracing`` logger."""
+    
+    def export(self, spans: List[Span]):
+        for span in spans:
+            logger.info(json.dumps(span.to_dict(), default=str))
+
+
+class JsonLinesFileExporter(SpanExporter):
+    """Appends spans as JSON lines to a local file for offline analysis."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]):
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+    
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+
+def build_exporter(name: str, jsonl_path: str = "traces.jsonl") -> SpanExporter:
+    """Factory for the exporters selectable from settings."""
+    if name == "none":
+        return NoopExporter()
+    if name == "log":
+        return LoggingExporter()
+    if name == "jsonl":
+        return JsonLinesFileExporter(jsonl_path)
+    raise ValueError(f"Unknown tracing exporter: {name}")
+
+
+_current_span: ContextVar[Any] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Creates spans, applies sampling and dispatches finished traces."""
+    
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = 0.0):
+        self.exporter = exporter or NoopExporter()
+        self.sample_rate = sample_rate
+    
+    def configure(self, exporter: Optional[SpanExporter] = None, sample_rate: Optional[float] = None):
+        """Swap the exporter and/or sampling rate at runtime."""
+        if exporter is not None:
+            previous, self.exporter = self.exporter, exporter
+            if previous is not exporter:
+                previous.shutdown()
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("Sample rate must be between 0 and 1")
+            self.sample_rate = sample_rate
+    
+    def current_span(self):
+        """Get the active span (recording or not), if any."""
+        return _current_span.get()
+    
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[SpanContext] = None
+    ) -> Iterator[Any]:
+        """
+        Open a span as a child of the active span, or of ``parent`` when given.
+        Without either a new trace is started and the sampling decision made.
+        """
+        active = parent if parent is not None else _current_span.get()
+        
+        if active is not None and not active.sampled:
+            # Unsampled trace: keep propagating context without recording
+            span = _NonRecordingSpan(active.trace_id, _new_span_id())
+            token = _current_span.set(span)
+            try:
+                yield span
+            finally:
+                _current_span.reset(token)
+            return
+        
+        if active is None and (self.sample_rate <= 0.0 or random.random() >= self.sample_rate):
+            span = _NonRecordingSpan(_new_trace_id(), _new_span_id())
+            token = _current_span.set(span)
+            try:
+                yield span
+            finally:
+                _current_span.reset(token)
+            return
+        
+        local_root = not isinstance(active, Span)
+        buffer: List[Span] = [] if local_root else active._buffer
+        trace_id = active.trace_id if active is not None else _new_trace_id()
+        span = Span(name, trace_id, active.span_id if active is not None else None, buffer)
+        if attributes:
+            span.attributes.update(attributes)
+        
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            if local_root:
+                self._export(buffer)
+    
+    def _export(self, spans: List[Span]):
+        try:
+            self.exporter.export(spans)
+        except Exception:
+            logger.exception("Failed to export %d spans", len(spans))
+
+
+# Process-wide tracer used by the application
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping a sync or async function in a span."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.start_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_methods(cls):
+    """Class decorator tracing every public method defined on the class."""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.isfunction(value):
+            continue
+        setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
@@ -2,6 +2,23 @@
 from .auth_service import AuthService
 from .flight_service import FlightService
 from .booking_service import BookingService
+from .repricing_service import RepricingService, FareCurve
+from .dashboard_service import DashboardService
+from .lifecycle_service import FlightLifecycleService
+from .cancellation_service import CancellationService
+from .notification_service import NotificationService, register_task_handlers
+from .hold_service import SeatHoldService
 
-__all__ = ["AuthService", "FlightService", "BookingService"]
-
+__all__ = [
+    "AuthService",
+    "FlightService",
+    "BookingService",
+    "RepricingService",
+    "FareCurve",
+    "DashboardService",
+    "FlightLifecycleService",
+    "CancellationService",
+    "NotificationService",
+    "register_task_handlers",
+    "SeatHoldService"
+]
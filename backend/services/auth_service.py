@@ -6,16 +6,19 @@ from firebase_admin import auth as firebase_auth
 from domain.models import User, UserCreate, UserLogin, UserRole
 from infrastructure.repositories import UserRepository
 from core.security import PasswordHasher, TokenManager
+from observability import trace_methods
 
 
+@trace_methods
 class AuthService:
     """
     Service class for authentication operations.
     Implements business logic for user authentication.
     """
     
-    def __init__(self, user_repo: UserRepository):
+    def __init__(self, user_repo: UserRepository, auth_client=None):
         self.user_repo = user_repo
+        self.firebase_auth = auth_client or firebase_auth
         self.password_hasher = PasswordHasher()
         self.token_manager = TokenManager()
     
@@ -31,7 +34,7 @@ class AuthService:
         
         # Create user in Firebase Auth
         try:
-            firebase_user = firebase_auth.create_user(
+            firebase_user = self.firebase_auth.create_user(
                 email=user_data.email,
                 password=user_data.password,
                 display_name=user_data.name
@@ -52,7 +55,7 @@ class AuthService:
         self.user_repo.create(user_id, user_doc)
         
         # Set custom claims for role
-        firebase_auth.set_custom_user_claims(user_id, {'role': user_data.role.value})
+        self.firebase_auth.set_custom_user_claims(user_id, {'role': user_data.role.value})
         
         # Generate access token
         access_token = self.token_manager.create_access_token(
@@ -82,7 +85,7 @@ class AuthService:
         
         # Verify user exists in Firebase Auth and get user
         try:
-            firebase_user = firebase_auth.get_user_by_email(login_data.email)
+            firebase_user = self.firebase_auth.get_user_by_email(login_data.email)
         except Exception:
             raise ValueError("Invalid email or password")
         
@@ -104,7 +107,7 @@ class AuthService:
         This is for frontend Firebase Auth integration.
         """
         try:
-            decoded_token = firebase_auth.verify_id_token(id_token)
+            decoded_token = self.firebase_auth.verify_id_token(id_token)
             user_id = decoded_token['uid']
             
             # Get user from database
@@ -1,17 +1,65 @@
 """Booking service layer."""
+import logging
+import random
+import time
 import uuid
 from datetime import datetime
-from typing import List, Optional
-from domain.models import Booking, BookingCreate, BookingStatus
-from infrastructure.repositories import BookingRepository, FlightRepository
+from typing import Any, Dict, List, Optional, Tuple
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from core.lanes import BatchingLanes
+from domain.models import Booking, BookingCreate, BookingStatus, FlightStatus, WaitlistCreate, WaitlistEntry
+from infrastructure.repositories import (
+    BookingRepository, FlightRepository, SeatMapRepository, UserRepository, WaitlistRepository
+)
+from infrastructure.replicas import offer_index
+from infrastructure.tasks import task_queue
+from observability import metrics, trace_methods
+from .notification_service import BOOKING_CONFIRMED, BOOKING_CANCELLED
 
+# Columns of a passenger manifest row, in export order
+MANIFEST_FIELDS = [
+    'confirmation_id', 'booking_id', 'status', 'passengers', 'total_price',
+    'booked_at', 'cancelled_at', 'user_id', 'passenger_name', 'passenger_email'
+]
 
+# Per-flight booking lanes shared by the process's requests
+booking_lanes = BatchingLanes("bookings")
+
+# Longest waitlist kept per flight (one document holds the whole queue)
+MAX_WAITLIST = 500
+
+logger = logging.getLogger(__name__)
+
+
+def promotable(entries: List[WaitlistEntry], seats: int) -> Tuple[List[WaitlistEntry], List[WaitlistEntry]]:
+    """
+    Split a waitlist (in serving order) into the entries that fit in
+    ``seats``, taken front to back and skipping those too large for what is
+    left, and the entries that keep waiting.
+    """
+    promoted, waiting = [], []
+    for entry in entries:
+        if entry.passengers <= seats:
+            promoted.append(entry)
+            seats -= entry.passengers
+        else:
+            waiting.append(entry)
+    return promoted, waiting
+
+
+@trace_methods
 class BookingService:
     """Service class for booking operations."""
     
-    def __init__(self, booking_repo: BookingRepository, flight_repo: FlightRepository):
+    def __init__(self, booking_repo: BookingRepository, flight_repo: FlightRepository,
+                 user_repo: Optional[UserRepository] = None, seat_map_repo: Optional[SeatMapRepository] = None,
+                 waitlist_repo: Optional[WaitlistRepository] = None, attempts: int = 5):
         self.booking_repo = booking_repo
         self.flight_repo = flight_repo
+        self.user_repo = user_repo
+        self.seat_map_repo = seat_map_repo
+        self.waitlist_repo = waitlist_repo
+        self.attempts = attempts
     
     def create_booking(self, user_id: str, booking_data: BookingCreate) -> Booking:
         """Create a new booking."""
@@ -28,31 +76,82 @@ class BookingService:
         if flight.status != "scheduled":
             raise ValueError("Flight is not available for booking")
         
-        # Update available seats
-        success = self.flight_repo.update_available_seats(
-            booking_data.flight_id,
-            booking_data.passengers
-        )
-        
-        if not success:
-            raise ValueError("Failed to reserve seats")
-        
-        # Create booking
-        booking_id = str(uuid.uuid4())
-        confirmation_id = f"CNF{uuid.uuid4().hex[:8].upper()}"
+        # Bookings of one flight queue in its lane and commit several per write
+        return booking_lanes.submit(booking_data.flight_id, (user_id, booking_data), self._book_batch)
+    
+    def _book_batch(self, flight_id: str, requests: List[Tuple[str, BookingCreate]]) -> List[Any]:
+        """
+        Book a lane's batch of requests for one flight, in order, in a single
+        write: the seat count, the seat map, every booking and its
+        confirmation task commit together. Returns a Booking or a ValueError
+        per request; a request that does not fit fails on its own without
+        failing the batch.
+        """
+        outcomes: List[Any] = []
+        tasks: List[str] = []
         
-        booking_doc = {
-            'user_id': user_id,
-            'flight_id': booking_data.flight_id,
-            'confirmation_id': confirmation_id,
-            'passengers': booking_data.passengers,
-            'total_price': flight.price * booking_data.passengers,
-            'status': BookingStatus.CONFIRMED.value,
-            'booked_at': datetime.utcnow()
-        }
+        def queue_bookings(batch, flight) -> Tuple[int, Dict[str, int]]:
+            # Runs again on a retry, against the flight as re-read
+            outcomes.clear()
+            tasks.clear()
+            if flight.status != FlightStatus.SCHEDULED:
+                outcomes.extend(ValueError("Flight is not available for booking") for _ in requests)
+                return 0, {}
+            writes: Dict[str, int] = {}
+            seat_map = map_snapshot = None
+            if self.seat_map_repo is not None:
+                seat_map, map_snapshot = self.seat_map_repo.read(flight)
+            # Discount from the in-memory offer index, no extra reads
+            unit_price, offer = offer_index.price(flight.id, flight.price)
+            available = flight.available_seats
+            for user_id, booking_data in requests:
+                if booking_data.passengers > available:
+                    outcomes.append(ValueError(f"Not enough seats available. Only {available} seats left"))
+                    continue
+                try:
+                    seats = self.seat_map_repo.assign(seat_map, booking_data.passengers, booking_data.seats) \
+                        if seat_map is not None else []
+                except ValueError as e:
+                    outcomes.append(e)
+                    continue
+                booking_id = str(uuid.uuid4())
+                booking_doc = {
+                    'user_id': user_id,
+                    'flight_id': flight_id,
+                    'confirmation_id': f"CNF{uuid.uuid4().hex[:8].upper()}",
+                    'passengers': booking_data.passengers,
+                    'total_price': round(unit_price * booking_data.passengers, 2),
+                    'status': BookingStatus.CONFIRMED.value,
+                    'booked_at': datetime.utcnow(),
+                    'seats': seats,
+                    # Denormalized so rollups update in the booking's own write batch
+                    'company_id': flight.company_id,
+                    'departure_time': flight.departure_time
+                }
+                if offer is not None:
+                    booking_doc['offer_id'] = offer.id
+                for collection, count in self.booking_repo.queue_create(batch, booking_id, booking_doc).items():
+                    writes[collection] = writes.get(collection, 0) + count
+                # Confirmation message and audit entry run after the response
+                task_id, queued = task_queue.queue_enqueue(batch, self.booking_repo.db, BOOKING_CONFIRMED,
+                                                           {'booking_id': booking_id, 'user_id': user_id})
+                for collection, count in queued.items():
+                    writes[collection] = writes.get(collection, 0) + count
+                tasks.append(task_id)
+                outcomes.append(Booking(id=booking_id, **booking_doc))
+                available -= booking_data.passengers
+            taken = flight.available_seats - available
+            if taken and seat_map is not None:
+                for collection, count in self.seat_map_repo.queue_save(batch, flight_id, seat_map, map_snapshot).items():
+                    writes[collection] = writes.get(collection, 0) + count
+            return taken, writes
         
-        self.booking_repo.create(booking_id, booking_doc)
-        return self.booking_repo.get_by_id(booking_id)
+        flight, _ = self.flight_repo.take_seats(flight_id, queue_bookings)
+        if flight is None:
+            return [ValueError("Flight not found") for _ in requests]
+        for task_id in tasks:
+            task_queue.enqueued(self.booking_repo.db, BOOKING_CONFIRMED, task_id)
+        return outcomes
     
     def get_booking(self, booking_id: str) -> Optional[Booking]:
         """Get booking by ID."""
@@ -71,32 +170,226 @@ class BookingService:
         return bookings
     
     def cancel_booking(self, booking_id: str, user_id: str) -> bool:
-        """Cancel a booking and restore seats."""
-        booking = self.booking_repo.get_by_id(booking_id)
-        if not booking:
-            raise ValueError("Booking not found")
+        """
+        Cancel a booking and restore seats. The freed seats go first to the
+        flight's waitlist: the cancellation, the promoted bookings, the seat
+        map, the waitlist and the seat count commit in one batch.
+        """
+        for attempt in range(self.attempts):
+            snapshot = self.booking_repo.get_snapshot(booking_id)
+            if not snapshot:
+                raise ValueError("Booking not found")
+            booking = self.booking_repo.from_snapshot(snapshot)
+            
+            # Verify booking belongs to user
+            if booking.user_id != user_id:
+                raise ValueError("Unauthorized to cancel this booking")
+            
+            # Check if already cancelled
+            if booking.status == BookingStatus.CANCELLED:
+                raise ValueError("Booking is already cancelled")
+            if booking.status == BookingStatus.REFUNDED:
+                raise ValueError("Booking was refunded after its flight was cancelled")
+            
+            try:
+                promoted = self._cancel_and_promote(snapshot, booking)
+                break
+            except (FailedPrecondition, AlreadyExists, NotFound):
+                # A concurrent booking, cancellation or waitlist change: re-read and retry
+                if attempt == self.attempts - 1:
+                    raise
+                time.sleep(random.uniform(0, 0.005 * 2 ** attempt))
         
-        # Verify booking belongs to user
-        if booking.user_id != user_id:
-            raise ValueError("Unauthorized to cancel this booking")
+        if promoted:
+            metrics.waitlist_events.labels("promoted").inc(len(promoted))
+            logger.info("Promoted %d waitlisted requests on flight %s", len(promoted), booking.flight_id)
+        return True
+    
+    def _cancel_and_promote(self, snapshot, booking: Booking) -> List[Tuple[str, WaitlistEntry]]:
+        """
+        One attempt at cancelling a read booking; returns the promoted
+        (booking ID, entry) pairs. The follow-up tasks commit with the rest.
+        """
+        flight_id = booking.flight_id
+        db = self.booking_repo.db
+        batch = db.batch()
+        writes: Dict[str, int] = {}
+        tasks: List[Tuple[str, str]] = []
         
-        # Check if already cancelled
-        if booking.status == BookingStatus.CANCELLED:
-            raise ValueError("Booking is already cancelled")
+        def add(queued: Dict[str, int]):
+            for collection, count in queued.items():
+                writes[collection] = writes.get(collection, 0) + count
         
-        # Cancel booking
-        success = self.booking_repo.cancel_booking(booking_id)
+        def add_task(name: str, payload: Dict[str, Any]):
+            task_id, queued = task_queue.queue_enqueue(batch, db, name, payload)
+            add(queued)
+            tasks.append((name, task_id))
         
-        if success:
-            # Restore seats to flight
-            flight = self.flight_repo.get_by_id(booking.flight_id)
+        add(self.booking_repo.queue_update(batch, snapshot, {
+            'status': BookingStatus.CANCELLED.value,
+            'cancelled_at': datetime.utcnow()
+        }))
+        add_task(BOOKING_CANCELLED, {'booking_id': booking.id, 'user_id': booking.user_id})
+        
+        promoted: List[WaitlistEntry] = []
+        flight = flight_snapshot = None
+        if self.waitlist_repo is not None:
+            entries, waitlist_snapshot = self.waitlist_repo.read(flight_id)
+            if entries:
+                # Seats left unsold by earlier promotions count too, so read the latest count
+                flight_snapshot = self.flight_repo.get_snapshot(flight_id)
+                flight = self.flight_repo.from_snapshot(flight_snapshot) if flight_snapshot else None
+            if flight and flight.status == FlightStatus.SCHEDULED:
+                promoted, waiting = promotable(entries, booking.passengers + flight.available_seats)
+        
+        seats: Dict[str, List[str]] = {}
+        if self.seat_map_repo is not None and (booking.seats or promoted):
+            flight = flight or self.flight_repo.get_by_id(flight_id)
             if flight:
-                new_available = flight.available_seats + booking.passengers
-                self.flight_repo.update(booking.flight_id, {'available_seats': new_available})
+                seat_map, map_snapshot = self.seat_map_repo.read(flight)
+                seat_map.release(seat_map.index(label) for label in booking.seats)
+                for entry in promoted:
+                    if seat_map.free_count >= entry.passengers:
+                        seats[entry.id] = [seat_map.label(index) for index in seat_map.allocate(entry.passengers)]
+                if len(seats) < len(promoted):
+                    # The map is short of the count: entries it cannot seat keep their place in line
+                    logger.warning("Seat map of flight %s is short; %d waitlisted requests stay waiting",
+                                   flight_id, len(promoted) - len(seats))
+                    promoted = [entry for entry in promoted if entry.id in seats]
+                    waiting = [entry for entry in entries if entry.id not in seats]
+                add(self.seat_map_repo.queue_save(batch, flight_id, seat_map, map_snapshot))
+        if promoted:
+            add(self.waitlist_repo.queue_save(batch, flight_id, waiting, waitlist_snapshot))
         
-        return success
+        created = []
+        for entry in promoted:
+            unit_price, offer = offer_index.price(flight.id, flight.price)
+            promoted_id = str(uuid.uuid4())
+            booking_doc = {
+                'user_id': entry.user_id,
+                'flight_id': flight_id,
+                'confirmation_id': f"CNF{uuid.uuid4().hex[:8].upper()}",
+                'passengers': entry.passengers,
+                'total_price': round(unit_price * entry.passengers, 2),
+                'status': BookingStatus.CONFIRMED.value,
+                'booked_at': datetime.utcnow(),
+                'seats': seats.get(entry.id, []),
+                'waitlist_entry_id': entry.id,
+                'company_id': flight.company_id,
+                'departure_time': flight.departure_time
+            }
+            if offer is not None:
+                booking_doc['offer_id'] = offer.id
+            add(self.booking_repo.queue_create(batch, promoted_id, booking_doc))
+            add_task(BOOKING_CONFIRMED, {'booking_id': promoted_id, 'user_id': entry.user_id})
+            created.append((promoted_id, entry))
+        
+        if flight_snapshot is not None:
+            # The count was read to promote from it, so write it conditionally
+            add(self.flight_repo.queue_update(batch, flight_snapshot, {
+                'available_seats': flight.available_seats + booking.passengers - sum(e.passengers for e in promoted)
+            }))
+        else:
+            # No waitlist: a blind increment that never conflicts with concurrent bookings
+            add(self.flight_repo.queue_seat_release(batch, flight_id, booking.passengers))
+        self.booking_repo.commit_batch(batch, writes)
+        # Stream the committed count (read back, as an increment only knows its delta)
+        self.flight_repo.publish_seats([flight_id])
+        for name, task_id in tasks:
+            task_queue.enqueued(db, name, task_id)
+        return created
+    
+    def join_waitlist(self, user_id: str, request: WaitlistCreate, priority: int = 0) -> WaitlistEntry:
+        """Queue for seats on a flight that cannot take the booking now."""
+        if request.passengers < 1:
+            raise ValueError("A waitlist request needs at least one passenger")
+        flight = self.flight_repo.get_by_id(request.flight_id)
+        if not flight:
+            raise ValueError("Flight not found")
+        if flight.status != FlightStatus.SCHEDULED:
+            raise ValueError("Flight is not available for booking")
+        if flight.available_seats >= request.passengers:
+            raise ValueError(f"{flight.available_seats} seats are available, book them directly")
+        
+        entry = WaitlistEntry(
+            id=uuid.uuid4().hex[:12],
+            flight_id=request.flight_id,
+            user_id=user_id,
+            passengers=request.passengers,
+            priority=priority,
+            joined_at=datetime.utcnow()
+        )
+        
+        def add(entries: List[WaitlistEntry]) -> List[WaitlistEntry]:
+            if any(existing.user_id == user_id for existing in entries):
+                raise ValueError("Already on the waitlist for this flight")
+            if len(entries) >= MAX_WAITLIST:
+                raise ValueError("The waitlist for this flight is full")
+            return entries + [entry]
+        
+        entries = self.waitlist_repo.modify(request.flight_id, add)
+        metrics.waitlist_events.labels("joined").inc()
+        return next(queued for queued in self._positioned(entries) if queued.id == entry.id)
+    
+    def leave_waitlist(self, flight_id: str, user_id: str) -> bool:
+        """Drop the user's waitlist request for a flight."""
+        def remove(entries: List[WaitlistEntry]) -> List[WaitlistEntry]:
+            kept = [entry for entry in entries if entry.user_id != user_id]
+            if len(kept) == len(entries):
+                raise ValueError("Not on the waitlist for this flight")
+            return kept
+        
+        self.waitlist_repo.modify(flight_id, remove)
+        metrics.waitlist_events.labels("left").inc()
+        return True
+    
+    def get_waitlist(self, flight_id: str) -> List[WaitlistEntry]:
+        """A flight's waitlist in serving order."""
+        entries, _ = self.waitlist_repo.read(flight_id)
+        return entries
+    
+    def get_waitlist_entry(self, flight_id: str, user_id: str) -> Optional[WaitlistEntry]:
+        """The user's place on a flight's waitlist, or None."""
+        return next((entry for entry in self.get_waitlist(flight_id) if entry.user_id == user_id), None)
+    
+    @staticmethod
+    def _positioned(entries: List[WaitlistEntry]) -> List[WaitlistEntry]:
+        for position, entry in enumerate(entries, 1):
+            entry.position = position
+        return entries
     
     def get_flight_bookings(self, flight_id: str) -> List[Booking]:
         """Get all bookings for a flight (for company/admin)."""
         return self.booking_repo.get_by_flight(flight_id)
-
+    
+    def get_flight_manifest(self, flight_id: str,
+                            status: Optional[BookingStatus] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Passenger manifest of a flight: its bookings joined with their users,
+        ordered by booking time. Users are fetched with batched multi-gets,
+        so the export costs a few round-trips whatever the cabin size.
+        Returns None when the flight does not exist.
+        """
+        if not self.flight_repo.exists(flight_id):
+            return None
+        bookings = sorted(
+            self.booking_repo.get_by_flight(flight_id, status),
+            key=lambda booking: (booking.booked_at, booking.confirmation_id)
+        )
+        users = self.user_repo.get_many(booking.user_id for booking in bookings)
+        rows = []
+        for booking in bookings:
+            user = users.get(booking.user_id)
+            rows.append({
+                'confirmation_id': booking.confirmation_id,
+                'booking_id': booking.id,
+                'status': booking.status,
+                'passengers': booking.passengers,
+                'total_price': booking.total_price,
+                'booked_at': booking.booked_at,
+                'cancelled_at': booking.cancelled_at,
+                'user_id': booking.user_id,
+                'passenger_name': user.name if user else None,
+                'passenger_email': user.email if user else None,
+            })
+        return rows
@@ -0,0 +1,117 @@
+"""Cascading flight cancellation service layer."""
+import logging
+from typing import Any, Dict, Optional
+from google.cloud.firestore_v1 import Increment
+from domain.models import BookingStatus, CancellationStatus, FlightCancellation, FlightStatus
+from infrastructure.repositories import BookingRepository, CancellationRepository, FlightRepository
+from infrastructure.scheduling import Lease
+from observability import trace_methods
+
+logger = logging.getLogger(__name__)
+
+# Runs of one cancellation before it is left failed for an operator
+MAX_ATTEMPTS = 5
+
+
+@trace_methods
+class CancellationService:
+    """
+    Cancels flights and refunds their bookings in the background.
+    
+    The request only records the cancellation and flips the flight status;
+    the refunds run afterwards, a page of confirmed bookings per batched
+    write that also advances the checkpoint document. Refunded bookings drop
+    out of the page query, so a run resumed after a crash continues where
+    the last committed page left off.
+    """
+    
+    def __init__(self, flight_repo: FlightRepository, booking_repo: BookingRepository,
+                 cancellation_repo: CancellationRepository, page_size: int = 200,
+                 lease_seconds: float = 60.0):
+        self.flight_repo = flight_repo
+        self.booking_repo = booking_repo
+        self.cancellation_repo = cancellation_repo
+        self.page_size = page_size
+        self.lease_seconds = lease_seconds
+    
+    def request_cancellation(self, flight_id: str, requested_by: Optional[str] = None) -> Optional[FlightCancellation]:
+        """
+        Cancel a flight and record the pending refund job; returns None when
+        the flight does not exist. Repeated requests return the existing job.
+        """
+        flight = self.flight_repo.get_by_id(flight_id)
+        if not flight:
+            return None
+        
+        existing = self.cancellation_repo.get_by_id(flight_id)
+        if existing is None:
+            self.cancellation_repo.create(flight_id, {
+                'status': CancellationStatus.PENDING.value,
+                'requested_by': requested_by,
+                'bookings_refunded': 0,
+                'amount_refunded': 0.0,
+                'pages': 0,
+                'attempts': 0
+            })
+        elif existing.status == CancellationStatus.FAILED:
+            self.cancellation_repo.mark(flight_id, CancellationStatus.PENDING, attempts=0, error=None)
+        
+        # Recorded before the flip, so a crash in between still leaves a job to resume
+        if flight.status != FlightStatus.CANCELLED:
+            self.flight_repo.update(flight_id, {'status': FlightStatus.CANCELLED.value})
+        return self.cancellation_repo.get_by_id(flight_id)
+    
+    def get_progress(self, flight_id: str) -> Optional[FlightCancellation]:
+        """Checkpointed progress of a flight's cancellation."""
+        return self.cancellation_repo.get_by_id(flight_id)
+    
+    def run(self, flight_id: str) -> Optional[FlightCancellation]:
+        """
+        Refund the confirmed bookings of a cancelled flight page by page.
+        Only one worker runs a given cancellation at a time; returns None
+        when another worker holds it.
+        """
+        lease = Lease(self.cancellation_repo.db, f"cancellation-{flight_id}", self.lease_seconds)
+        if not lease.acquire():
+            return None
+        try:
+            job = self.cancellation_repo.get_by_id(flight_id)
+            if job is None or job.status == CancellationStatus.COMPLETED:
+                return job
+            self.cancellation_repo.mark(flight_id, CancellationStatus.RUNNING, attempts=Increment(1), error=None)
+            try:
+                self._refund_all(flight_id, lease)
+            except Exception as e:
+                logger.exception("Cancellation of flight %s failed", flight_id)
+                self.cancellation_repo.mark(flight_id, CancellationStatus.FAILED, error=str(e))
+            return self.cancellation_repo.get_by_id(flight_id)
+        finally:
+            lease.release()
+    
+    def _refund_all(self, flight_id: str, lease: Lease):
+        flight = self.flight_repo.get_by_id(flight_id)
+        if flight and flight.status != FlightStatus.CANCELLED:
+            self.flight_repo.update(flight_id, {'status': FlightStatus.CANCELLED.value})
+        while True:
+            page = self.booking_repo.page_by_flight(flight_id, BookingStatus.CONFIRMED, self.page_size)
+            if page:
+                self.booking_repo.refund(page, extra_writes=lambda batch, chunk: (
+                    self.cancellation_repo.queue_checkpoint(batch, flight_id, chunk)
+                ))
+            if len(page) < self.page_size:
+                break
+            if not lease.acquire():
+                raise RuntimeError("Lost the cancellation lease to another worker")
+        self.cancellation_repo.mark(flight_id, CancellationStatus.COMPLETED)
+    
+    def resume_unfinished(self) -> Dict[str, Any]:
+        """Run every cancellation left pending, interrupted or failed (below the attempt limit)."""
+        resumed = completed = 0
+        for job in self.cancellation_repo.find_unfinished():
+            if job.attempts >= MAX_ATTEMPTS:
+                continue
+            result = self.run(job.id)
+            if result is not None:
+                resumed += 1
+                completed += result.status == CancellationStatus.COMPLETED
+        return {"resumed": resumed, "completed": completed}
@@ -0,0 +1,48 @@
+"""Company dashboard service layer."""
+from datetime import date, timedelta
+from typing import Optional
+from domain.models import CompanyDashboard, FlightRollup
+from infrastructure.repositories import RollupRepository
+from observability import trace_methods
+
+# Longest range of departure days one dashboard request may cover
+MAX_DASHBOARD_DAYS = 366
+
+
+@trace_methods
+class DashboardService:
+    """Service class for company sales dashboards, served from rollups."""
+    
+    def __init__(self, rollup_repo: RollupRepository):
+        self.rollup_repo = rollup_repo
+    
+    def get_company_dashboard(self, company_id: str, start_date: date, end_date: date,
+                              include_flights: bool = True) -> CompanyDashboard:
+        """Day-by-day sales and load factor of a company's departures."""
+        if end_date < start_date:
+            raise ValueError("end_date must not be before start_date")
+        if end_date - start_date >= timedelta(days=MAX_DASHBOARD_DAYS):
+            raise ValueError(f"Date range is limited to {MAX_DASHBOARD_DAYS} days")
+        
+        start, end = start_date.isoformat(), end_date.isoformat()
+        days = self.rollup_repo.get_company_days(company_id, start, end)
+        dashboard = CompanyDashboard(
+            company_id=company_id,
+            start_date=start,
+            end_date=end,
+            seats_offered=sum(day.seats_offered for day in days),
+            seats_sold=sum(day.seats_sold for day in days),
+            cancellations=sum(day.cancellations for day in days),
+            gross_revenue=round(sum(day.gross_revenue for day in days), 2),
+            net_revenue=round(sum(day.net_revenue for day in days), 2),
+            days=days
+        )
+        if dashboard.seats_offered:
+            dashboard.load_factor = round(dashboard.seats_sold / dashboard.seats_offered, 4)
+        if include_flights:
+            dashboard.flights = self.rollup_repo.get_company_flights(company_id, start, end)
+        return dashboard
+    
+    def get_flight_rollup(self, flight_id: str) -> Optional[FlightRollup]:
+        """Sales of one flight."""
+        return self.rollup_repo.get_flight(flight_id)
@@ -1,16 +1,35 @@
 """Flight service layer."""
 import uuid
 from datetime import datetime
-from typing import List, Optional
-from domain.models import Flight, FlightCreate, FlightUpdate, FlightStatus
-from infrastructure.repositories import FlightRepository
+from typing import AbstractSet, List, Optional
+from domain.models import Flight, FlightCreate, FlightFields, FlightUpdate, FlightStatus, SeatMapView
+from infrastructure.repositories import FlightRepository, SeatMapRepository
+from infrastructure.replicas import offer_index
+from core.single_flight import SingleFlight
+from observability import ReadBudgetExceeded, trace_methods
 
+# Shared by every FlightService so concurrent requests can coalesce; a
+# leader over its own read budget does not fail the requests waiting on it
+search_single_flight = SingleFlight("flight_search", caller_errors=(ReadBudgetExceeded,))
 
+# Filled in from the offer index rather than stored
+PRICED_FIELDS = frozenset({'effective_price', 'offer_id'})
+
+
+def stored_fields(fields: Optional[AbstractSet[str]]) -> Optional[AbstractSet[str]]:
+    """The field mask to read for a sparse fieldset: priced fields need the stored price."""
+    if fields is None or not fields & PRICED_FIELDS:
+        return fields
+    return (fields - PRICED_FIELDS) | {'price'}
+
+
+@trace_methods
 class FlightService:
     """Service class for flight operations."""
     
-    def __init__(self, flight_repo: FlightRepository):
+    def __init__(self, flight_repo: FlightRepository, seat_map_repo: Optional[SeatMapRepository] = None):
         self.flight_repo = flight_repo
+        self.seat_map_repo = seat_map_repo
     
     def create_flight(self, flight_data: FlightCreate) -> Flight:
         """Create a new flight."""
@@ -34,25 +53,82 @@ class FlightService:
         }
         
         self.flight_repo.create(flight_id, flight_doc)
-        return self.flight_repo.get_by_id(flight_id)
+        return self._priced(self.flight_repo.get_by_id(flight_id))
+    
+    @staticmethod
+    def _priced(flight: Optional[Flight]) -> Optional[Flight]:
+        """
+        Copy of the flight with the effective price from the best active
+        offer. Flights may be shared (coalesced searches, the replica), so
+        they are never priced in place.
+        """
+        if flight is None:
+            return None
+        effective_price, offer = offer_index.price(flight.id, flight.price)
+        return flight.model_copy(update={'effective_price': effective_price, 'offer_id': offer.id if offer else None})
+    
+    def _priced_all(self, flights: List, fields: Optional[AbstractSet[str]] = None) -> List:
+        """
+        Price a list of flights. With a sparse fieldset, only when a priced
+        field was asked for, and keeping just the fields asked for.
+        """
+        if fields is None:
+            return [self._priced(flight) for flight in flights]
+        if not fields & PRICED_FIELDS:
+            return flights
+        return [
+            FlightFields.model_construct(**{name: getattr(self._priced(flight), name) for name in fields})
+            for flight in flights
+        ]
     
     def get_flight(self, flight_id: str) -> Optional[Flight]:
         """Get flight by ID."""
-        return self.flight_repo.get_by_id(flight_id)
+        return self._priced(self.flight_repo.get_by_id(flight_id))
+    
+    def get_seat_map(self, flight_id: str) -> Optional[SeatMapView]:
+        """Seat map of a flight; None when the flight does not exist."""
+        flight = self.flight_repo.get_by_id(flight_id)
+        if not flight:
+            return None
+        seat_map, _ = self.seat_map_repo.read(flight)
+        return SeatMapView(
+            flight_id=flight_id,
+            layout=seat_map.layout,
+            rows=seat_map.rows_view(),
+            free_seats=seat_map.free_count,
+            total_seats=seat_map.seats
+        )
     
     def search_flights(
         self,
         origin: str = None,
         destination: str = None,
         departure_date: datetime = None,
-        limit: int = 50
+        limit: int = 50,
+        fields: Optional[AbstractSet[str]] = None
     ) -> List[Flight]:
-        """Search flights with filters."""
-        return self.flight_repo.search_flights(origin, destination, departure_date, limit)
+        """
+        Search flights with filters; only ``fields`` of them for a sparse fieldset.
+        Identical searches already in flight share one repository query.
+        """
+        mask = stored_fields(fields)
+        flights = search_single_flight.do(
+            self._search_key(origin, destination, departure_date, limit, mask),
+            self.flight_repo.search_flights, origin, destination, departure_date, limit, mask
+        )
+        return self._priced_all(flights, fields)
+    
+    @staticmethod
+    def _search_key(origin, destination, departure_date, limit, fields=None) -> tuple:
+        # Searches match whole days, so only the date (and its UTC offset) matters
+        day = None
+        if departure_date:
+            day = (departure_date.date(), departure_date.utcoffset())
+        return (origin or None, destination or None, day, limit, fields)
     
     def get_company_flights(self, company_id: str) -> List[Flight]:
         """Get all flights for a company."""
-        return self.flight_repo.get_by_company(company_id)
+        return self._priced_all(self.flight_repo.get_by_company(company_id))
     
     def update_flight(self, flight_id: str, update_data: FlightUpdate) -> Optional[Flight]:
         """Update flight information."""
@@ -64,7 +140,9 @@ class FlightService:
         # Prepare update data
         update_dict = {}
         if update_data.price is not None:
+            # A manual price is the new anchor for repricing
             update_dict['price'] = update_data.price
+            update_dict['base_price'] = update_data.price
         if update_data.available_seats is not None:
             update_dict['available_seats'] = update_data.available_seats
         if update_data.status is not None:
@@ -73,13 +151,9 @@ class FlightService:
         if update_dict:
             self.flight_repo.update(flight_id, update_dict)
         
-        return self.flight_repo.get_by_id(flight_id)
-    
-    def cancel_flight(self, flight_id: str) -> bool:
-        """Cancel a flight."""
-        return self.flight_repo.update(flight_id, {'status': FlightStatus.CANCELLED.value})
+        return self._priced(self.flight_repo.get_by_id(flight_id))
     
-    def get_all_flights(self, limit: int = 100) -> List[Flight]:
-        """Get all flights."""
-        return self.flight_repo.get_all(limit)
+    def get_all_flights(self, limit: int = 100, fields: Optional[AbstractSet[str]] = None) -> List[Flight]:
+        """Get all flights; only ``fields`` of them for a sparse fieldset."""
+        return self._priced_all(self.flight_repo.get_all(limit, stored_fields(fields)), fields)
 
@@ -0,0 +1,228 @@
+"""Checkout seat hold service layer."""
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from domain.models import Booking, BookingStatus, FlightStatus, HoldStatus, SeatHold, SeatHoldCreate
+from infrastructure.repositories import BookingRepository, FlightRepository, HoldRepository, SeatMapRepository
+from infrastructure.replicas import offer_index
+from infrastructure.scheduling import hold_reaper
+from infrastructure.tasks import task_queue
+from observability import metrics, trace_methods
+from .notification_service import BOOKING_CONFIRMED
+
+logger = logging.getLogger(__name__)
+
+
+@trace_methods
+class SeatHoldService:
+    """
+    Holds seats for a user while they check out.
+    
+    Placing a hold takes the seats off the flight and records the hold in one
+    conditional write, with the price fixed at that moment. Confirming turns
+    the hold into a booking in a single batched write; releasing or letting
+    it expire puts the seats back. Expiry is driven by the process's timer
+    wheel (``hold_reaper``), backed by a periodic sweep for holds whose
+    worker went away.
+    """
+    
+    def __init__(self, hold_repo: HoldRepository, flight_repo: FlightRepository,
+                 booking_repo: BookingRepository, hold_minutes: float = 10.0, batch_size: int = 200,
+                 seat_map_repo: Optional[SeatMapRepository] = None, attempts: int = 5):
+        self.hold_repo = hold_repo
+        self.flight_repo = flight_repo
+        self.booking_repo = booking_repo
+        self.seat_map_repo = seat_map_repo
+        self.attempts = attempts
+        self.hold_minutes = hold_minutes
+        self.batch_size = batch_size
+    
+    def place_hold(self, user_id: str, hold_data: SeatHoldCreate) -> SeatHold:
+        """Take seats off sale for ``hold_minutes``."""
+        if hold_data.passengers < 1:
+            raise ValueError("A hold needs at least one passenger")
+        hold_id = str(uuid.uuid4())
+        expires_at = datetime.utcnow() + timedelta(minutes=self.hold_minutes)
+        hold_doc: Dict = {}
+        
+        def queue_hold(batch, flight) -> Dict[str, int]:
+            # Discount from the in-memory offer index, no extra reads
+            unit_price, offer = offer_index.price(flight.id, flight.price)
+            hold_doc.clear()
+            hold_doc.update({
+                'user_id': user_id,
+                'flight_id': flight.id,
+                'passengers': hold_data.passengers,
+                'total_price': round(unit_price * hold_data.passengers, 2),
+                'offer_id': offer.id if offer is not None else None,
+                'status': HoldStatus.ACTIVE.value,
+                'expires_at': expires_at,
+                # Copied so confirming needs no flight read for the booking
+                'company_id': flight.company_id,
+                'departure_time': flight.departure_time
+            })
+            return self.hold_repo.queue_create(batch, hold_id, hold_doc)
+        
+        flight, reserved = self.flight_repo.reserve_seats(hold_data.flight_id, hold_data.passengers, queue_hold)
+        if flight is None:
+            raise ValueError("Flight not found")
+        if not reserved:
+            if flight.status != FlightStatus.SCHEDULED:
+                raise ValueError("Flight is not available for booking")
+            raise ValueError(f"Not enough seats available. Only {flight.available_seats} seats left")
+        
+        hold_reaper.schedule(hold_id, expires_at)
+        metrics.seat_holds.labels("placed").inc()
+        return SeatHold(id=hold_id, **hold_doc)
+    
+    def get_hold(self, hold_id: str) -> Optional[SeatHold]:
+        """Get hold by ID."""
+        return self.hold_repo.get_by_id(hold_id)
+    
+    def _active_hold(self, hold_id: str, user_id: str):
+        """Snapshot and model of a user's active hold, or ValueError."""
+        snapshot = self.hold_repo.get_snapshot(hold_id)
+        if snapshot is None:
+            raise ValueError("Hold not found")
+        hold = self.hold_repo.from_snapshot(snapshot)
+        if hold.user_id != user_id:
+            raise ValueError("Unauthorized to use this hold")
+        if hold.status != HoldStatus.ACTIVE:
+            raise ValueError(f"Hold is {hold.status}")
+        if hold.expires_at <= datetime.utcnow():
+            raise ValueError("Hold has expired")
+        return snapshot, hold
+    
+    def confirm_hold(self, hold_id: str, user_id: str, seats: Optional[List[str]] = None) -> Booking:
+        """
+        Turn an active hold into a confirmed booking at the held price, with
+        the chosen ``seats`` or seats picked from the seat map.
+        """
+        snapshot, hold = self._active_hold(hold_id, user_id)
+        flight = self.flight_repo.get_by_id(hold.flight_id)
+        if not flight or flight.status != FlightStatus.SCHEDULED:
+            raise ValueError("Flight is not available for booking")
+        
+        booking_id = str(uuid.uuid4())
+        confirmation_id = f"CNF{uuid.uuid4().hex[:8].upper()}"
+        task_id = str(uuid.uuid4())
+        for attempt in range(self.attempts):
+            if attempt:
+                # Lost a race on the hold or the seat map: the re-read tells which
+                snapshot, hold = self._active_hold(hold_id, user_id)
+            held = snapshot.to_dict()
+            booking_doc = {
+                'user_id': user_id,
+                'flight_id': hold.flight_id,
+                'confirmation_id': confirmation_id,
+                'passengers': hold.passengers,
+                'total_price': hold.total_price,
+                'status': BookingStatus.CONFIRMED.value,
+                'booked_at': datetime.utcnow(),
+                'company_id': held.get('company_id'),
+                'departure_time': held.get('departure_time'),
+                'hold_id': hold_id
+            }
+            if hold.offer_id:
+                booking_doc['offer_id'] = hold.offer_id
+            
+            def queue_conversion(batch) -> Dict[str, int]:
+                writes = self.hold_repo.queue_settle(batch, snapshot, HoldStatus.CONVERTED, booking_id=booking_id)
+                if self.seat_map_repo is not None:
+                    booking_doc['seats'], assigned = self.seat_map_repo.queue_assign(batch, flight, hold.passengers, seats)
+                    writes.update(assigned)
+                _, queued = task_queue.queue_enqueue(batch, self.booking_repo.db, BOOKING_CONFIRMED,
+                                                     {'booking_id': booking_id, 'user_id': user_id}, task_id=task_id)
+                writes.update(queued)
+                return writes
+            
+            # The booking, its rollups, its seats, its confirmation task and the hold's conversion commit together
+            try:
+                self.booking_repo.create(booking_id, booking_doc, queue_conversion)
+                break
+            except (FailedPrecondition, NotFound, AlreadyExists):
+                continue
+        else:
+            raise ValueError("Hold is no longer active")
+        
+        hold_reaper.cancel(hold_id)
+        metrics.seat_holds.labels("converted").inc()
+        task_queue.enqueued(self.booking_repo.db, BOOKING_CONFIRMED, task_id)
+        return self.booking_repo.get_by_id(booking_id)
+    
+    def release_hold(self, hold_id: str, user_id: str) -> bool:
+        """Give up an active hold and put its seats back on sale."""
+        snapshot, _ = self._active_hold(hold_id, user_id)
+        if not self._settle([snapshot], HoldStatus.RELEASED):
+            raise ValueError("Hold is no longer active")
+        hold_reaper.cancel(hold_id)
+        return True
+    
+    def expire_holds(self, hold_ids: Iterable[str]) -> int:
+        """Expire the given holds that are still active and due (the timer wheel's handler)."""
+        now = datetime.utcnow()
+        due = [snapshot for snapshot in self.hold_repo.get_snapshots(hold_ids)
+               if self.hold_repo.is_expired(snapshot, now)]
+        return self._settle(due, HoldStatus.EXPIRED)
+    
+    def track_active(self) -> int:
+        """Put every active hold in the store on the timer wheel, e.g. after a restart lost the wheel."""
+        tracked = 0
+        for hold_id, expires_at in self.hold_repo.iter_active_expiries():
+            hold_reaper.schedule(hold_id, expires_at)
+            tracked += 1
+        return tracked
+    
+    def sweep_expired(self) -> Dict[str, int]:
+        """Expire every overdue hold in the store, including those no worker is tracking."""
+        expired = 0
+        while True:
+            page = self.hold_repo.find_expired(datetime.utcnow(), self.batch_size)
+            settled = self._settle(page, HoldStatus.EXPIRED)
+            expired += settled
+            if len(page) < self.batch_size or not settled:
+                break
+        if expired:
+            logger.info("Swept %d expired seat holds", expired)
+        return {"expired": expired}
+    
+    def _settle(self, snapshots: List, status: HoldStatus) -> int:
+        """
+        Settle holds and put their seats back, a batch per chunk. A chunk that
+        lost a race (a hold converted meanwhile) is retried hold by hold, so
+        only the hold that changed is skipped. Returns the holds settled.
+        """
+        settled = 0
+        for start in range(0, len(snapshots), self.batch_size):
+            chunk = snapshots[start:start + self.batch_size]
+            try:
+                settled += self._settle_chunk(chunk, status)
+            except (FailedPrecondition, NotFound):
+                for snapshot in chunk:
+                    try:
+                        settled += self._settle_chunk([snapshot], status)
+                    except (FailedPrecondition, NotFound):
+                        continue
+        if settled:
+            metrics.seat_holds.labels(status.value).inc(settled)
+        return settled
+    
+    def _settle_chunk(self, chunk: List, status: HoldStatus) -> int:
+        """Settle holds in one batch, then stream the seats they put back."""
+        settled = self.hold_repo.settle(chunk, status, self._release_seats)
+        self.flight_repo.publish_seats(snapshot.to_dict()['flight_id'] for snapshot in chunk)
+        return settled
+    
+    def _release_seats(self, batch, chunk: List) -> Dict[str, int]:
+        seats: Dict[str, int] = defaultdict(int)
+        for snapshot in chunk:
+            doc = snapshot.to_dict()
+            seats[doc['flight_id']] += doc['passengers']
+        writes: Dict[str, int] = {}
+        for flight_id, count in seats.items():
+            for collection, written in self.flight_repo.queue_seat_release(batch, flight_id, count).items():
+                writes[collection] = writes.get(collection, 0) + written
+        return writes
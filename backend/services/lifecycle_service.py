@@ -0,0 +1,38 @@
+"""Flight lifecycle service layer."""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from infrastructure.repositories import FlightRepository
+from infrastructure.repositories.base_repository import naive_utc
+from observability import metrics, trace_methods
+
+
+@trace_methods
+class FlightLifecycleService:
+    """Moves flights through their lifecycle once they have flown."""
+    
+    def __init__(self, flight_repo: FlightRepository, page_size: int = 300, max_pages: int = 20):
+        self.flight_repo = flight_repo
+        self.page_size = page_size
+        self.max_pages = max_pages
+    
+    def complete_departed(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Mark scheduled flights that have arrived as completed, oldest first,
+        a page at a time. Stops after ``max_pages`` so one run stays short;
+        the next run picks up where this one stopped.
+        """
+        now = now or datetime.utcnow()
+        completed = 0
+        for _ in range(self.max_pages):
+            page = self.flight_repo.find_departed(now, self.page_size)
+            if page:
+                completed += self.flight_repo.mark_completed(page)
+            if len(page) < self.page_size:
+                break
+        
+        # Lag: how far behind the oldest arrived-but-scheduled flight is
+        remaining = self.flight_repo.find_departed(now, 1)
+        lag = (now - naive_utc(remaining[0].to_dict()['arrival_time'])).total_seconds() if remaining else 0.0
+        metrics.flights_completed.inc(completed)
+        metrics.flight_lifecycle_lag.set(lag)
+        return {"completed": completed, "lag_seconds": round(lag, 3), "backlog": bool(remaining)}
@@ -0,0 +1,83 @@
+"""Notification service layer and background task handlers."""
+import logging
+from typing import Any, Dict
+from infrastructure.repositories import (
+    AuditRepository, BookingRepository, FlightRepository, NotificationRepository, UserRepository
+)
+from infrastructure.tasks import TaskQueue
+from observability import trace_methods
+
+logger = logging.getLogger(__name__)
+
+# Task names
+BOOKING_CONFIRMED = "booking_confirmed"
+BOOKING_CANCELLED = "booking_cancelled"
+
+
+@trace_methods
+class NotificationService:
+    """Side effects of booking changes that run after the request: messages and audit entries."""
+    
+    def __init__(self, notification_repo: NotificationRepository, audit_repo: AuditRepository,
+                 booking_repo: BookingRepository, flight_repo: FlightRepository, user_repo: UserRepository):
+        self.notification_repo = notification_repo
+        self.audit_repo = audit_repo
+        self.booking_repo = booking_repo
+        self.flight_repo = flight_repo
+        self.user_repo = user_repo
+    
+    @classmethod
+    def for_db(cls, db) -> "NotificationService":
+        """Service wired to the repositories of ``db``."""
+        return cls(NotificationRepository(db), AuditRepository(db), BookingRepository(db),
+                   FlightRepository(db), UserRepository(db))
+    
+    def _notify(self, kind: str, booking_id: str, subject: str, body: str) -> bool:
+        booking = self.booking_repo.get_by_id(booking_id)
+        if booking is None:
+            logger.warning("Booking %s vanished before its %s notification", booking_id, kind)
+            return False
+        user = self.user_repo.get_by_id(booking.user_id)
+        if user is None:
+            return False
+        flight = self.flight_repo.get_by_id(booking.flight_id)
+        flight_name = f"{flight.flight_number} {flight.origin}-{flight.destination}" if flight else booking.flight_id
+        # Keyed by kind and booking, so a retried task overwrites instead of duplicating
+        self.notification_repo.create(f"{kind}-{booking_id}", {
+            'user_id': user.id,
+            'channel': "email",
+            'recipient': user.email,
+            'subject': subject.format(confirmation=booking.confirmation_id, flight=flight_name),
+            'body': body.format(name=user.name, confirmation=booking.confirmation_id, flight=flight_name,
+                                passengers=booking.passengers, total=booking.total_price),
+            'kind': kind,
+            'reference_id': booking_id
+        })
+        return True
+    
+    def booking_confirmed(self, payload: Dict[str, Any]):
+        """Confirmation message and audit entry for a new booking."""
+        self._notify(
+            BOOKING_CONFIRMED, payload['booking_id'],
+            "Booking {confirmation} confirmed: {flight}",
+            "Hello {name},\n\nyour booking {confirmation} on {flight} for {passengers} passenger(s) "
+            "is confirmed. Total charged: {total:.2f}.\n"
+        )
+        self.audit_repo.record(f"{BOOKING_CONFIRMED}-{payload['booking_id']}", "booking.create",
+                               payload.get('user_id'), "booking", payload['booking_id'])
+    
+    def booking_cancelled(self, payload: Dict[str, Any]):
+        """Cancellation message and audit entry for a cancelled booking."""
+        self._notify(
+            BOOKING_CANCELLED, payload['booking_id'],
+            "Booking {confirmation} cancelled: {flight}",
+            "Hello {name},\n\nyour booking {confirmation} on {flight} has been cancelled.\n"
+        )
+        self.audit_repo.record(f"{BOOKING_CANCELLED}-{payload['booking_id']}", "booking.cancel",
+                               payload.get('user_id'), "booking", payload['booking_id'])
+
+
+def register_task_handlers(queue: TaskQueue):
+    """Register the background tasks of the service layer on ``queue``."""
+    queue.register(BOOKING_CONFIRMED, lambda db, payload: NotificationService.for_db(db).booking_confirmed(payload))
+    queue.register(BOOKING_CANCELLED, lambda db, payload: NotificationService.for_db(db).booking_cancelled(payload))
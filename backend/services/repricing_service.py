@@ -0,0 +1,148 @@
+"""Batch repricing of scheduled flights from per-company fare curves."""
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from infrastructure.repositories import FlightRepository
+from observability import trace_methods
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class FareCurve:
+    """
+    Price multiplier as a function of load factor and days to departure.
+    Each dimension is a piecewise-linear curve through its knots; the product
+    of both is clamped to ``[min_multiplier, max_multiplier]`` and applied to
+    the flight's base price.
+    """
+    
+    def __init__(
+        self,
+        load_factors: Sequence[float] = (0.0, 0.5, 0.8, 0.95, 1.0),
+        load_multipliers: Sequence[float] = (0.85, 1.0, 1.2, 1.5, 1.8),
+        days: Sequence[float] = (0, 3, 7, 21, 60, 180),
+        day_multipliers: Sequence[float] = (1.4, 1.25, 1.1, 1.0, 0.95, 0.9),
+        min_multiplier: float = 0.5,
+        max_multiplier: float = 3.0
+    ):
+        self.load_factors = np.asarray(load_factors, dtype=np.float64)
+        self.load_multipliers = np.asarray(load_multipliers, dtype=np.float64)
+        self.days = np.asarray(days, dtype=np.float64)
+        self.day_multipliers = np.asarray(day_multipliers, dtype=np.float64)
+        self.min_multiplier = min_multiplier
+        self.max_multiplier = max_multiplier
+        for knots, values in ((self.load_factors, self.load_multipliers), (self.days, self.day_multipliers)):
+            if len(knots) == 0 or len(knots) != len(values):
+                raise ValueError("Fare curve knots and multipliers must be non-empty and of equal length")
+            if np.any(np.diff(knots) <= 0):
+                raise ValueError("Fare curve knots must be strictly increasing")
+        if not 0 < min_multiplier <= max_multiplier:
+            raise ValueError("Fare curve multiplier bounds are invalid")
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FareCurve":
+        return cls(**data)
+    
+    def multipliers(self, load: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """Multiplier for each flight, vectorized over the input arrays."""
+        product = np.interp(load, self.load_factors, self.load_multipliers) * \
+            np.interp(days, self.days, self.day_multipliers)
+        return np.clip(product, self.min_multiplier, self.max_multiplier)
+
+
+@trace_methods
+class RepricingService:
+    """
+    Reprices every scheduled flight in one pass.
+    Flights are loaded into columnar arrays (base price, current price, load
+    factor, days to departure), priced per company with NumPy, and only the
+    prices that changed are written back in batches.
+    """
+    
+    def __init__(self, flight_repo: FlightRepository, curves: Optional[Dict[str, Dict[str, Any]]] = None,
+                 tolerance: float = 0.001):
+        self.flight_repo = flight_repo
+        # Relative change below which a price is left alone, to avoid write churn
+        self.tolerance = tolerance
+        curves = dict(curves or {})
+        self.default_curve = FareCurve.from_dict(curves.pop("default", {}))
+        self.curves = {company_id: FareCurve.from_dict(curve) for company_id, curve in curves.items()}
+    
+    def _load(self, now: datetime) -> Dict[str, Any]:
+        ids: List[str] = []
+        companies: List[str] = []
+        base: List[float] = []
+        price: List[float] = []
+        available: List[float] = []
+        total: List[float] = []
+        departure: List[float] = []
+        missing_base: List[bool] = []
+        for row in self.flight_repo.iter_pricing_fields():
+            ids.append(row['id'])
+            companies.append(row['company_id'])
+            price.append(row['price'])
+            base.append(row.get('base_price') or row['price'])
+            missing_base.append(not row.get('base_price'))
+            available.append(row['available_seats'])
+            total.append(row['total_seats'])
+            departs = row['departure_time']
+            if departs.tzinfo is not None:
+                departs = departs.replace(tzinfo=None) - departs.utcoffset()
+            departure.append((departs - _EPOCH).total_seconds())
+        
+        total_seats = np.maximum(np.asarray(total, dtype=np.float64), 1.0)
+        return {
+            "ids": ids,
+            "companies": np.asarray(companies, dtype=object),
+            "base": np.asarray(base, dtype=np.float64),
+            "price": np.asarray(price, dtype=np.float64),
+            "load": np.clip(1.0 - np.asarray(available, dtype=np.float64) / total_seats, 0.0, 1.0),
+            "days": np.maximum((np.asarray(departure, dtype=np.float64) - (now - _EPOCH).total_seconds()) / 86400.0, 0.0),
+            "missing_base": np.asarray(missing_base, dtype=bool),
+        }
+    
+    def _compute(self, columns: Dict[str, Any]) -> np.ndarray:
+        new_price = np.empty_like(columns["base"])
+        if len(new_price) == 0:
+            return new_price
+        companies, groups = np.unique(columns["companies"], return_inverse=True)
+        for index, company_id in enumerate(companies):
+            mask = groups == index
+            curve = self.curves.get(company_id, self.default_curve)
+            new_price[mask] = columns["base"][mask] * curve.multipliers(columns["load"][mask], columns["days"][mask])
+        return np.round(new_price, 2)
+    
+    def reprice(self, now: Optional[datetime] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Reprice all scheduled flights; returns counts and timings."""
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        columns = self._load(now)
+        loaded = time.perf_counter()
+        new_price = self._compute(columns)
+        computed = time.perf_counter()
+        
+        changed = np.abs(new_price - columns["price"]) > np.maximum(columns["price"] * self.tolerance, 0.005)
+        # Flights repriced for the first time also record their base price
+        to_write = np.flatnonzero(changed | columns["missing_base"])
+        updates = {
+            columns["ids"][i]: {'price': float(new_price[i]), 'base_price': float(columns["base"][i])}
+            for i in to_write
+        }
+        result = None if dry_run else self.flight_repo.update_many(updates, batch_size=500, workers=4)
+        finished = time.perf_counter()
+        
+        return {
+            "flights": len(columns["ids"]),
+            "changed": int(changed.sum()),
+            "written": result.written if result else 0,
+            "failed": sorted(result.failed) if result else [],
+            "dry_run": dry_run,
+            "mean_price_change": round(float(np.mean(new_price - columns["price"])), 2) if len(new_price) else 0.0,
+            "seconds": {
+                "load": round(loaded - started, 3),
+                "compute": round(computed - loaded, 3),
+                "write": round(finished - computed, 3),
+                "total": round(finished - started, 3),
+            },
+        }